@@ -0,0 +1,86 @@
+"""統一的命令列入口：python ai_tools.py <工具> [參數]（或 python -m ai_tools）。
+
+只有被選到的工具腳本才會載入，列出工具或顯示說明時不匯入任何轉換器。
+"""
+import importlib.util
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 工具名稱 → (腳本檔名, 說明)
+TOOLS = {
+    'disney': ('markdown-to-disney-html.py', 'Markdown 表格轉成迪士尼風格的 HTML 頁面'),
+    'styled': ('markdown-to-styled-html.py', 'Markdown 表格轉成暗色風格的 HTML 頁面'),
+    'themes': ('markdown-to-themed-html.py', 'Markdown 只解析一次，同時轉成多種主題的 HTML 頁面'),
+    'cube': ('swift-struct-class-to-3d-cube.py', 'Swift 類型轉成 3D 旋轉立方體 HTML'),
+    'indent': ('auto-indent-script.py', '依括號結構自動縮排程式碼'),
+    'serve': ('conversion-server.py', '常駐的轉換服務（HTTP / Unix socket）'),
+}
+
+def _module_name(file_name):
+    return file_name.replace('-', '_')[:-3]
+
+def load_tool(name):
+    # 腳本檔名含有連字號，無法直接 import，改用檔案路徑載入；登記到 sys.modules，重複載入時直接沿用。
+    # 登記的模組名稱沒有對應的檔案，要交給行程池的函式須先經過 picklable()
+    file_name = TOOLS[name][0]
+    module_name = _module_name(file_name)
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    if SCRIPT_DIR not in sys.path:
+        sys.path.insert(0, SCRIPT_DIR)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def _load_function(name, function_name):
+    return getattr(load_tool(name), function_name)
+
+class ToolFunction:
+    # 工具腳本中函式的可 pickle 參照。fork 的工作行程會繼承 sys.modules，spawn/forkserver 則要依模組名稱重新匯入，
+    # 找不到 load_tool 登記的名稱；反序列化時改為先以 load_tool 載入腳本再取出函式。
+    # 行程池先序列化函式再序列化參數，參數中工具腳本定義的類別因此也能還原
+    def __init__(self, name, function):
+        self.name = name
+        self.function = function
+
+    def __call__(self, *args, **kwargs):
+        return self.function(*args, **kwargs)
+
+    def __reduce__(self):
+        return _load_function, (self.name, self.function.__name__)
+
+def picklable(function):
+    # 函式屬於以 load_tool 載入的工具腳本時回傳 ToolFunction，其他函式（包括直接執行的腳本中的 __main__ 函式）原樣回傳
+    module_name = getattr(function, '__module__', None)
+    for name, (file_name, _) in TOOLS.items():
+        if module_name == _module_name(file_name):
+            return ToolFunction(name, function)
+    return function
+
+def _print_usage(file=sys.stdout):
+    print("用法：python ai_tools.py <工具> [參數]（各工具的參數請用 <工具> --help 查看）\n", file=file)
+    print("可用的工具：", file=file)
+    for name, (file_name, description) in TOOLS.items():
+        print(f"  {name:8} {description}（{file_name}）", file=file)
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help', 'list'):
+        _print_usage()
+        return
+    name = argv[0]
+    if name not in TOOLS:
+        print(f"錯誤：未知的工具 '{name}'\n", file=sys.stderr)
+        _print_usage(sys.stderr)
+        sys.exit(2)
+    # 讓工具的 argparse 顯示正確的程式名稱並只看到自己的參數
+    sys.argv = [f"{os.path.basename(sys.argv[0])} {name}"] + argv[1:]
+    load_tool(name).main()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ai_tools  # noqa: E402
+
+def legacy_auto_indent(input_file, output_file):
+    # 舊版實作：只看每行的第一個與最後一個字元，作為效能比較的基準
+    with open(input_file, 'r') as infile, open(output_file, 'w') as outfile:
+        indent_level = 0
+        for line in infile:
+            stripped_line = line.strip()
+            if stripped_line.startswith('}') or stripped_line.startswith(']') or stripped_line.startswith(')'):
+                indent_level = max(0, indent_level - 1)
+            outfile.write('    ' * indent_level + stripped_line + '\n')
+            if stripped_line.endswith('{') or stripped_line.endswith('[') or stripped_line.endswith('('):
+                indent_level += 1
+
+def generate_source(lines, seed=0):
+    # 產生未縮排、含字串與註解的巢狀程式碼
+    rng = random.Random(seed)
+    output = []
+    depth = 0
+    while len(output) < lines:
+        choice = rng.random()
+        if depth < 40 and choice < 0.25:
+            output.append(f"func handler{len(output)}(value: Int) {{")
+            depth += 1
+        elif depth > 0 and choice < 0.45:
+            output.append("}")
+            depth -= 1
+        elif choice < 0.55:
+            output.append('let text = "braces { inside } a string" // and { in a comment')
+        elif choice < 0.65:
+            output.append("items.map({ $0 * 2 }).filter { $0 > 3 }")
+        else:
+            output.append(f"let value{len(output)} = compute(values[{len(output)}], other)")
+    output.extend("}" for _ in range(depth))
+    return '\n'.join(output) + '\n'
+
+def generate_json(lines, seed=0):
+    # 產生未縮排的巢狀 JSON，字串中含有括號
+    rng = random.Random(seed)
+    output = ['{']
+    depth = 1
+    while len(output) < lines:
+        choice = rng.random()
+        if depth < 40 and choice < 0.2:
+            output.append(f'"node{len(output)}": {{')
+            depth += 1
+        elif depth > 1 and choice < 0.4:
+            output.append('},')
+            depth -= 1
+        elif choice < 0.5:
+            output.append(f'"list{len(output)}": [1, 2, {{"a": "[x]"}}],')
+        else:
+            output.append(f'"key{len(output)}": "value with {{braces}} and [brackets]",')
+    output.extend('}' for _ in range(depth))
+    return '\n'.join(output) + '\n'
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the bracket-aware auto_indent with the legacy implementation")
+    parser.add_argument("--lines", type=int, default=500000, help="Number of generated input lines")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timing runs; the best run is reported")
+    args = parser.parse_args()
+
+    indent = ai_tools.load_tool('indent')
+    corpora = [
+        ('input.swift', generate_source(args.lines), ('simple', 'swift', 'js')),
+        ('input.json', generate_json(args.lines), ('simple', 'json')),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for file_name, content, languages in corpora:
+            input_path = os.path.join(tmp_dir, file_name)
+            output_path = os.path.join(tmp_dir, 'output' + os.path.splitext(file_name)[1])
+            with open(input_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            size_mb = os.path.getsize(input_path) / (1024 * 1024)
+
+            print(f"{file_name}: {args.lines} 行, {size_mb:.1f} MB")
+            rows = [('legacy', lambda: legacy_auto_indent(input_path, output_path))]
+            for language in languages:
+                rows.append((language, lambda language=language: indent.auto_indent(input_path, output_path, language)))
+            for label, func in rows:
+                elapsed = best_time(func, args.repeat)
+                print(f"  {label:8} {elapsed * 1000:9.1f} ms  {size_mb / elapsed:7.1f} MB/s  "
+                      f"{args.lines / elapsed:12,.0f} lines/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ai_tools  # noqa: E402
+import fast_io  # noqa: E402
+import markdown_themes  # noqa: E402
+
+def generate_markdown(rows):
+    # 產生含標題、說明段落與一個大表格的報表，部分儲存格帶有行內語法與需要跳脫的字元
+    lines = ["# 匯出報表", "", "以下為自動匯出的資料。", "",
+             "| 編號 | 名稱 | 狀態 | 說明 |", "|---:|:---|:---:|---|"]
+    for row in range(rows):
+        if row % 10 == 0:
+            lines.append(f"| {row} | **item {row}** | `ok` | [詳細](https://example.com/{row}?a=1&b=2) |")
+        else:
+            lines.append(f"| {row} | item {row} | done | a < b & c > d |")
+    return '\n'.join(lines) + '\n'
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the streaming GFM table renderer with the markdown package, and two themes parsed once or twice")
+    parser.add_argument("--rows", type=int, default=20000, help="Number of generated table rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timing runs; the best run is reported")
+    args = parser.parse_args()
+
+    disney = ai_tools.load_tool('disney')
+    styled = ai_tools.load_tool('styled')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        input_path = os.path.join(tmp_dir, 'report.md')
+        output_path = os.path.join(tmp_dir, 'report.html')
+        with open(input_path, 'w', encoding='utf-8') as f:
+            f.write(generate_markdown(args.rows))
+        size_mb = os.path.getsize(input_path) / (1024 * 1024)
+
+        def write(theme, document):
+            for _, pieces in theme.iter_pages(document, 'Report'):
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.writelines(pieces)
+
+        def legacy():
+            write(disney.THEME, markdown_themes.parse_html_tables(fast_io.read_text(input_path)))
+
+        def streaming():
+            write(disney.THEME, markdown_themes.stream_tables(fast_io.iter_lines(input_path)))
+
+        def two_themes():
+            # 兩個轉換器各自解析一次
+            write(disney.THEME, markdown_themes.stream_tables(fast_io.iter_lines(input_path)))
+            write(styled.THEME, markdown_themes.stream_tables(fast_io.iter_lines(input_path)))
+
+        def shared_parse():
+            # 解析一次，兩個主題共用表格的中介表示與渲染好的表格區段
+            document = markdown_themes.parse_file(input_path)
+            for theme in (disney.THEME, styled.THEME):
+                write(theme, document)
+
+        print(f"report.md: {args.rows} 列, {size_mb:.1f} MB")
+        for label, func in (('legacy', legacy), ('stream', streaming), ('2 themes', two_themes), ('shared', shared_parse)):
+            elapsed = best_time(func, args.repeat)
+            print(f"  {label:8} {elapsed * 1000:9.1f} ms  {args.rows / elapsed:12,.0f} rows/s")
+
+if __name__ == "__main__":
+    main()
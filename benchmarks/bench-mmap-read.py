@@ -0,0 +1,127 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ai_tools  # noqa: E402
+
+def write_markdown(path, size):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("# Report\n\n| id | name | description |\n|---|---|---|\n")
+        row = 0
+        while f.tell() < size:
+            f.write(f"| {row} | item {row} | 說明文字 description for row {row} |\n")
+            row += 1
+
+def write_swift(path, size):
+    with open(path, 'w', encoding='utf-8') as f:
+        index = 0
+        while f.tell() < size:
+            f.write(f"struct Model{index}: Codable {{\n")
+            for field in range(20):
+                f.write(f"    var field{field}: String // 欄位 {field}\n")
+            f.write(f"    func describe() -> String {{\n        return \"Model{index}\"\n    }}\n}}\n\n")
+            index += 1
+
+def write_nested(path, size):
+    with open(path, 'w', encoding='utf-8') as f:
+        while f.tell() < size:
+            for depth in range(30):
+                f.write(f"func level{depth}() {{\nlet text = \"{{ not a brace }}\"\n")
+            f.write("}\n" * 30)
+
+# 每個案例有舊版讀取方式（整份讀入再分割）與記憶體映射方式兩種實作
+def run_markdown(mode, path):
+    if mode == 'legacy':
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        import fast_io
+        text = fast_io.read_text(path)
+    return len(text)
+
+def run_swift(mode, path):
+    cube = ai_tools.load_tool('cube')
+    if mode == 'legacy':
+        with open(path, 'r', encoding='utf-8') as f:
+            parser = cube.SwiftStructClassParser(path, f.read())
+    else:
+        parser = cube.SwiftStructClassParser(path)
+    return sum(1 for _ in parser.iter_types())
+
+def run_indent(mode, path):
+    indent = ai_tools.load_tool('indent')
+    output = os.devnull
+    if mode == 'legacy':
+        # 舊版：以文字模式逐行讀取並逐行寫出
+        with open(path, 'r') as infile, open(output, 'w') as outfile:
+            level = 0
+            for line in infile:
+                stripped = line.strip()
+                if stripped[:1] in ('}', ']', ')'):
+                    level = max(0, level - 1)
+                outfile.write('    ' * level + stripped + '\n')
+                if stripped[-1:] in ('{', '[', '('):
+                    level += 1
+    else:
+        indent.auto_indent(path, output, 'simple')
+    return 0
+
+CASES = {
+    'markdown-read': (write_markdown, run_markdown, 'input.md'),
+    'swift-parse': (write_swift, run_swift, 'input.swift'),
+    'auto-indent': (write_nested, run_indent, 'input.swift'),
+}
+
+def child(case, mode, path):
+    # 在獨立行程中執行，ru_maxrss 才能反映單一案例的峰值記憶體
+    start = time.perf_counter()
+    if mode != 'baseline':
+        CASES[case][1](mode, path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'seconds': elapsed,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }))
+
+def measure(case, mode, path):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', case, mode, path],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout)
+
+def main():
+    parser = argparse.ArgumentParser(description="Peak RSS of the legacy read-everything path versus the memory-mapped path")
+    parser.add_argument("--size-mb", type=float, default=100, help="Size of each generated input in MB")
+    parser.add_argument("--cases", nargs='+', choices=sorted(CASES), default=sorted(CASES))
+    parser.add_argument("--child", nargs=3, metavar=('CASE', 'MODE', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    size = int(args.size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for case in args.cases:
+            writer, _, file_name = CASES[case]
+            path = os.path.join(tmp_dir, file_name)
+            writer(path, size)
+            baseline = measure(case, 'baseline', path)['max_rss_kb']
+            print(f"{case}: {os.path.getsize(path) / (1024 * 1024):.1f} MB")
+            for mode in ('legacy', 'mmap'):
+                result = measure(case, mode, path)
+                print(f"  {mode:7} 峰值 RSS {result['max_rss_kb'] / 1024:8.1f} MB "
+                      f"(扣除直譯器 {(result['max_rss_kb'] - baseline) / 1024:8.1f} MB)  {result['seconds']:7.2f} s")
+            os.remove(path)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 每個命令都只應載入自己需要的模組；顯示說明時不該匯入的重量級相依套件
+COMMANDS = [
+    ('ai_tools', ['ai_tools.py', 'list']),
+    ('disney', ['ai_tools.py', 'disney', '--help']),
+    ('styled', ['ai_tools.py', 'styled', '--help']),
+    ('cube', ['ai_tools.py', 'cube', '--help']),
+    ('indent', ['ai_tools.py', 'indent', '--help']),
+    ('themes', ['ai_tools.py', 'themes', '--help']),
+    ('serve', ['ai_tools.py', 'serve', '--help']),
+    ('disney-script', ['markdown-to-disney-html.py', '--help']),
+    ('styled-script', ['markdown-to-styled-html.py', '--help']),
+    ('cube-script', ['swift-struct-class-to-3d-cube.py', '--help']),
+    ('indent-script', ['auto-indent-script.py', '--help']),
+    ('themes-script', ['markdown-to-themed-html.py', '--help']),
+    ('serve-script', ['conversion-server.py', '--help']),
+]
+HEAVY_MODULES = ('markdown', 'bs4', 'multiprocessing', 'concurrent.futures.process', 'hashlib', 'fontTools')
+
+def import_profile(args):
+    # 以 -X importtime 執行命令，回傳 (頂層匯入的累計時間 ms, 牆鐘時間 ms, 已匯入的模組名稱)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=REPO_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    wall = (time.perf_counter() - start) * 1000
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line.split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        modules.add(name.strip())
+        # 名稱前只有一個空白的是頂層匯入，其累計時間已包含所有巢狀匯入
+        if not name[1:].startswith(' '):
+            total_us += int(cumulative)
+    return total_us / 1000, wall, modules
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure CLI startup import time with -X importtime and enforce a budget")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of runs per command; the best run is reported")
+    parser.add_argument("--budget-ms", type=float, default=40.0,
+                        help="Maximum import time per command in ms; exceeding it fails the run")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'command':15} {'import ms':>10} {'wall ms':>10}")
+    for label, command in COMMANDS:
+        best_import = best_wall = float('inf')
+        modules = set()
+        for _ in range(args.repeat):
+            import_ms, wall_ms, modules = import_profile(command)
+            best_import = min(best_import, import_ms)
+            best_wall = min(best_wall, wall_ms)
+        heavy = sorted(module for module in modules if module in HEAVY_MODULES)
+        note = f"  載入了 {', '.join(heavy)}" if heavy else ''
+        print(f"{label:15} {best_import:10.1f} {best_wall:10.1f}{note}")
+        if best_import > args.budget_ms:
+            failures.append(f"{label}：匯入時間 {best_import:.1f} ms 超過預算 {args.budget_ms:.1f} ms")
+        if heavy:
+            failures.append(f"{label}：顯示說明時不應匯入 {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"失敗：{failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
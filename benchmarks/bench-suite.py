@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import corpus
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ai_tools  # noqa: E402
+
+def measure(func, repeat):
+    # 先計時 repeat 次，再另外在 tracemalloc 下執行一次取得 Python 配置的記憶體峰值，
+    # 避免追蹤配置的額外成本影響計時
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), statistics.median(times), peak
+
+def build_cases(args, tmp_dir):
+    # 每個案例為 (名稱, 要計時的函式, 輸入位元組數, 處理的項目數, 項目單位)
+    disney = ai_tools.load_tool('disney')
+    styled = ai_tools.load_tool('styled')
+    cube = ai_tools.load_tool('cube')
+    indent = ai_tools.load_tool('indent')
+
+    markdown_text = corpus.markdown_tables(args.rows, args.cols, args.cell_width, args.tables, args.seed)
+    markdown_bytes = len(markdown_text.encode('utf-8'))
+    table_rows = args.rows * args.tables
+
+    swift_source = corpus.swift_types(args.types, args.members, args.seed)
+    swift_bytes = len(swift_source.encode('utf-8'))
+    swift_lines = swift_source.count('\n') + 1
+    infos = cube.SwiftStructClassParser('<bench>', swift_source).get_infos()
+
+    nested_source = corpus.nested_braces(args.indent_lines, args.depth, args.seed)
+    nested_path = os.path.join(tmp_dir, 'nested.swift')
+    indented_path = os.path.join(tmp_dir, 'indented.swift')
+    with open(nested_path, 'w', encoding='utf-8') as f:
+        f.write(nested_source)
+
+    def generate_all():
+        for info in infos:
+            cube.generate_html(info)
+
+    return [
+        ('markdown_to_disney_html', lambda: disney.markdown_to_disney_html(markdown_text, 'Bench'),
+         markdown_bytes, table_rows, 'rows'),
+        ('markdown_table_to_html', lambda: styled.markdown_table_to_html(markdown_text),
+         markdown_bytes, table_rows, 'rows'),
+        ('SwiftStructClassParser', lambda: cube.SwiftStructClassParser('<bench>', swift_source),
+         swift_bytes, swift_lines, 'lines'),
+        ('generate_html', generate_all, swift_bytes, len(infos), 'types'),
+        ('auto_indent', lambda: indent.auto_indent(nested_path, indented_path, 'swift'),
+         os.path.getsize(nested_path), args.indent_lines, 'lines'),
+    ]
+
+def compare(results, parameters, baseline_path):
+    # 與先前的結果檔比較每個案例的最佳時間；比值小於 1 表示變快
+    with open(baseline_path, encoding='utf-8') as f:
+        report = json.load(f)
+    baseline = {case['name']: case for case in report['results']}
+    print(f"\n與 {baseline_path} 比較：")
+    changed = sorted(name for name, value in parameters.items() if report['parameters'].get(name) != value)
+    if changed:
+        print(f"  注意：語料參數不同（{', '.join(changed)}），時間不能直接比較")
+    for case in results:
+        previous = baseline.get(case['name'])
+        if previous is None:
+            print(f"  {case['name']:24} （基準中沒有此案例）")
+            continue
+        ratio = case['best_s'] / previous['best_s']
+        memory = case['peak_mb'] - previous['peak_mb']
+        print(f"  {case['name']:24} 時間 {ratio:6.2f}x  記憶體峰值 {memory:+8.1f} MB")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Time every converter on synthetic corpora and record throughput and peak memory as JSON")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per Markdown table")
+    parser.add_argument("--cols", type=int, default=6, help="Columns per Markdown table")
+    parser.add_argument("--cell-width", type=int, default=16, help="Approximate characters per table cell")
+    parser.add_argument("--tables", type=int, default=1, help="Number of Markdown tables")
+    parser.add_argument("--types", type=int, default=200, help="Number of Swift types")
+    parser.add_argument("--members", type=int, default=40, help="Members per Swift type")
+    parser.add_argument("--indent-lines", type=int, default=200000, help="Lines of the nested brace file")
+    parser.add_argument("--depth", type=int, default=64, help="Maximum nesting depth of the nested brace file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the corpora")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timing runs per case")
+    parser.add_argument("--only", action="append", help="Run only this case (may be repeated)")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", metavar="JSON", help="Compare with the results of a previous run")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = build_cases(args, tmp_dir)
+        if args.only:
+            unknown = set(args.only) - {name for name, *_ in cases}
+            if unknown:
+                parser.error(f"未知的案例：{', '.join(sorted(unknown))}")
+            cases = [case for case in cases if case[0] in args.only]
+
+        print(f"{'case':24} {'best ms':>10} {'median ms':>10} {'MB/s':>8} {'items/s':>16} {'peak MB':>9}")
+        for name, func, size, items, unit in cases:
+            best, median, peak = measure(func, args.repeat)
+            result = {
+                'name': name,
+                'input_bytes': size,
+                'items': items,
+                'item_unit': unit,
+                'best_s': best,
+                'median_s': median,
+                'mb_per_s': size / (1024 * 1024) / best,
+                'items_per_s': items / best,
+                'peak_mb': peak / (1024 * 1024),
+            }
+            results.append(result)
+            print(f"{name:24} {best * 1000:10.1f} {median * 1000:10.1f} {result['mb_per_s']:8.1f} "
+                  f"{result['items_per_s']:10,.0f} {unit:5} {result['peak_mb']:9.1f}")
+
+    parameters = {name: value for name, value in vars(args).items() if name not in ('only', 'output', 'compare')}
+    if args.output:
+        report = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': parameters,
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n結果已寫入 {args.output}")
+    if args.compare:
+        compare(results, parameters, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+import ai_tools  # noqa: E402
+
+class LegacySwiftStructClassParser:
+    # 舊版解析器：每個欄位各自走訪一次所有行，作為效能比較的基準
+    def __init__(self, file_path):
+        with open(file_path, 'r', encoding='utf-8') as file:
+            self.code = file.read()
+        self.lines = self.code.split('\n')
+        self.type = self._determine_type()
+        self.name = self._extract_name()
+        self.attributes = self._extract_attributes()
+        self.methods = self._extract_methods()
+        self.parent_types = self._extract_parent_types()
+        self.init_methods = self._extract_init_methods()
+
+    def _determine_type(self):
+        for line in self.lines:
+            match = re.search(r'\b(class|struct)\b', line)
+            if match:
+                return match.group(1)
+        raise ValueError("無法確定是 class 還是 struct")
+
+    def _extract_name(self):
+        for line in self.lines:
+            match = re.search(rf'{self.type}\s+(\w+)', line)
+            if match:
+                return match.group(1)
+        raise ValueError(f"無法找到 {self.type} 名稱")
+
+    def _extract_attributes(self):
+        return [line.strip() for line in self.lines
+                if re.search(r'\s*(var|let)\s+(\w+)(:.*)?', line)]
+
+    def _extract_methods(self):
+        methods = []
+        for line in self.lines:
+            match = re.search(r'\s*func\s+(\w+)\s*\((.*?)\)(\s*->\s*\S+)?', line)
+            if match and not line.strip().startswith('init'):
+                method = f"func {match.group(1)}({match.group(2)}){match.group(3) or ''}"
+                methods.append(method.strip())
+        return methods
+
+    def _extract_parent_types(self):
+        def_line = next(line for line in self.lines if self.type in line)
+        match = re.search(rf'{self.type}\s+\w+\s*:\s*(.*)', def_line)
+        if match:
+            return [parent.strip() for parent in match.group(1).split(',')]
+        return []
+
+    def _extract_init_methods(self):
+        init_methods = []
+        for line in self.lines:
+            match = re.search(r'\s*init\s*\((.*?)\)', line)
+            if match:
+                init_methods.append(f"init({match.group(1)})".strip())
+        return init_methods
+
+    def get_info(self):
+        return {
+            'type': self.type,
+            'name': self.name,
+            'attributes': self.attributes,
+            'methods': self.methods,
+            'parent_types': self.parent_types,
+            'init_methods': self.init_methods
+        }
+
+def generate_swift_source(members):
+    # 產生一個含有大量成員的模型檔，模擬程式碼產生器的輸出
+    lines = ["import Foundation", "", "final class GeneratedModel: NSObject, Codable {"]
+    for i in range(members):
+        lines.append(f"    var field{i}: String")
+        lines.append(f"    let constant{i}: Int = {i}")
+        lines.append(f"    func compute{i}(value: Int) -> Int {{")
+        lines.append(f"        let doubled = value * 2")
+        lines.append(f"        return doubled + {i}")
+        lines.append("    }")
+        lines.append("")
+    lines.append("    init(field0: String) {")
+    lines.append("        self.field0 = field0")
+    lines.append("        super.init()")
+    lines.append("    }")
+    lines.append("}")
+    return '\n'.join(lines) + '\n'
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the single-pass Swift parser with the legacy multi-pass parser")
+    parser.add_argument("--members", type=int, default=5000, help="Number of generated members (7 lines each)")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timing runs; the best run is reported")
+    args = parser.parse_args()
+
+    cube = ai_tools.load_tool('cube')
+    source = generate_swift_source(args.members)
+    line_count = source.count('\n')
+
+    with tempfile.NamedTemporaryFile('w', suffix='.swift', encoding='utf-8', delete=False) as tmp:
+        tmp.write(source)
+    try:
+        # 新解析器只計入類型本體中的成員，方法內的區域變數不算屬性，
+        # 因此只比對兩者找到的主要類型是否一致
+        legacy_info = LegacySwiftStructClassParser(tmp.name).get_info()
+        current_info = cube.SwiftStructClassParser(tmp.name).get_info()
+        if (legacy_info['type'], legacy_info['name']) != (current_info['type'], current_info['name']):
+            print("錯誤：新舊解析器找到的類型不一致")
+            sys.exit(1)
+
+        legacy = best_time(lambda: LegacySwiftStructClassParser(tmp.name), args.repeat)
+        current = best_time(lambda: cube.SwiftStructClassParser(tmp.name), args.repeat)
+    finally:
+        os.remove(tmp.name)
+
+    print(f"行數: {line_count}")
+    print(f"legacy      {legacy * 1000:9.2f} ms  {line_count / legacy:12,.0f} lines/s")
+    print(f"single-pass {current * 1000:9.2f} ms  {line_count / current:12,.0f} lines/s")
+    print(f"加速倍數: {legacy / current:.2f}x")
+
+if __name__ == "__main__":
+    main()
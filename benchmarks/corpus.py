@@ -0,0 +1,152 @@
+"""產生基準測試用的合成語料：Markdown 表格、含多個類型的 Swift 檔與深層巢狀的括號檔。
+
+bench-suite.py 直接匯入這些函式在記憶體中產生語料；單獨執行時把語料寫到指定目錄，方便用命令列工具重現。
+相同的參數與 seed 一定產生相同的內容，不同次執行的結果才能互相比較。
+"""
+import argparse
+import os
+import random
+
+WORDS = ('alpha', 'beta', 'gamma', 'delta', 'render', 'table', 'cube', 'stream', 'cache', 'index',
+         '資料', '報表', '狀態', '設定')
+ALIGNMENTS = ('---', ':---', ':---:', '---:')
+
+def _words(rng, width):
+    # 以隨機單字填滿約 width 個字元
+    words = []
+    length = 0
+    while length < width:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
+
+def _cell(rng, width):
+    # 大部分是純文字，少數帶有行內語法、需要跳脫的字元或跳脫的管線符號
+    text = _words(rng, width)
+    choice = rng.random()
+    if choice < 0.05:
+        return f"**{text}**"
+    if choice < 0.08:
+        return f"`{text}`"
+    if choice < 0.10:
+        return f"[{text}](https://example.com/{rng.randrange(1000)}?a=1&b=2)"
+    if choice < 0.13:
+        return f"{text} a < b & c > d"
+    if choice < 0.15:
+        return f"{text} \\| {text}"
+    return text
+
+def markdown_tables(rows, cols=4, cell_width=12, tables=1, seed=0):
+    # 產生 tables 個各有 rows 列、cols 欄的表格，每個表格前有標題與說明段落
+    rng = random.Random(seed)
+    lines = ["# 合成報表", ""]
+    for table in range(tables):
+        lines.append(f"## 表格 {table + 1}")
+        lines.append("")
+        lines.append("以下為自動產生的資料。")
+        lines.append("")
+        lines.append("| " + " | ".join(f"欄位 {col + 1}" for col in range(cols)) + " |")
+        lines.append("|" + "|".join(ALIGNMENTS[col % len(ALIGNMENTS)] for col in range(cols)) + "|")
+        for _ in range(rows):
+            lines.append("| " + " | ".join(_cell(rng, cell_width) for _ in range(cols)) + " |")
+        lines.append("")
+    return '\n'.join(lines)
+
+def _swift_members(rng, index, members, indent, static=False):
+    # enum 不能有儲存屬性，改成 static 屬性
+    pad = ' ' * indent
+    storage = 'static ' if static else ''
+    lines = []
+    for member in range(members):
+        choice = member % 4
+        if choice == 0:
+            lines.append(f"{pad}/// {_words(rng, 24)}")
+            lines.append(f"{pad}{storage}var field{member}: String = \"{{ not a brace }} {member}\"")
+        elif choice == 1:
+            lines.append(f"{pad}{storage}let constant{member}: [Int] = [{member}, {index}]")
+        elif choice == 2:
+            lines.append(f"{pad}func compute{member}(value: Int, other: Int = {member}) -> Int {{")
+            lines.append(f"{pad}    let doubled = value * 2 // {{ comment brace")
+            lines.append(f"{pad}    return [doubled, other].map {{ $0 + {member} }}.reduce(0, +)")
+            lines.append(f"{pad}}}")
+        else:
+            lines.append(f"{pad}private(set) {storage}var state{member}: Int? = nil")
+    return lines
+
+def swift_types(types, members, seed=0):
+    # 產生含 types 個類型（struct、class、enum 輪流）的 Swift 檔，每個類型有 members 個成員；
+    # 每五個類型有一個帶有巢狀類型
+    rng = random.Random(seed)
+    lines = ["import Foundation", ""]
+    for index in range(types):
+        kind = ('struct', 'class', 'enum')[index % 3]
+        parents = 'Codable, Equatable' if kind != 'class' else 'NSObject, Codable'
+        lines.append(f"public {kind} Generated{index}: {parents} {{")
+        if kind == 'enum':
+            lines.append(f"    case first, second, third{index}")
+        lines.extend(_swift_members(rng, index, members, 4, kind == 'enum'))
+        if kind != 'enum':
+            lines.append(f"    init(field0: String) {{")
+            lines.append("        self.field0 = field0")
+            lines.append("    }")
+        if index % 5 == 0:
+            lines.append(f"    struct Inner{index} {{")
+            lines.extend(_swift_members(rng, index, max(1, members // 4), 8))
+            lines.append("    }")
+        lines.append("}")
+        lines.append("")
+    return '\n'.join(lines)
+
+def nested_braces(lines, depth=64, seed=0):
+    # 產生未縮排、最深達 depth 層的巢狀程式碼，混合 {} [] ()，字串與註解中也有括號
+    rng = random.Random(seed)
+    closers = {'{': '}', '[': ']', '(': ')'}
+    output = []
+    stack = []
+    while len(output) < lines:
+        choice = rng.random()
+        if len(stack) < depth and choice < 0.3:
+            opener = rng.choice('{{[(')
+            output.append(f"call{len(output)}(arg) {opener}" if opener == '{' else f"let v{len(output)} = {opener}")
+            stack.append(opener)
+        elif stack and choice < 0.5:
+            output.append(closers[stack.pop()])
+        elif choice < 0.6:
+            output.append('let text = "braces { inside ( a [ string" // and } in a comment')
+        elif choice < 0.65:
+            output.append('/* block { comment ] */ value += 1')
+        else:
+            output.append(f"value{len(output)} = compute(items[{len(output)}], {{ $0 }})")
+    while stack:
+        output.append(closers[stack.pop()])
+    return '\n'.join(output) + '\n'
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the synthetic benchmark corpora to a directory")
+    parser.add_argument("output_dir", help="Directory for corpus.md, corpus.swift and nested.swift")
+    parser.add_argument("--rows", type=int, default=20000, help="Rows per Markdown table")
+    parser.add_argument("--cols", type=int, default=6, help="Columns per Markdown table")
+    parser.add_argument("--cell-width", type=int, default=16, help="Approximate characters per table cell")
+    parser.add_argument("--tables", type=int, default=1, help="Number of Markdown tables")
+    parser.add_argument("--types", type=int, default=200, help="Number of Swift types")
+    parser.add_argument("--members", type=int, default=40, help="Members per Swift type")
+    parser.add_argument("--indent-lines", type=int, default=200000, help="Lines of the nested brace file")
+    parser.add_argument("--depth", type=int, default=64, help="Maximum nesting depth of the nested brace file")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    corpora = {
+        'corpus.md': markdown_tables(args.rows, args.cols, args.cell_width, args.tables, args.seed),
+        'corpus.swift': swift_types(args.types, args.members, args.seed),
+        'nested.swift': nested_braces(args.indent_lines, args.depth, args.seed),
+    }
+    for file_name, content in corpora.items():
+        path = os.path.join(args.output_dir, file_name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        print(f"{path}: {os.path.getsize(path) / (1024 * 1024):.1f} MB")
+
+if __name__ == "__main__":
+    main()
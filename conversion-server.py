@@ -0,0 +1,230 @@
+import argparse
+import os
+import signal
+import sys
+
+import ai_tools
+
+RESPONSE_CHUNK_SIZE = 64 * 1024
+HTTP_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    411: 'Length Required', 413: 'Payload Too Large', 422: 'Unprocessable Entity',
+    500: 'Internal Server Error',
+}
+
+# 工作行程中已載入的轉換腳本；由 _warm_up 在行程啟動時填入，之後每個請求都不再付出匯入成本
+_converters = {}
+
+def _warm_up():
+    # 工作行程的初始化函式：預先載入所有轉換器；
+    # markdown 在轉換器中是用到時才匯入，這裡也一併載入，後備路徑同樣不必等待
+    for kind in CONVERTERS:
+        _converters[kind] = ai_tools.load_tool(kind)
+    import markdown  # noqa: F401
+
+def _ready():
+    return os.getpid()
+
+class ConversionError(Exception):
+    # 輸入無法轉換（例如沒有表格、沒有 Swift 類型），回應 422
+    pass
+
+def _flag(params, name):
+    return params.get(name, '0').lower() in ('1', 'true', 'yes', 'on')
+
+def _convert_disney(text, params):
+    disney = _converters['disney']
+    title = params.get('title', 'Table')
+    virtual = _flag(params, 'virtual')
+    assets = disney.page_assets(None, virtual, not _flag(params, 'no-animation'))
+    page = disney.THEME.render_text(text, title, assets, virtual)
+    if page is None:
+        raise ConversionError("No table found in the Markdown text.")
+    return page
+
+def _convert_styled(text, params):
+    styled = _converters['styled']
+    virtual = _flag(params, 'virtual')
+    assets = styled.page_assets(None, virtual)
+    page = styled.THEME.render_text(text, assets=assets, virtual=virtual)
+    if page is None:
+        raise ConversionError("No table found in the Markdown text.")
+    return page
+
+def _convert_cube(text, params):
+    # 預設輸出檔案中的主要類型；name 參數可指定其他類型（巢狀類型使用 Outer.Inner）
+    cube = _converters['cube']
+    try:
+        parser = cube.SwiftStructClassParser('<request>', text)
+    except ValueError as e:
+        raise ConversionError(str(e))
+    # 以只含這份原始碼的類型索引解析父類型與子類型
+    index = cube.SwiftTypeIndex()
+    index.update('<request>', [0, 0], parser.get_infos())
+    relations, = index.relations().values()
+    name = params.get('name')
+    if name is None:
+        return cube.generate_html(parser.get_info(), relations=relations)
+    for info in parser.get_infos():
+        if info['name'] == name:
+            return cube.generate_html(info, relations=relations)
+    raise ConversionError(f"找不到類型 '{name}'")
+
+def _convert_indent(text, params):
+    indent = _converters['indent']
+    language = params.get('lang', indent.DEFAULT_LANGUAGE)
+    if language not in indent.LANGUAGE_PROFILES:
+        raise ConversionError(f"不支援的語言 '{language}'")
+    lines = text.split('\n')
+    if not lines[-1]:
+        lines.pop()
+    lines = indent.IndentScanner(language).indent_lines(lines)
+    lines.append('')
+    return '\n'.join(lines)
+
+CONVERTERS = {
+    'disney': (_convert_disney, 'text/html; charset=utf-8'),
+    'styled': (_convert_styled, 'text/html; charset=utf-8'),
+    'cube': (_convert_cube, 'text/html; charset=utf-8'),
+    'indent': (_convert_indent, 'text/plain; charset=utf-8'),
+}
+
+def convert(kind, body, params):
+    # 在工作行程中執行：解碼請求內容（換行規則與讀檔相同），回傳 (狀態碼, 內容)
+    convert_text, _ = CONVERTERS[kind]
+    try:
+        text = body.decode('utf-8')
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return 200, convert_text(text, params).encode('utf-8')
+    except (ConversionError, UnicodeDecodeError) as e:
+        return 422, f"{e}\n".encode('utf-8')
+
+class ConversionServer:
+    # asyncio 前端只負責 HTTP 解析與回應，CPU 密集的轉換交給預熱過的工作行程池
+    def __init__(self, jobs=None, max_body_bytes=256 * 1024 * 1024):
+        # 匯入 ProcessPoolExecutor 會連帶載入 multiprocessing，只在真的啟動服務時才匯入，顯示說明不必等待
+        from concurrent.futures import ProcessPoolExecutor
+        self.workers = jobs or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(self.workers, initializer=ai_tools.picklable(_warm_up))
+        self.max_body_bytes = max_body_bytes
+
+    async def handle(self, reader, writer):
+        import asyncio
+        # 同一個連線可以連續送出多個請求（HTTP/1.1 keep-alive）
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    await self.respond(writer, 400, b'Malformed request line', False)
+                    break
+                method, target, version = parts
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                status, payload, content_type = await self.dispatch(method, target, headers, reader)
+                if status in (411, 413):
+                    # 請求內容沒有被讀取，連線無法再使用
+                    keep_alive = False
+                await self.respond(writer, status, payload, keep_alive, content_type)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, headers, reader):
+        import asyncio
+        from urllib.parse import parse_qs, urlsplit
+        url = urlsplit(target)
+        kind = url.path.strip('/')
+        if method == 'GET' and kind == 'health':
+            return 200, b'ok\n', 'text/plain; charset=utf-8'
+        if kind not in CONVERTERS:
+            return 404, f"Unknown converter; use one of: {', '.join(CONVERTERS)}\n".encode('utf-8'), None
+        if method != 'POST':
+            return 405, b'Use POST with the source in the request body\n', None
+        if not headers.get('content-length', '').isdigit():
+            return 411, b'Content-Length is required\n', None
+        length = int(headers['content-length'])
+        if length > self.max_body_bytes:
+            return 413, b'Request body too large\n', None
+        body = await reader.readexactly(length)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+
+        loop = asyncio.get_running_loop()
+        try:
+            status, payload = await loop.run_in_executor(self.pool, ai_tools.picklable(convert), kind, body, params)
+        except Exception as e:
+            return 500, f"{type(e).__name__}: {e}\n".encode('utf-8'), None
+        content_type = CONVERTERS[kind][1] if status == 200 else None
+        return status, payload, content_type
+
+    async def respond(self, writer, status, payload, keep_alive, content_type=None):
+        # 以固定大小的區塊寫出並等待 drain，慢速的用戶端不會讓整份結果堆在傳送緩衝區
+        head = (f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                f"Content-Type: {content_type or 'text/plain; charset=utf-8'}\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1'))
+        view = memoryview(payload)
+        for start in range(0, len(payload), RESPONSE_CHUNK_SIZE):
+            writer.write(view[start:start + RESPONSE_CHUNK_SIZE])
+            await writer.drain()
+        await writer.drain()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None):
+        import asyncio
+        # 先啟動所有工作行程並完成預熱，第一個請求就不必等待匯入
+        loop = asyncio.get_running_loop()
+        workers = self.workers
+        ready = ai_tools.picklable(_ready)
+        await asyncio.gather(*(loop.run_in_executor(self.pool, ready) for _ in range(workers)))
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle, path=unix_path)
+            print(f"轉換服務已啟動：unix:{unix_path}（{workers} 個工作行程）")
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+            print(f"轉換服務已啟動：http://{host}:{port}（{workers} 個工作行程）")
+        sys.stdout.flush()
+
+        # SIGINT / SIGTERM 時停止接受連線並正常結束，Unix socket 檔案由 main 清除
+        stopped = loop.create_future()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, lambda: stopped.done() or stopped.set_result(None))
+        async with server:
+            await stopped
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="常駐的轉換服務：POST /disney、/styled（Markdown）、/cube（Swift）、/indent（原始碼），回應轉換結果")
+    parser.add_argument("--host", default="127.0.0.1", help="監聽的位址（預設 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=8765, help="監聽的埠號（預設 8765）")
+    parser.add_argument("--unix", metavar="PATH", help="改為監聽 Unix socket")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="工作行程數（預設為 CPU 數量）")
+    parser.add_argument("--max-body-mb", type=float, default=256, help="請求內容大小上限（MB，預設 256）")
+    args = parser.parse_args()
+
+    # asyncio 本身的匯入就超過啟動預算，只在真的啟動服務時才匯入
+    import asyncio
+    server = ConversionServer(args.jobs, int(args.max_body_mb * 1024 * 1024))
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    finally:
+        server.pool.shutdown(cancel_futures=True)
+        if args.unix and os.path.exists(args.unix):
+            os.remove(args.unix)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""各轉換腳本共用的輸入讀取工具：收集輸入檔，並以記憶體映射讀檔，避免整份輸入被複製多次。"""
+import codecs
+import io
+import mmap
+import os
+import stat
+from contextlib import contextmanager
+
+BLOCK_SIZE = 1 << 20
+
+@contextmanager
+def _opened(path):
+    # path 可以是已開啟的二進位檔案，結束時不會關閉它
+    if hasattr(path, 'fileno'):
+        yield path
+        return
+    with open(path, 'rb') as f:
+        yield f
+
+def _is_regular(f):
+    return stat.S_ISREG(os.fstat(f.fileno()).st_mode)
+
+def is_stream(path):
+    # 標準輸入、FIFO 與 <(...) 等不是一般檔案的輸入無法映射，而且只能讀一次；
+    # 需要讀兩次的呼叫端應先讀入內容再重複使用
+    try:
+        return not stat.S_ISREG(os.stat(path).st_mode)
+    except OSError:
+        return False
+
+@contextmanager
+def spooled(path):
+    # 只能讀一次的輸入（見 is_stream）先複製到暫存檔，需要讀兩次以上或以映射讀取的呼叫端照常使用回傳的路徑；
+    # 一般檔案直接回傳原路徑。暫存檔在結束時刪除
+    if not is_stream(path):
+        yield path
+        return
+    import shutil
+    import tempfile
+    with open(path, 'rb') as source, tempfile.NamedTemporaryFile(suffix=os.path.splitext(path)[1], delete=False) as f:
+        shutil.copyfileobj(source, f, BLOCK_SIZE)
+    try:
+        yield f.name
+    finally:
+        os.unlink(f.name)
+
+@contextmanager
+def mapped(path):
+    # 以唯讀方式映射整個檔案；空檔案無法映射，改為提供空的 bytes；
+    # 不是一般檔案的輸入（見 is_stream）改為讀出全部內容。path 也可以是已開啟的二進位檔案，結束後不會關閉它
+    with _opened(path) as f:
+        if not _is_regular(f):
+            yield f.read()
+            return
+        with _map_file(f) as data:
+            yield data
+
+@contextmanager
+def _map_file(f):
+    if os.fstat(f.fileno()).st_size == 0:
+        yield b''
+        return
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            data.madvise(mmap.MADV_SEQUENTIAL)
+        yield data
+
+def _release(data, start, end):
+    # 已處理完的分頁交還給作業系統（仍留在 page cache），
+    # 否則循序掃描大檔時映射的分頁會一直計入行程的 RSS
+    if not hasattr(mmap, 'MADV_DONTNEED') or not isinstance(data, mmap.mmap):
+        return
+    start -= start % mmap.PAGESIZE
+    end -= end % mmap.PAGESIZE
+    if end > start:
+        data.madvise(mmap.MADV_DONTNEED, start, end - start)
+
+def _normalize_newlines(text):
+    # 與文字模式讀檔相同，\r\n 與 \r 都視為 \n
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def decode_text(data, encoding='utf-8'):
+    return _normalize_newlines(str(data, encoding))
+
+def read_text(path, encoding='utf-8'):
+    # 直接從映射區解碼成字串，不需要先讀出一份完整的 bytes
+    with mapped(path) as data:
+        return decode_text(data, encoding)
+
+def iter_line_batches(path, encoding='utf-8', block_size=BLOCK_SIZE):
+    # 每次解碼約 block_size 位元組（在換行處切開），產生一批不含換行字元的行；
+    # 任何時刻只有一個區塊以字串形式存在。檔尾沒有換行時最後一行仍會產生。path 可以是已開啟的二進位檔案
+    with _opened(path) as f:
+        if not _is_regular(f):
+            yield from iter_stream_line_batches(f, encoding, block_size)
+            return
+        with _map_file(f) as data:
+            size = len(data)
+            start = 0
+            while start < size:
+                end = start + block_size
+                if end < size:
+                    newline = data.rfind(b'\n', start, end)
+                    if newline == -1:
+                        newline = data.find(b'\n', end)
+                    end = size if newline == -1 else newline + 1
+                else:
+                    end = size
+                lines = decode_text(data[start:end], encoding).split('\n')
+                if not lines[-1]:
+                    lines.pop()
+                if lines:
+                    yield lines
+                _release(data, start, end)
+                start = end
+
+def iter_stream_line_batches(f, encoding='utf-8', block_size=BLOCK_SIZE):
+    # 無法映射的輸入（標準輸入、管線）：以大區塊讀取二進位資料並逐步解碼，換行規則與文字模式相同（\r\n、\r 都視為 \n）；
+    # 每個區塊產生一批完整的行，記憶體用量只與區塊大小和最長的一行有關
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder(encoding)(), translate=True)
+    pending = ''
+    while True:
+        chunk = f.read(block_size)
+        text = decoder.decode(chunk, final=not chunk)
+        if text:
+            lines = (pending + text).split('\n')
+            pending = lines.pop()
+            if lines:
+                yield lines
+        if not chunk:
+            break
+    if pending:
+        yield [pending]
+
+def iter_lines(path, encoding='utf-8', block_size=BLOCK_SIZE):
+    for lines in iter_line_batches(path, encoding, block_size):
+        yield from lines
+
+def read_range_lines(path, start, end, encoding='utf-8'):
+    # 解碼 [start, end) 範圍內的行；範圍的起點必須位於行首
+    with mapped(path) as data:
+        lines = decode_text(data[start:end], encoding).split('\n')
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+def collect_files(patterns, suffixes):
+    # 目錄會遞迴搜尋副檔名（不分大小寫）在 suffixes 中的檔案並略過隱藏目錄，其餘參數視為檔案路徑或 glob 樣式；
+    # 同一個檔案只回傳一次
+    import glob
+    found = {}
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, dirs, files in os.walk(pattern):
+                dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+                for name in sorted(files):
+                    if name.lower().endswith(suffixes):
+                        path = os.path.join(root, name)
+                        found.setdefault(os.path.abspath(path), path)
+        else:
+            for path in sorted(glob.glob(pattern, recursive=True)):
+                if os.path.isfile(path):
+                    found.setdefault(os.path.abspath(path), path)
+    return list(found.values())
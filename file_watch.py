@@ -0,0 +1,171 @@
+"""監看輸入檔的變更：Linux 上以 inotify（透過 ctypes）等待事件，其他平台改為定期輪詢。
+
+連續存檔會先合併（debounce），而且只回報內容真的改變的檔案，呼叫端只需重新產生受影響的輸出。
+"""
+import os
+import select
+import struct
+import sys
+import time
+
+import fast_io
+
+DEFAULT_DEBOUNCE = 0.2
+DEFAULT_POLL_INTERVAL = 0.5
+
+# 編輯器存檔時常以「寫入暫存檔再改名」取代原檔，因此監看的是所在目錄而不是檔案本身
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+class _InotifyBackend:
+    def __init__(self, directories):
+        # ctypes 只有真的要監看時才載入，不拖慢一般轉換的啟動時間
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._get_errno = ctypes.get_errno
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(self._get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            self.add(directory)
+
+    def add(self, directory):
+        wd = self._add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            raise OSError(self._get_errno(), f"inotify_add_watch failed for {directory}")
+        self.directories[wd] = directory
+
+    def wait(self, timeout):
+        # 等待最多 timeout 秒（None 表示一直等），回傳有事件的檔案路徑
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        paths = set()
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if name and wd in self.directories:
+                    paths.add(os.path.join(self.directories[wd], os.fsdecode(name)))
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+class _PollingBackend:
+    def __init__(self, directories, interval=DEFAULT_POLL_INTERVAL):
+        self.interval = interval
+        self.directories = set()
+        self.snapshot = {}
+        for directory in directories:
+            self.add(directory)
+
+    def _scan(self, directory):
+        entries = {}
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            pass
+        return entries
+
+    def add(self, directory):
+        self.directories.add(directory)
+        self.snapshot.update(self._scan(directory))
+
+    def wait(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = {}
+            for directory in self.directories:
+                current.update(self._scan(directory))
+            changed = {path for path in current.keys() | self.snapshot.keys()
+                       if current.get(path) != self.snapshot.get(path)}
+            self.snapshot = current
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+    def close(self):
+        pass
+
+def _digest(path):
+    # 內容雜湊；檔案不存在時回傳 None
+    import hashlib
+    try:
+        with fast_io.mapped(path) as data:
+            return hashlib.sha1(data).digest()
+    except OSError:
+        return None
+
+class FileWatcher:
+    # files 為要監看的檔案；suffixes 不為 None 時，這些檔案所在目錄中新出現、符合副檔名的檔案也會回報
+    def __init__(self, files, suffixes=None, debounce=DEFAULT_DEBOUNCE, poll_interval=DEFAULT_POLL_INTERVAL,
+                 polling=False):
+        self.debounce = debounce
+        self.suffixes = tuple(suffixes) if suffixes else None
+        self.digests = {os.path.abspath(path): _digest(path) for path in files}
+        directories = sorted({os.path.dirname(path) for path in self.digests})
+        self.backend = None
+        if not polling and sys.platform.startswith('linux'):
+            try:
+                self.backend = _InotifyBackend(directories)
+                self.backend_name = 'inotify'
+            except (OSError, AttributeError):
+                self.backend = None
+        if self.backend is None:
+            self.backend = _PollingBackend(directories, poll_interval)
+            self.backend_name = '輪詢'
+
+    def _relevant(self, path):
+        return path in self.digests or (self.suffixes is not None and path.endswith(self.suffixes))
+
+    def changes(self):
+        # 每次產生一批內容有變更的檔案（絕對路徑、已排序）；只存檔但內容沒變的不算
+        try:
+            while True:
+                paths = {path for path in self.backend.wait(None) if self._relevant(path)}
+                if not paths:
+                    continue
+                # 事件停止 debounce 秒後才處理，一次存檔觸發的多個事件只處理一次
+                while True:
+                    more = self.backend.wait(self.debounce)
+                    if not more:
+                        break
+                    paths.update(path for path in more if self._relevant(path))
+                changed = []
+                for path in sorted(paths):
+                    digest = _digest(path)
+                    if digest != self.digests.get(path):
+                        self.digests[path] = digest
+                        changed.append(path)
+                if changed:
+                    yield changed
+        finally:
+            self.backend.close()
@@ -0,0 +1,64 @@
+"""頁面的內嵌資源：把本機字型檔轉成 base64 @font-face，並只保留頁面實際用到的字元。"""
+import base64
+import io
+import os
+import re
+import sys
+
+import fast_io
+
+WEB_FONT_IMPORT = re.compile(r"[ \t]*@import url\('https://fonts\.googleapis\.com/[^']*'\);\n")
+FONT_FORMATS = {'.ttf': 'truetype', '.otf': 'opentype', '.woff': 'woff', '.woff2': 'woff2'}
+FONT_MIME_TYPES = {'truetype': 'font/ttf', 'opentype': 'font/otf', 'woff': 'font/woff', 'woff2': 'font/woff2'}
+
+def used_characters(path, extra=''):
+    # 以記憶體映射逐塊掃過輸入檔，收集出現過的字元；Markdown 語法字元也會算進去，子集只會稍大一點。
+    # extra 為標題等不在檔案中的文字。模板會以 CSS 轉換大小寫（表頭、text-transform: uppercase），
+    # 所以連同標題一起加入大寫與小寫形式（大寫可能不只一個字元，例如 ß → SS）
+    characters = set(extra)
+    for lines in fast_io.iter_line_batches(path):
+        characters.update(''.join(lines))
+    text = ''.join(characters)
+    characters.update(text.upper())
+    characters.update(text.lower())
+    characters.add(' ')
+    return characters
+
+def subset_font(font_path, characters=None):
+    # 回傳 (字型資料, 格式)。fontTools 為選用套件：未安裝或不需子集時嵌入完整字型檔
+    font_format = FONT_FORMATS.get(os.path.splitext(font_path)[1].lower(), 'truetype')
+    if characters is not None:
+        try:
+            from fontTools import subset
+        except ImportError:
+            print("未安裝 fontTools，嵌入完整字型檔（pip install fonttools 可只保留用到的字元）", file=sys.stderr)
+        else:
+            options = subset.Options()
+            try:
+                import brotli  # noqa: F401  woff2 壓縮需要 brotli
+                options.flavor = 'woff2'
+            except ImportError:
+                options.flavor = 'woff'
+            font = subset.load_font(font_path, options)
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(text=''.join(sorted(characters)))
+            subsetter.subset(font)
+            buffer = io.BytesIO()
+            subset.save_font(font, buffer, options)
+            return buffer.getvalue(), options.flavor
+    with open(font_path, 'rb') as f:
+        return f.read(), font_format
+
+def font_face_css(family, font_path, characters=None, indent='            '):
+    # 產生內嵌字型的 @font-face 規則，縮排與頁面模板中的 CSS 一致
+    data, font_format = subset_font(font_path, characters)
+    encoded = base64.b64encode(data).decode('ascii')
+    return (f"{indent}@font-face {{\n"
+            f"{indent}    font-family: '{family}';\n"
+            f"{indent}    src: url(data:{FONT_MIME_TYPES[font_format]};base64,{encoded}) format('{font_format}');\n"
+            f"{indent}    font-display: swap;\n"
+            f"{indent}}}\n")
+
+def embed_font(css, font_css):
+    # 把樣式開頭的 Google Fonts @import 換成內嵌字型，頁面不再需要任何網路請求
+    return WEB_FONT_IMPORT.sub(lambda match: font_css, css, count=1)
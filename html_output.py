@@ -0,0 +1,140 @@
+"""產生頁面的輸出格式：預先切好的模板片段、精簡模式（移除模板縮排、壓縮 CSS/JS）與同時寫出的 .gz/.br 預先壓縮副本。"""
+import re
+import string
+import sys
+
+ENCODINGS = ('gz', 'br')
+GZIP_LEVEL = 9
+# 品質 11 在大型頁面上慢一個數量級，壓縮率只多幾個百分點
+BROTLI_QUALITY = 9
+
+CSS_STRING_OR_COMMENT = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|/\*.*?\*/''', re.DOTALL)
+CSS_STRING = re.compile(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''')
+CSS_SPACE = re.compile(r'\s+')
+CSS_PUNCTUATION = re.compile(r' ?([{};,>]) ?')
+MARKUP_SPACE = re.compile(r'\s{2,}')
+
+def _minify_css_code(code):
+    code = CSS_SPACE.sub(' ', code)
+    code = CSS_PUNCTUATION.sub(r'\1', code)
+    return code.replace(': ', ':').replace(';}', '}')
+
+def minify_css(css):
+    # 移除註解與多餘的空白；字串（含 url() 中加引號的 data URL）保持原樣。
+    # 選擇器中冒號前的空白有意義（後代選擇器），只移除冒號後的空白
+    css = CSS_STRING_OR_COMMENT.sub(lambda match: match.group(1) or ' ', css)
+    parts = CSS_STRING.split(css)
+    for index in range(0, len(parts), 2):
+        parts[index] = _minify_css_code(parts[index])
+    return ''.join(parts).strip()
+
+def minify_js(js):
+    # 只移除縮排、空行與整行的 // 註解，保留換行以免改變自動補分號的結果；
+    # 頁面腳本中沒有跨行的字串或樣板字串，逐行處理是安全的
+    lines = (line.strip() for line in js.split('\n'))
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+def compact_markup(markup):
+    # 把連續的空白（換行與縮排）合併成單一字元；連續空白在顯示上等同單一空白，頁面外觀不變
+    return MARKUP_SPACE.sub(lambda match: '\n' if '\n' in match.group() else ' ', markup)
+
+def compile_template(template):
+    # 在模組載入時把頁面模板切成 (靜態文字, 欄位名稱) 片段，渲染時只需串接
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+def compact_chunks(chunks):
+    # 把預先切好的模板片段精簡化；開頭的空行一併移除
+    compacted = [(compact_markup(literal), field) for literal, field in chunks]
+    if compacted:
+        literal, field = compacted[0]
+        compacted[0] = (literal.lstrip(), field)
+    return compacted
+
+def script_json(value):
+    # 精簡的 JSON，可直接放進 <script type="application/json">：內容不能出現 </script> 或 <!--
+    import json
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/').replace('<!--', '\\u003c!--')
+
+def available_encodings(encodings):
+    # 去除重複的壓縮格式；br 需要選用的 brotli 套件，未安裝時略過 .br 副本
+    available = []
+    for encoding in encodings or ():
+        if encoding in available:
+            continue
+        if encoding == 'br':
+            try:
+                import brotli  # noqa: F401
+            except ImportError:
+                print("未安裝 brotli，略過 .br 副本（pip install brotli 可一併產生）", file=sys.stderr)
+                continue
+        available.append(encoding)
+    return tuple(available)
+
+def _gzip_stream(target):
+    # mtime 固定為 0，相同內容產生相同的 .gz，靜態主機的 ETag 不會因重新產生而改變
+    import gzip
+    stream = gzip.GzipFile(filename='', mode='wb', compresslevel=GZIP_LEVEL, fileobj=target, mtime=0)
+    return stream.write, stream.close
+
+def _brotli_stream(target):
+    import brotli
+    compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=BROTLI_QUALITY)
+    return (lambda data: target.write(compressor.process(data))), (lambda: target.write(compressor.finish()))
+
+STREAMS = {'gz': _gzip_stream, 'br': _brotli_stream}
+
+class PrecompressedFile:
+    # 與文字檔相同的 write/writelines 介面：每一段內容編碼成 UTF-8 後同時寫入輸出檔與各個壓縮副本，
+    # 壓縮以串流方式隨寫入進行，不必寫完後再把輸出檔讀回來
+    def __init__(self, path, encodings):
+        self._targets = []
+        self._streams = []
+        self._file = open(path, 'wb')
+        try:
+            for encoding in encodings:
+                target = open(f"{path}.{encoding}", 'wb')
+                self._targets.append(target)
+                self._streams.append(STREAMS[encoding](target))
+        except BaseException:
+            self._close_files()
+            raise
+
+    def write(self, text):
+        data = text.encode('utf-8')
+        self._file.write(data)
+        for write, _ in self._streams:
+            write(data)
+        return len(text)
+
+    def writelines(self, pieces):
+        for piece in pieces:
+            self.write(piece)
+
+    def _close_files(self):
+        for target in self._targets:
+            target.close()
+        self._file.close()
+
+    def close(self):
+        try:
+            for _, finish in self._streams:
+                finish()
+        finally:
+            self._close_files()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+def open_output(path, encodings=()):
+    # 沒有要求預先壓縮時直接開啟一般的文字檔
+    if not encodings:
+        return open(path, 'w', encoding='utf-8')
+    return PrecompressedFile(path, encodings)
+
+def output_paths(path, encodings=()):
+    # 輸出檔與其壓縮副本的路徑
+    return [path] + [f"{path}.{encoding}" for encoding in encodings]
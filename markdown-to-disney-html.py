@@ -1,34 +1,15 @@
-import markdown
-import re
-from bs4 import BeautifulSoup
 import argparse
 import os
+import sys
 
-def markdown_to_disney_html(markdown_text, title):
-    # Convert Markdown to HTML
-    html = markdown.markdown(markdown_text, extensions=['tables'])
-    
-    # Parse the HTML
-    soup = BeautifulSoup(html, 'html.parser')
-    
-    # Find the table
-    table = soup.find('table')
-    
-    if not table:
-        return "No table found in the Markdown text."
-    
-    # Create the HTML structure
-    html_structure = f"""
-    <!DOCTYPE html>
-    <html lang="zh-CN">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>{title}</title>
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Nunito:wght@400;700&display=swap');
+import html_output
+import markdown_tables
+import markdown_themes
+import stage_timer
+
+DISNEY_CSS = """            @import url('https://fonts.googleapis.com/css2?family=Nunito:wght@400;700&display=swap');
 
-            body {{
+            body {
                 font-family: 'Nunito', sans-serif;
                 background-color: #e6f3ff;
                 display: flex;
@@ -37,8 +18,8 @@ def markdown_to_disney_html(markdown_text, title):
                 min-height: 100vh;
                 margin: 0;
                 background-image: url("data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='100' height='100' viewBox='0 0 100 100'%3E%3Cg fill-rule='evenodd'%3E%3Cg fill='%23ffffff' fill-opacity='0.4'%3E%3Cpath opacity='.5' d='M96 95h4v1h-4v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4h-9v4h-1v-4H0v-1h15v-9H0v-1h15v-9H0v-1h15v-9H0v-1h15v-9H0v-1h15v-9H0v-1h15v-9H0v-1h15v-9H0v-1h15v-9H0v-1h15V0h1v15h9V0h1v15h9V0h1v15h9V0h1v15h9V0h1v15h9V0h1v15h9V0h1v15h9V0h1v15h9V0h1v15h4v1h-4v9h4v1h-4v9h4v1h-4v9h4v1h-4v9h4v1h-4v9h4v1h-4v9h4v1h-4v9h4v1h-4v9zm-1 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-9-10h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm9-10v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-9-10h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm9-10v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-9-10h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm9-10v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-10 0v-9h-9v9h9zm-9-10h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9zm10 0h9v-9h-9v9z'/%3E%3Cpath d='M6 5V0H5v5H0v1h5v94h1V6h94V5H6z'/%3E%3C/g%3E%3C/g%3E%3C/svg%3E");
-            }}
-            .container {{
+            }
+            .container {
                 background-color: #fff;
                 border-radius: 30px;
                 box-shadow: 0 0 30px rgba(0, 0, 0, 0.1);
@@ -47,8 +28,8 @@ def markdown_to_disney_html(markdown_text, title):
                 width: 95%;
                 margin: 20px;
                 position: relative;
-            }}
-            .container::before {{
+            }
+            .container::before {
                 content: '';
                 position: absolute;
                 top: -20px;
@@ -60,116 +41,295 @@ def markdown_to_disney_html(markdown_text, title):
                 border-radius: 40px;
                 filter: blur(20px);
                 opacity: 0.7;
-            }}
-            h1 {{
+            }
+            h1 {
                 text-align: center;
                 color: #ff6b6b;
                 margin: 30px 0;
                 font-size: 32px;
                 text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.1);
-            }}
-            table {{
+            }
+            table {
                 width: 100%;
                 border-collapse: separate;
                 border-spacing: 0;
                 margin-bottom: 30px;
-            }}
-            th, td {{
+            }
+            th, td {
                 padding: 15px;
                 text-align: left;
                 border-bottom: 2px solid #e0e0e0;
                 position: relative;
                 overflow: hidden;
-            }}
-            th {{
+            }
+            th {
                 background-color: #feca57;
                 color: white;
                 font-weight: bold;
                 text-transform: uppercase;
                 letter-spacing: 1px;
-            }}
-            tr:nth-child(even) {{
+            }
+            tr:nth-child(even) {
                 background-color: #f0f8ff;
-            }}
-            tr:hover {{
+            }
+            tr:hover {
                 background-color: #e6f3ff;
                 transform: scale(1.02);
                 transition: all 0.3s ease;
                 box-shadow: 0 5px 15px rgba(0, 0, 0, 0.1);
-            }}
-            .swiftui {{
+            }
+            .table-title {
+                color: #48dbfb;
+                margin: 20px 0 10px;
+                font-size: 24px;
+            }
+            .table-title a {
+                color: inherit;
+                text-decoration: none;
+            }
+            .swiftui {
                 color: #ff6b6b;
-            }}
-            .uikit {{
+            }
+            .uikit {
                 color: #48dbfb;
-            }}
+            }
             .mickey-ears::before,
-            .mickey-ears::after {{
+            .mickey-ears::after {
                 content: '●';
                 font-size: 20px;
                 position: relative;
                 top: -15px;
                 margin: 0 10px;
-            }}
-            .sparkle {{
+            }
+            .sparkle-layer {
+                position: absolute;
+                top: 0;
+                left: 0;
+                right: 0;
+                bottom: 0;
+                overflow: hidden;
+                pointer-events: none;
+                contain: strict;
+            }
+            .sparkle {
                 position: absolute;
                 background-color: white;
                 width: 5px;
                 height: 5px;
                 border-radius: 50%;
-                animation: twinkle 1.5s infinite;
-            }}
-            @keyframes twinkle {{
-                0%, 100% {{ opacity: 0; transform: scale(0.5); }}
-                50% {{ opacity: 1; transform: scale(1); }}
-            }}
-        </style>
-    </head>
+                opacity: 0;
+                will-change: opacity, transform;
+            }
+"""
+
+DISNEY_JS = """            (function () {
+                // A fixed pool of sparkles in their own layer, animated by one requestAnimationFrame loop:
+                // no elements are created or removed after start-up and the loop stops while the tab is hidden
+                const SPARKLE_COUNT = 6;
+                const SPARKLE_LIFETIME = 1500;
+                const SPAWN_INTERVAL = 300;
+                const layer = document.createElement('div');
+                layer.className = 'sparkle-layer';
+                const pool = [];
+                for (let i = 0; i < SPARKLE_COUNT; i++) {
+                    const element = document.createElement('div');
+                    element.className = 'sparkle';
+                    layer.appendChild(element);
+                    pool.push({ element: element, start: -Infinity });
+                }
+                document.querySelector('.container').appendChild(layer);
+
+                let frame = 0;
+                let lastSpawn = -Infinity;
+                function tick(now) {
+                    if (now - lastSpawn >= SPAWN_INTERVAL) {
+                        const idle = pool.find(sparkle => now - sparkle.start >= SPARKLE_LIFETIME);
+                        if (idle) {
+                            idle.start = now;
+                            idle.element.style.left = Math.random() * 100 + '%';
+                            idle.element.style.top = Math.random() * 100 + '%';
+                        }
+                        lastSpawn = now;
+                    }
+                    for (const sparkle of pool) {
+                        const progress = (now - sparkle.start) / SPARKLE_LIFETIME;
+                        const phase = progress < 1 ? Math.sin(progress * Math.PI) : 0;
+                        sparkle.element.style.opacity = phase;
+                        sparkle.element.style.transform = 'scale(' + (0.5 + phase / 2) + ')';
+                    }
+                    frame = requestAnimationFrame(tick);
+                }
+                function start() {
+                    if (!frame && !document.hidden) {
+                        frame = requestAnimationFrame(tick);
+                    }
+                }
+                document.addEventListener('visibilitychange', () => {
+                    if (document.hidden) {
+                        cancelAnimationFrame(frame);
+                        frame = 0;
+                    } else {
+                        start();
+                    }
+                });
+                start();
+            })();
+"""
+DISNEY_PAGE_TEMPLATE = """
+    <!DOCTYPE html>
+    <html lang="zh-CN">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{title}</title>
+{styles}    </head>
     <body>
         <div class="container">
             <h1 class="mickey-ears">{title}</h1>
-            {table.prettify()}
+            {tables}
         </div>
-        <script>
-            function createSparkle() {{
-                const sparkle = document.createElement('div');
-                sparkle.className = 'sparkle';
-                sparkle.style.left = Math.random() * 100 + '%';
-                sparkle.style.top = Math.random() * 100 + '%';
-                sparkle.style.animationDelay = Math.random() * 2 + 's';
-                document.querySelector('.container').appendChild(sparkle);
-                setTimeout(() => sparkle.remove(), 1500);
-            }}
-            setInterval(createSparkle, 300);
-        </script>
-    </body>
+{scripts}    </body>
     </html>
     """
-    
-    return html_structure
+
+DISNEY_CSS_FILE = 'disney-style.css'
+DISNEY_JS_FILE = 'disney-style.js'
+INLINE_STYLES = f"        <style>\n{DISNEY_CSS}        </style>\n"
+INLINE_SCRIPTS = f"        <script>\n{DISNEY_JS}        </script>\n"
+
+DISNEY_PAGE_CHUNKS = html_output.compile_template(DISNEY_PAGE_TEMPLATE)
+DISNEY_COMPACT_CHUNKS = html_output.compact_chunks(DISNEY_PAGE_CHUNKS)
+
+def page_assets(assets_href=None, virtual=False, animation=True, css=DISNEY_CSS, compact=False):
+    # Returns the (styles, scripts) HTML shared by every page of a run.
+    # assets_href is the relative directory of the shared CSS/JS files; None inlines them;
+    # animation=False leaves out the sparkle script; css replaces the stylesheet (e.g. with an embedded font);
+    # compact minifies the inlined CSS/JS and drops the indentation
+    if compact:
+        if assets_href is None:
+            styles = f"<style>{html_output.minify_css(css)}</style>\n"
+            scripts = f"<script>{html_output.minify_js(DISNEY_JS)}</script>\n"
+        else:
+            styles = f'<link rel="stylesheet" href="{assets_href}{DISNEY_CSS_FILE}">\n'
+            scripts = f'<script src="{assets_href}{DISNEY_JS_FILE}"></script>\n'
+    elif assets_href is None:
+        styles = INLINE_STYLES if css is DISNEY_CSS else f"        <style>\n{css}        </style>\n"
+        scripts = INLINE_SCRIPTS
+    else:
+        styles = f'        <link rel="stylesheet" href="{assets_href}{DISNEY_CSS_FILE}">\n'
+        scripts = f'        <script src="{assets_href}{DISNEY_JS_FILE}"></script>\n'
+    if not animation:
+        scripts = ''
+    if virtual:
+        # Virtual tables need the scroll container styles and the windowing script
+        virtual_styles, virtual_scripts = markdown_tables.virtual_page_assets(assets_href, compact)
+        styles += virtual_styles
+        scripts += virtual_scripts
+    return styles, scripts
+
+def write_assets(output_dir, virtual=False, animation=True, css=DISNEY_CSS, compact=False, encodings=()):
+    # Write the shared CSS/JS once so that every generated page can reference them;
+    # compact minifies them and encodings adds precompressed siblings (e.g. disney-style.css.gz)
+    os.makedirs(output_dir, exist_ok=True)
+    assets = [(DISNEY_CSS_FILE, html_output.minify_css(css) if compact else css)]
+    scripts = []
+    if animation:
+        scripts.append((DISNEY_JS_FILE, DISNEY_JS))
+    if virtual:
+        scripts.append((markdown_tables.VIRTUAL_TABLE_JS_FILE, markdown_tables.VIRTUAL_TABLE_JS))
+    assets.extend((filename, html_output.minify_js(js) if compact else js) for filename, js in scripts)
+    for filename, content in assets:
+        with html_output.open_output(os.path.join(output_dir, filename), encodings) as f:
+            f.write(content)
+
+def _asset_options(args):
+    # Theme-specific command-line options passed on to page_assets and write_assets
+    return {'animation': not args.no_animation}
+
+# The Disney look, shared by this script, the conversion server and the multi-theme converter
+# (markdown-to-themed-html.py); the '●' of the Mickey ears comes from the stylesheet, so an embedded font keeps it
+THEME = markdown_themes.register(markdown_themes.Theme(
+    'disney', 'disney_style', DISNEY_PAGE_CHUNKS, page_assets, write_assets, 'Table', DISNEY_COMPACT_CHUNKS,
+    css=DISNEY_CSS, font_family='Nunito', font_characters='●', asset_options=_asset_options))
+
+def markdown_to_disney_html(markdown_text, title, assets_href=None):
+    # Single-page conversion of every table in the document
+    page = THEME.render_text(markdown_text, title, page_assets(assets_href))
+    return "No table found in the Markdown text." if page is None else page
 
 def main():
     parser = argparse.ArgumentParser(description="Convert Markdown table to Disney-style HTML")
-    parser.add_argument("input_file", help="Input Markdown file name")
+    parser.add_argument("input_file", nargs='+',
+                        help="Input Markdown file name; with --batch, Markdown files, directories or glob patterns")
+    parser.add_argument("--batch", action="store_true",
+                        help="Convert every Markdown file found in the given directories, files or glob patterns "
+                             "over a process pool, skipping files whose output is newer than the input and was written with "
+                             "the same options (recorded in a <input>_<theme>.stamp file next to the output)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes in batch mode (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true",
+                        help="In batch mode, also convert the files whose output is up to date")
     parser.add_argument("--title", default="Table", help="Title for the HTML page")
+    parser.add_argument("--external-assets", action="store_true",
+                        help=f"Write the CSS/JS to {DISNEY_CSS_FILE} and {DISNEY_JS_FILE} next to the output and link them")
+    parser.add_argument("--split", action="store_true",
+                        help="Write one page per table, named after the table's anchor, instead of one page with every table")
+    parser.add_argument("--virtual", action="store_true",
+                        help="Embed the rows as JSON and render only the visible rows, for tables with many thousands of rows")
+    parser.add_argument("--no-animation", action="store_true",
+                        help="Leave out the sparkle animation, e.g. for very large tables")
+    parser.add_argument("--font-file",
+                        help="Embed this local font (ttf/otf/woff/woff2) instead of importing Google Fonts; "
+                             "subset to the characters used when fontTools is installed")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write minified table markup and CSS/JS without the template indentation")
+    parser.add_argument("--precompress", action="append", choices=html_output.ENCODINGS, default=[],
+                        help="Also write a precompressed .gz or .br copy of every output file (may be repeated; "
+                             ".br needs the brotli package)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate the output whenever the content of the input file changes")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print the wall time and memory allocated by each stage (read, parse, render, write, ...) to stderr")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Profile the conversion with cProfile and write the pstats data to FILE")
     args = parser.parse_args()
+    args.precompress = html_output.available_encodings(args.precompress)
+    if args.batch:
+        if args.watch:
+            parser.error("--watch cannot be combined with --batch")
+        # The batch and watch modules are imported only when used, so that they do not slow down every start
+        import markdown_batch
+        sys.exit(markdown_batch.batch_convert(THEME, args.input_file, args))
+    if len(args.input_file) != 1:
+        parser.error("Only one input file can be converted at a time, use --batch for several")
+    args.input_file = args.input_file[0]
 
-    # Read the Markdown file
-    with open(args.input_file, 'r', encoding='utf-8') as f:
-        markdown_text = f.read()
-
-    # Convert Markdown to HTML
-    html_output = markdown_to_disney_html(markdown_text, args.title)
-
-    # Generate output file name
-    base_name = os.path.splitext(args.input_file)[0]
-    output_file = f"{base_name}_disney_style.html"
+    convert_file(args)
+    if args.watch:
+        try:
+            import file_watch
+            watcher = file_watch.FileWatcher([args.input_file])
+            print(f"Watching {args.input_file} for changes ({watcher.backend_name}), press Ctrl+C to stop")
+            for _ in watcher.changes():
+                if not os.path.exists(args.input_file):
+                    print(f"Input file was removed: {args.input_file}")
+                    continue
+                # A bad save (e.g. a half-written file) is reported and the next change is awaited
+                try:
+                    convert_file(args)
+                except (OSError, UnicodeDecodeError, ValueError) as e:
+                    print(f"An error occurred: {type(e).__name__}: {e}", file=sys.stderr, flush=True)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
 
-    # Save the HTML to a file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_output)
+def convert_file(args):
+    timer = stage_timer.StageTimer(args.timings)
+    with stage_timer.profiled(args.profile), timer:
+        output_files = markdown_themes.convert_file(THEME, args.input_file, args, timer)
 
-    print(f"HTML file has been generated: {output_file}")
+    for output_file in output_files:
+        print(f"HTML file has been generated: {output_file}", flush=True)
+    timer.report()
 
 if __name__ == "__main__":
     main()
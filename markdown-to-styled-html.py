@@ -1,32 +1,15 @@
-import markdown
+import argparse
+import os
 import sys
-import re
 
-def markdown_table_to_html(markdown_text):
-    # 將 Markdown 轉換為 HTML
-    html = markdown.markdown(markdown_text, extensions=['tables'])
-    
-    # 提取表格內容
-    table_pattern = r'<table>(.*?)</table>'
-    table_match = re.search(table_pattern, html, re.DOTALL)
-    
-    if not table_match:
-        return "No table found in the Markdown text."
-    
-    table_content = table_match.group(1)
-    
-    # 創建完整的 HTML 頁面
-    styled_html = f"""
-    <!DOCTYPE html>
-    <html lang="zh-TW">
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>酷炫現代風格的表格</title>
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap');
+import html_output
+import markdown_tables
+import markdown_themes
+import stage_timer
+
+STYLED_CSS = """            @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@300;400;700&display=swap');
 
-            body {{
+            body {
                 font-family: 'Roboto', sans-serif;
                 line-height: 1.6;
                 color: #e0e0e0;
@@ -40,8 +23,8 @@ def markdown_table_to_html(markdown_text):
                     linear-gradient(45deg, transparent 75%, #1a1a1a 75%),
                     linear-gradient(-45deg, transparent 75%, #1a1a1a 75%);
                 background-size: 20px 20px;
-            }}
-            h1 {{
+            }
+            h1 {
                 color: #bb86fc;
                 text-align: center;
                 margin-bottom: 40px;
@@ -49,20 +32,29 @@ def markdown_table_to_html(markdown_text):
                 letter-spacing: 2px;
                 text-transform: uppercase;
                 text-shadow: 0 0 10px rgba(187, 134, 252, 0.7);
-            }}
-            table {{
+            }
+            .table-title {
+                color: #03dac6;
+                margin-top: 40px;
+                letter-spacing: 1px;
+            }
+            .table-title a {
+                color: inherit;
+                text-decoration: none;
+            }
+            table {
                 width: 100%;
                 border-collapse: separate;
                 border-spacing: 0 15px;
                 background-color: transparent;
-            }}
-            th, td {{
+            }
+            th, td {
                 padding: 20px;
                 text-align: left;
                 background-color: #1e1e1e;
                 transition: all 0.3s ease;
-            }}
-            th {{
+            }
+            th {
                 background-color: #03dac6;
                 color: #000000;
                 font-weight: 700;
@@ -70,20 +62,20 @@ def markdown_table_to_html(markdown_text):
                 letter-spacing: 1px;
                 font-size: 16px;
                 clip-path: polygon(5% 0%, 100% 0%, 95% 100%, 0% 100%);
-            }}
-            tr {{
+            }
+            tr {
                 transform: perspective(1000px) rotateX(0deg);
                 transition: transform 0.3s ease;
-            }}
-            tr:hover {{
+            }
+            tr:hover {
                 transform: perspective(1000px) rotateX(5deg);
                 z-index: 10;
-            }}
-            td {{
+            }
+            td {
                 position: relative;
                 overflow: hidden;
-            }}
-            td::before {{
+            }
+            td::before {
                 content: '';
                 position: absolute;
                 top: 0;
@@ -93,54 +85,153 @@ def markdown_table_to_html(markdown_text):
                 background: linear-gradient(45deg, transparent, rgba(255, 255, 255, 0.1), transparent);
                 transform: translateX(-100%);
                 transition: 0.5s;
-            }}
-            tr:hover td::before {{
+            }
+            tr:hover td::before {
                 transform: translateX(100%);
-            }}
-            @media screen and (max-width: 768px) {{
-                table {{
+            }
+            @media screen and (max-width: 768px) {
+                table {
                     font-size: 14px;
-                }}
-                th, td {{
+                }
+                th, td {
                     padding: 15px;
-                }}
-            }}
-        </style>
-    </head>
+                }
+            }
+"""
+
+STYLED_PAGE_TEMPLATE = """
+    <!DOCTYPE html>
+    <html lang="zh-TW">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{title}</title>
+{styles}    </head>
     <body>
-        <h1>酷炫現代風格的表格</h1>
-        <table>
-            {table_content}
-        </table>
-    </body>
+        <h1>{title}</h1>
+        {tables}
+{scripts}    </body>
     </html>
     """
-    
-    return styled_html
+
+DEFAULT_TITLE = '酷炫現代風格的表格'
+STYLED_CSS_FILE = 'styled-table.css'
+INLINE_STYLES = f"        <style>\n{STYLED_CSS}        </style>\n"
+
+STYLED_PAGE_CHUNKS = html_output.compile_template(STYLED_PAGE_TEMPLATE)
+STYLED_COMPACT_CHUNKS = html_output.compact_chunks(STYLED_PAGE_CHUNKS)
+
+def page_assets(assets_href=None, virtual=False, css=STYLED_CSS, compact=False):
+    # 回傳同一次執行中所有頁面共用的 (樣式, 腳本) HTML。
+    # assets_href 為共用 CSS 檔所在目錄的相對路徑，None 表示內嵌 CSS；css 可替換樣式內容（例如內嵌字型）；
+    # compact 時內嵌的 CSS 經過壓縮，且不加縮排
+    if compact:
+        styles = (f"<style>{html_output.minify_css(css)}</style>\n" if assets_href is None
+                  else f'<link rel="stylesheet" href="{assets_href}{STYLED_CSS_FILE}">\n')
+    elif assets_href is None:
+        styles = INLINE_STYLES if css is STYLED_CSS else f"        <style>\n{css}        </style>\n"
+    else:
+        styles = f'        <link rel="stylesheet" href="{assets_href}{STYLED_CSS_FILE}">\n'
+    scripts = ''
+    if virtual:
+        # 虛擬捲動需要捲動容器的樣式與只渲染可見列的腳本
+        virtual_styles, scripts = markdown_tables.virtual_page_assets(assets_href, compact)
+        styles += virtual_styles
+    return styles, scripts
+
+def write_assets(output_dir, virtual=False, css=STYLED_CSS, compact=False, encodings=()):
+    # 共用的 CSS 只寫一次，所有頁面以相對路徑引用；compact 時壓縮內容，encodings 為要一併寫出的壓縮副本
+    os.makedirs(output_dir, exist_ok=True)
+    assets = [(STYLED_CSS_FILE, html_output.minify_css(css) if compact else css)]
+    if virtual:
+        js = markdown_tables.VIRTUAL_TABLE_JS
+        assets.append((markdown_tables.VIRTUAL_TABLE_JS_FILE, html_output.minify_js(js) if compact else js))
+    for filename, content in assets:
+        with html_output.open_output(os.path.join(output_dir, filename), encodings) as file:
+            file.write(content)
+
+# 暗色主題：本腳本、轉換服務與只解析一次文件的多主題轉換（markdown-to-themed-html.py）共用
+THEME = markdown_themes.register(markdown_themes.Theme(
+    'styled', 'styled', STYLED_PAGE_CHUNKS, page_assets, write_assets, DEFAULT_TITLE, STYLED_COMPACT_CHUNKS,
+    css=STYLED_CSS, font_family='Roboto'))
+
+def markdown_table_to_html(markdown_text, assets_href=None):
+    # 把文件中所有的表格轉成單一頁面
+    page = THEME.render_text(markdown_text, assets=page_assets(assets_href))
+    return "No table found in the Markdown text." if page is None else page
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python script.py <markdown_file>")
-        sys.exit(1)
-    
-    markdown_file = sys.argv[1]
+    parser = argparse.ArgumentParser(description="Convert a Markdown table to a styled dark HTML page")
+    parser.add_argument("markdown_file", nargs='+',
+                        help="Input Markdown file name; with --batch, Markdown files, directories or glob patterns")
+    parser.add_argument("--batch", action="store_true",
+                        help="Convert every Markdown file found in the given directories, files or glob patterns "
+                             "over a process pool, skipping files whose output is newer than the input and was written with "
+                             "the same options (recorded in a <input>_<theme>.stamp file next to the output)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Number of worker processes in batch mode (default: number of CPUs)")
+    parser.add_argument("--force", action="store_true",
+                        help="In batch mode, also convert the files whose output is up to date")
+    parser.add_argument("--external-assets", action="store_true",
+                        help=f"Write the CSS to {STYLED_CSS_FILE} next to the output and link it")
+    parser.add_argument("--split", action="store_true",
+                        help="Write one page per table, named after the table's anchor, instead of one page with every table")
+    parser.add_argument("--virtual", action="store_true",
+                        help="Embed the rows as JSON and render only the visible rows, for tables with many thousands of rows")
+    parser.add_argument("--font-file",
+                        help="Embed this local font (ttf/otf/woff/woff2) instead of importing Google Fonts; "
+                             "subset to the characters used when fontTools is installed")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write minified table markup and CSS/JS without the template indentation")
+    parser.add_argument("--precompress", action="append", choices=html_output.ENCODINGS, default=[],
+                        help="Also write a precompressed .gz or .br copy of every output file (may be repeated; "
+                             ".br needs the brotli package)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and regenerate the output whenever the content of the input file changes")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print the wall time and memory allocated by each stage (read, parse, render, write, ...) to stderr")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Profile the conversion with cProfile and write the pstats data to FILE")
+    args = parser.parse_args()
+    args.precompress = html_output.available_encodings(args.precompress)
+    if args.batch:
+        if args.watch:
+            parser.error("--watch cannot be combined with --batch")
+        # 批次與監看模式用到的模組只在需要時才匯入，不拖慢一般轉換與顯示說明的啟動時間
+        import markdown_batch
+        sys.exit(markdown_batch.batch_convert(THEME, args.markdown_file, args))
+    if len(args.markdown_file) != 1:
+        parser.error("Only one input file can be converted at a time, use --batch for several")
+    args.markdown_file = args.markdown_file[0]
+
+    convert_file(args)
+    if args.watch and os.path.exists(args.markdown_file):
+        # 只在內容真的改變時重新產生；存檔但內容沒變不會觸發
+        try:
+            import file_watch
+            watcher = file_watch.FileWatcher([args.markdown_file])
+            print(f"Watching {args.markdown_file} for changes ({watcher.backend_name}), press Ctrl+C to stop")
+            for _ in watcher.changes():
+                convert_file(args)
+        except KeyboardInterrupt:
+            print("\nStopped watching")
+
+def convert_file(args):
+    markdown_file = args.markdown_file
+    timer = stage_timer.StageTimer(args.timings)
     
     try:
-        with open(markdown_file, 'r', encoding='utf-8') as file:
-            markdown_text = file.read()
-        
-        html_output = markdown_table_to_html(markdown_text)
-        
-        output_file = markdown_file.rsplit('.', 1)[0] + '_styled.html'
-        with open(output_file, 'w', encoding='utf-8') as file:
-            file.write(html_output)
+        with stage_timer.profiled(args.profile), timer:
+            output_files = markdown_themes.convert_file(THEME, markdown_file, args, timer)
         
-        print(f"Styled HTML has been saved to {output_file}")
+        for output_file in output_files:
+            print(f"Styled HTML has been saved to {output_file}", flush=True)
+        timer.report()
     
     except FileNotFoundError:
-        print(f"Error: File '{markdown_file}' not found.")
+        print(f"Error: File '{markdown_file}' not found.", flush=True)
     except Exception as e:
-        print(f"An error occurred: {str(e)}")
+        print(f"An error occurred: {str(e)}", flush=True)
 
 if __name__ == "__main__":
     main()
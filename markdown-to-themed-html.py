@@ -0,0 +1,89 @@
+import argparse
+import os
+import sys
+import time
+
+import html_output
+import markdown_themes
+import stage_timer
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the tables of a Markdown file into one HTML page per theme, parsing the document only once")
+    parser.add_argument("input_file", help="Path to the input Markdown file")
+    parser.add_argument("--theme", action="append", choices=markdown_themes.theme_names(), default=[],
+                        help="Theme to render (may be repeated; default: every theme)")
+    parser.add_argument("--title", help="Page title; each theme uses its own default title when omitted")
+    parser.add_argument("--external-assets", action="store_true",
+                        help="Write each theme's CSS/JS next to the output and link it instead of inlining it in every page")
+    parser.add_argument("--split", action="store_true",
+                        help="Write one page per table, named after the table's anchor, instead of one page with every table")
+    parser.add_argument("--virtual", action="store_true",
+                        help="Embed the rows as JSON and render only the visible rows, for tables with many thousands of rows")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write minified table markup and CSS/JS without the template indentation")
+    parser.add_argument("--precompress", action="append", choices=html_output.ENCODINGS, default=[],
+                        help="Also write a precompressed .gz or .br copy of every output file (may be repeated; "
+                             ".br needs the brotli package)")
+    parser.add_argument("--timings", action="store_true",
+                        help="Print the wall time and memory allocated by each stage (read, parse, render, write, ...) to stderr")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Profile the conversion with cProfile and write the pstats data to FILE")
+    args = parser.parse_args()
+    args.precompress = html_output.available_encodings(args.precompress)
+
+    if not os.path.exists(args.input_file) or os.path.isdir(args.input_file):
+        print(f"Error: File '{args.input_file}' not found.", file=sys.stderr)
+        sys.exit(1)
+    # 重複指定的主題只渲染一次；只載入用到的主題所在的轉換腳本
+    themes = [markdown_themes.load_theme(name) for name in dict.fromkeys(args.theme or markdown_themes.theme_names())]
+
+    timer = stage_timer.StageTimer(args.timings)
+    with stage_timer.profiled(args.profile), timer:
+        result = convert(args, themes, timer)
+    if result is None:
+        print("No table found in the Markdown text.", file=sys.stderr)
+        sys.exit(1)
+    output_files, document, parse_time, tables_time, theme_times = result
+
+    for output_file in output_files:
+        print(f"HTML file has been generated: {output_file}", flush=True)
+    print(f"Parse: {parse_time * 1000:.1f} ms ({len(document.entries)} tables, {document.row_count()} rows)")
+    print(f"Render: shared tables {tables_time * 1000:.1f} ms, "
+          + ', '.join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in theme_times))
+    timer.report()
+
+def convert(args, themes, timer):
+    # 回傳 (輸出檔, 文件的中介表示, 解析秒數, 表格渲染秒數, [(主題, 秒數)])；找不到表格時回傳 None
+    base_name = os.path.splitext(args.input_file)[0]
+    output_dir = os.path.dirname(base_name) or '.'
+
+    start = time.perf_counter()
+    document = markdown_themes.parse_file(args.input_file, timer)
+    parse_time = time.perf_counter() - start
+    if document is None:
+        return None
+
+    # 表格區段與主題無關，先渲染一次，之後每個主題只需套上自己的模板與樣式
+    start = time.perf_counter()
+    with timer.stage('render'):
+        document.sections(args.virtual, args.compact)
+    tables_time = time.perf_counter() - start
+
+    output_files = []
+    theme_times = []
+    for theme in themes:
+        start = time.perf_counter()
+        assets_href = None
+        if args.external_assets:
+            with timer.stage('assets'):
+                theme.write_assets(output_dir, virtual=args.virtual, compact=args.compact, encodings=args.precompress)
+            assets_href = ''
+        assets = theme.page_assets(assets_href, virtual=args.virtual, compact=args.compact)
+        pages = theme.iter_pages(document, args.title, assets, args.split, args.virtual, args.compact)
+        output_files.extend(theme.write_pages(pages, base_name, timer, args.precompress, f'render:{theme.name}'))
+        theme_times.append((theme.name, time.perf_counter() - start))
+    return output_files, document, parse_time, tables_time, theme_times
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Markdown 轉換腳本共用的批次模式：走訪目錄、略過輸出已是最新的檔案、以行程池平行轉換並彙總結果。
+
+batch_convert 以一個 markdown_themes.Theme 轉換所有檔案，disney 與 styled 的 --batch 共用。
+"""
+import glob
+import importlib
+import json
+import os
+import sys
+import time
+
+import fast_io
+import markdown_themes
+import stage_timer
+
+MARKDOWN_SUFFIXES = ('.md', '.markdown')
+
+def collect_markdown_files(patterns, suffixes=MARKDOWN_SUFFIXES):
+    return fast_io.collect_files(patterns, suffixes)
+
+def is_up_to_date(input_path, output_pattern, stamp_path=None, stamp=None):
+    # output_pattern 為這個輸入檔所有輸出頁面的 glob 樣式；
+    # 至少有一個輸出檔，且每個輸出檔都比輸入檔新時才算是最新的。
+    # 指定 stamp_path 時還要求戳記檔的內容等於 stamp（產生輸出時的選項），且不比任何輸出檔舊：
+    # 之後以其他選項單獨轉換過這個檔案時，輸出會比戳記新
+    outputs = glob.glob(output_pattern)
+    if not outputs:
+        return False
+    try:
+        source_mtime = os.stat(input_path).st_mtime_ns
+        output_mtimes = [os.stat(path).st_mtime_ns for path in outputs]
+        if stamp_path is not None:
+            if os.stat(stamp_path).st_mtime_ns < max(output_mtimes):
+                return False
+            with open(stamp_path, encoding='utf-8') as f:
+                if f.read() != stamp:
+                    return False
+        return min(output_mtimes) >= source_mtime
+    except OSError:
+        return False
+
+def output_pattern(theme, input_path):
+    # 這個輸入檔產生的所有頁面（不論是否分頁）的 glob 樣式
+    return glob.escape(os.path.splitext(input_path)[0]) + f'_{theme.suffix}*.html'
+
+def stamp_path(theme, input_path):
+    return f"{os.path.splitext(input_path)[0]}_{theme.suffix}.stamp"
+
+def options_stamp(theme, args):
+    # 影響輸出內容的選項；內嵌字型檔以路徑與修改時間表示，換了字型檔也會重新轉換
+    font = None
+    if args.font_file:
+        try:
+            font = [os.path.abspath(args.font_file), os.stat(args.font_file).st_mtime_ns]
+        except OSError:
+            font = [os.path.abspath(args.font_file), None]
+    options = {
+        'theme': theme.name,
+        'title': getattr(args, 'title', None),
+        'split': args.split,
+        'virtual': args.virtual,
+        'compact': args.compact,
+        'external_assets': args.external_assets,
+        'font_file': font,
+        'precompress': sorted(args.precompress),
+        **theme.asset_options(args),
+    }
+    return json.dumps(options, sort_keys=True)
+
+def preload(*modules):
+    # 作為 ProcessPoolExecutor 的 initializer：每個工作行程在開始轉換前匯入一次較重的模組，
+    # 匯入時間不會算進第一個遇到舊式表格的檔案
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+def run_batch(convert, items, workers=None, preload_modules=()):
+    # 依序回傳 convert(item) 的結果；只有一個項目或 workers 為 1 時直接在目前的行程中執行
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(items) <= 1:
+        return [convert(item) for item in items]
+    # 匯入 ProcessPoolExecutor 會連帶載入 multiprocessing，只在真的需要多行程時才匯入
+    from concurrent.futures import ProcessPoolExecutor
+    import ai_tools
+    with ProcessPoolExecutor(max_workers=workers, initializer=preload, initargs=tuple(preload_modules)) as executor:
+        chunksize = max(1, len(items) // (workers * 4))
+        return list(executor.map(ai_tools.picklable(convert), items, chunksize=chunksize))
+
+def write_batch_assets(theme, files, pending, args):
+    # 在工作行程開始前為每個輸出目錄寫一次共用的 CSS/JS，避免多個行程同時寫同一個檔案；
+    # 內嵌字型的子集包含目錄中所有檔案（不論是否需要重新轉換）與標題用到的字元
+    import html_assets
+    directories = {}
+    for path in files:
+        directories.setdefault(os.path.dirname(path) or '.', []).append(path)
+    title = getattr(args, 'title', None) or theme.default_title
+    for output_dir in sorted({os.path.dirname(path) or '.' for path in pending}):
+        options = theme.asset_options(args)
+        if args.font_file:
+            characters = set()
+            for path in directories[output_dir]:
+                characters |= html_assets.used_characters(path, title + theme.font_characters)
+            options['css'] = theme.font_css(args.font_file, characters)
+        theme.write_assets(output_dir, virtual=args.virtual, compact=args.compact, encodings=args.precompress, **options)
+
+def _convert_item(item):
+    # 在工作行程中執行；主題以名稱傳遞，由 markdown_themes.load_theme 在工作行程中取得。
+    # 錯誤以字串回傳，單一檔案失敗不會中斷整批作業；成功時在輸出之後寫入選項戳記。
+    # 回傳 (輸入檔, 輸出檔, 錯誤, 輸入位元組數, 各階段統計)
+    theme_name, input_path, args, stamp = item
+    theme = markdown_themes.load_theme(theme_name)
+    timer = stage_timer.StageTimer(args.timings)
+    output_files = []
+    error = None
+    with timer:
+        try:
+            output_files = markdown_themes.convert_file(theme, input_path, args, timer, assets_written=True)
+            with open(stamp_path(theme, input_path), 'w', encoding='utf-8') as f:
+                f.write(stamp)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    size = 0 if error else os.path.getsize(input_path)
+    return input_path, output_files, error, size, timer.stats if args.timings else None
+
+def batch_convert(theme, patterns, args, preload_modules=('markdown',)):
+    # 以行程池用 theme 轉換 patterns（檔案、目錄或 glob 樣式）中的所有 Markdown 檔，每個工作行程只匯入一次
+    # preload_modules；輸出已是最新且以相同選項產生的檔案略過（--force 時全部重新轉換）。
+    # args 為命令列參數（見 markdown_themes.convert_file，另外用到 jobs、force、timings、profile）。
+    # 回傳結束代碼：沒有找到檔案或有檔案失敗時為 1
+    files = collect_markdown_files(patterns)
+    if not files:
+        print("Error: no Markdown files found")
+        return 1
+    timer = stage_timer.StageTimer(args.timings)
+    start = time.perf_counter()
+    stamp = options_stamp(theme, args)
+    with stage_timer.profiled(args.profile):
+        pending = files if args.force else [
+            path for path in files
+            if not is_up_to_date(path, output_pattern(theme, path), stamp_path(theme, path), stamp)]
+        if args.external_assets and pending:
+            with timer.stage('assets'):
+                write_batch_assets(theme, files, pending, args)
+        results = run_batch(_convert_item, [(theme.name, path, args, stamp) for path in pending],
+                            args.jobs, preload_modules)
+    failures = print_summary(results, len(files) - len(pending), time.perf_counter() - start)
+    if args.timings:
+        for *_, stats in results:
+            timer.merge(stats)
+        timer.report()
+    return 1 if failures else 0
+
+def print_summary(results, skipped, elapsed, file=None):
+    # results 為 (輸入檔, 輸出檔清單, 錯誤, 輸入位元組數, 計時統計) 的清單；失敗的檔案列在標準錯誤輸出
+    file = file or sys.stdout
+    failures = [(path, error) for path, _, error, _, _ in results if error]
+    pages = sum(len(output_files) for _, output_files, _, _, _ in results)
+    size = sum(input_bytes for _, _, error, input_bytes, _ in results if not error)
+    converted = len(results) - len(failures)
+    for path, error in failures:
+        print(f"Failed: {path}: {error}", file=sys.stderr)
+    rate = f"{converted / elapsed:.1f} files/s, {size / (1024 * 1024) / elapsed:.1f} MB/s" if elapsed > 0 else "-"
+    print(f"Batch finished: {converted} converted, {skipped} up to date, {len(failures)} failed, "
+          f"{pages} files written in {elapsed:.2f} s ({rate})", file=file)
+    return failures
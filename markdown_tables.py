@@ -0,0 +1,479 @@
+"""GFM 表格的串流解析與 HTML 渲染：逐行讀取 Markdown，表格列直接轉成 HTML 片段，不建立整份文件的樹。"""
+import functools
+import html
+import re
+
+import html_output
+
+ROW_BATCH = 512
+VIRTUAL_TABLE_JS_FILE = 'virtual-table.js'
+
+# 虛擬捲動模式：表格放在固定高度的捲動容器中，列高一致、不做 hover 變形與陰影，
+# 表頭固定在上方；表身只放可見範圍的列，上下以空白列撐出完整高度
+VIRTUAL_TABLE_CSS = """            .virtual-table {
+                max-height: 75vh;
+                overflow: auto;
+                contain: content;
+            }
+            .virtual-table thead th {
+                position: sticky;
+                top: 0;
+                z-index: 1;
+            }
+            .virtual-table td {
+                white-space: nowrap;
+                overflow: hidden;
+                text-overflow: ellipsis;
+            }
+            .virtual-table tr,
+            .virtual-table tr:hover {
+                transform: none;
+                transition: none;
+                box-shadow: none;
+            }
+            .virtual-table td::before {
+                display: none;
+            }
+            .virtual-table tr.virtual-spacer td {
+                padding: 0;
+                border: 0;
+            }
+"""
+
+VIRTUAL_TABLE_JS = """            (function () {
+                const OVERSCAN = 10;
+                function mount(container) {
+                    const data = JSON.parse(container.querySelector('.virtual-table-data').textContent);
+                    const thead = container.querySelector('thead');
+                    const tbody = container.querySelector('tbody');
+                    const columns = data.aligns.length;
+                    const cellOpen = data.aligns.map(align => align ? '<td style="text-align: ' + align + ';">' : '<td>');
+                    const rows = data.rows;
+                    function rowHtml(row) {
+                        let out = '<tr>';
+                        for (let i = 0; i < columns; i++) {
+                            out += cellOpen[i] + row[i] + '</td>';
+                        }
+                        return out + '</tr>';
+                    }
+                    function spacer(height) {
+                        return '<tr class="virtual-spacer"><td colspan="' + columns + '" style="height: ' + height + 'px;"></td></tr>';
+                    }
+                    // 以前兩列的位置差量測列高（含 border-spacing），之後所有列都視為同高
+                    tbody.innerHTML = rows.slice(0, 2).map(rowHtml).join('');
+                    const measured = tbody.children;
+                    let rowHeight = measured.length > 1 ? measured[1].offsetTop - measured[0].offsetTop
+                        : measured.length ? measured[0].offsetHeight : 0;
+                    rowHeight = rowHeight || 40;
+                    let first = -1;
+                    function render() {
+                        const visible = Math.ceil(container.clientHeight / rowHeight) + 2 * OVERSCAN;
+                        let start = Math.floor(Math.max(0, container.scrollTop - thead.offsetHeight) / rowHeight) - OVERSCAN;
+                        // 起點固定為偶數，nth-child 的斑馬紋不會隨捲動跳動
+                        start = Math.max(0, start - start % 2);
+                        if (start === first) {
+                            return;
+                        }
+                        first = start;
+                        const end = Math.min(rows.length, start + visible);
+                        let out = spacer(start * rowHeight);
+                        for (let i = start; i < end; i++) {
+                            out += rowHtml(rows[i]);
+                        }
+                        tbody.innerHTML = out + spacer((rows.length - end) * rowHeight);
+                    }
+                    let scheduled = false;
+                    container.addEventListener('scroll', () => {
+                        if (!scheduled) {
+                            scheduled = true;
+                            requestAnimationFrame(() => {
+                                scheduled = false;
+                                render();
+                            });
+                        }
+                    }, { passive: true });
+                    window.addEventListener('resize', () => {
+                        first = -1;
+                        render();
+                    });
+                    render();
+                }
+                document.querySelectorAll('.virtual-table').forEach(mount);
+            })();
+"""
+
+HEADING = re.compile(r' {0,3}#{1,6}(?:\s+(.*?))?(?:\s+#+)?\s*$')
+# Setext 標題的底線；與 markdown 套件相同，底線不可縮排，且標題文字必須是區塊的第一行
+SETEXT_UNDERLINE = re.compile(r'[=-]+ *$')
+FENCE = re.compile(r' {0,3}(`{3,}|~{3,})')
+BLOCK_START = re.compile(r' {0,3}(?:#{1,6}(?:\s|$)|>|`{3,}|~{3,})')
+DELIMITER_CELL = re.compile(r':?-+:?$')
+CELL_SEPARATOR = re.compile(r'(?<!\\)\|')
+ANCHOR_STRIP = re.compile(r'[^\w\s-]')
+ANCHOR_SPACE = re.compile(r'[\s-]+')
+TAG = re.compile(r'<[^>]+>')
+HTML_BLOCK = re.compile(r'<h[1-6][^>]*>(.*?)</h[1-6]>|<table>(.*?)</table>', re.DOTALL)
+CODE_SPAN = re.compile(r'(?<![\\`])(`+)(?!`).+?(?<!`)\1(?!`)')
+# 只有可能構成行內語法、HTML 標籤或字元實體的儲存格才需要逐一比對，其餘直接跳脫
+INLINE_SPECIAL = re.compile(r'[`*_\[\\]|<[A-Za-z/!]|&#?[A-Za-z0-9]+;')
+# 與 markdown 套件的輸出相同：& 只在不構成字元實體時跳脫
+AMPERSAND = re.compile(r'&(?!(?:#[0-9]+|#x[0-9a-f]+|[0-9a-z]+);)', re.IGNORECASE)
+# 強調只處理內容不含 * 且不以空白開頭或結尾的簡單形式，並依 CommonMark 的左右側規則判斷分隔符能否開始或結束強調；
+# 其他組合（巢狀、不成對、前後有空白的 *）依 markdown 套件的分隔符規則而定，
+# 留在文字中的語法字元會讓整格改用 markdown 套件渲染
+EMPHASIS_OPEN = r'(?<!\*)(?:(?<![^\W_]){0}(?![\s*])|{0}(?=[^\W_]))'
+EMPHASIS_CLOSE = r'(?:(?<=[^\W_]){0}|(?<![\s*\\]){0}(?![^\W_]))(?!\*)'
+INLINE_TOKEN = re.compile(
+    r'(?<!`)(?P<ticks>`+)(?!`)(?P<code>.+?)(?<!`)(?P=ticks)(?!`)'
+    r'|<(?P<autolink>(?:https?|ftp)://[^<>\s]+)(?<!\\)>'
+    r'|(?P<raw><!--.*?-->|</?[A-Za-z][A-Za-z0-9-]*(?:\s+[^<>]*?)?/?(?<!\\)>)'
+    r'|(?P<entity>&(?:#[0-9]+|#x[0-9a-fA-F]+|[A-Za-z0-9]+);)'
+    + '|' + EMPHASIS_OPEN.format(r'\*\*\*') + r'(?P<strong_em>[^*]+?)' + EMPHASIS_CLOSE.format(r'\*\*\*')
+    + '|' + EMPHASIS_OPEN.format(r'\*\*') + r'(?P<strong>[^*]+?)' + EMPHASIS_CLOSE.format(r'\*\*')
+    + r'|(?<!\w)__(?![\s_])(?P<strong_u>[^_*]+?)(?<![\s_\\])__(?!\w)'
+    + '|' + EMPHASIS_OPEN.format(r'\*') + r'(?P<em>[^*]+?)' + EMPHASIS_CLOSE.format(r'\*')
+    + r'|(?<!\w)_(?![\s_])(?P<em_u>[^_*]+?)(?<![\s_\\])_(?!\w)'
+    r'|!\[(?P<alt>[^\[\]`*_<>&\\]*)\]\((?P<src>[^()\s<>\\]*)(?:\s+"(?P<img_title>[^"]*)")?\)'
+    r'|(?<!!)\[(?P<text>[^\[\]]*)(?<!\\)\]\((?P<href>[^()\s<>\\]*)(?:\s+"(?P<title>[^"]*)")?\)'
+    r'|\\(?P<escaped>[\\`*_{}\[\]()>#+\-.!|])'
+)
+# 比對完上述語法後仍留在文字中的語法字元：代表儲存格用到串流渲染器不支援的語法
+# （參考式連結、不成對或巢狀的強調、角括號網址與電子郵件等），整格改用 markdown 套件渲染
+UNSUPPORTED_INLINE = re.compile(r'[`*\[\]]|(?<!\w)_|_(?!\w)|<\S')
+
+# 串流解析器無法處理、整份文件必須改用 markdown 套件轉換的語法，以位元組比對，可直接搜尋記憶體映射區：
+# 連結參考定義（[x][1] 與 [x] 要讀完整份文件才知道是不是連結）、引言與清單項目中的表格、
+# 原始 HTML 區塊（其中的表格列原樣輸出，不是表格）；跨行的 HTML 註解另以 OPEN_COMMENT 比對
+MARKDOWN_ONLY = re.compile(
+    rb'^(?: {0,3}(?:\[[^\]\n]+\]:|>[^\n]*\||(?:[*+-]|[0-9]+\.)[ \t][^\n]*\||</?[A-Za-z])|(?: {4}|\t)[ \t]*\|)',
+    re.MULTILINE)
+OPEN_COMMENT = re.compile(rb'<!--(?:(?!-->).)*$', re.MULTILINE)
+
+class MarkdownTable:
+    # rows 是共用同一個行迭代器的產生器，必須在取下一個表格之前讀完；
+    # heading 為表格之前最近的標題（Markdown 原文），anchor 為文件內唯一的錨點
+    def __init__(self, header, aligns, rows, heading=None, anchor=None, index=1):
+        self.header = header
+        self.aligns = aligns
+        self.rows = rows
+        self.heading = heading
+        self.anchor = anchor
+        self.index = index
+        self.end_line = None
+
+def split_row(line):
+    # 去掉首尾的 |，以未跳脫的 | 切開儲存格；與 markdown 套件相同，行內程式碼中的 | 不切開。
+    # \| 保留在儲存格中，由 render_inline 還原成字面上的 |（行內程式碼中則保持原樣）
+    text = line.strip()
+    if text.startswith('|'):
+        text = text[1:]
+    if text.endswith('|') and not text.endswith('\\|'):
+        text = text[:-1]
+    if '`' not in text:
+        return [cell.strip() for cell in CELL_SEPARATOR.split(text)]
+    spans = [match.span() for match in CODE_SPAN.finditer(text)]
+    cells = []
+    start = 0
+    for match in CELL_SEPARATOR.finditer(text):
+        position = match.start()
+        if any(span_start < position < span_end for span_start, span_end in spans):
+            continue
+        cells.append(text[start:position].strip())
+        start = match.end()
+    cells.append(text[start:].strip())
+    return cells
+
+def _indent_width(line):
+    return len(line) - len(line.lstrip(' '))
+
+def _parse_delimiter(line, columns):
+    # 分隔列的欄數必須與標題列相同，否則這兩行不是表格
+    if '-' not in line or _indent_width(line) > 3:
+        return None
+    cells = split_row(line)
+    if len(cells) != columns or not all(DELIMITER_CELL.match(cell) for cell in cells):
+        return None
+    aligns = []
+    for cell in cells:
+        if cell.startswith(':') and cell.endswith(':'):
+            aligns.append('center')
+        elif cell.endswith(':'):
+            aligns.append('right')
+        elif cell.startswith(':'):
+            aligns.append('left')
+        else:
+            aligns.append(None)
+    return aligns
+
+def _iter_rows(table, lines, columns):
+    # 表格在空行或其他區塊（標題、引言、程式碼圍欄）開始時結束，結束的那一行交回給 iter_tables
+    for line in lines:
+        if not line.strip() or BLOCK_START.match(line):
+            table.end_line = line
+            return
+        cells = split_row(line)
+        if len(cells) < columns:
+            cells.extend([''] * (columns - len(cells)))
+        elif len(cells) > columns:
+            del cells[columns:]
+        yield cells
+
+def make_anchor(text, used):
+    # 與常見的 Markdown 目錄規則相同：轉小寫、去掉標點、空白換成 -，重複時加上 -2、-3…
+    anchor = ANCHOR_SPACE.sub('-', ANCHOR_STRIP.sub('', text).strip().lower())
+    base = anchor
+    count = 1
+    while anchor in used:
+        count += 1
+        anchor = f'{base}-{count}'
+    used.add(anchor)
+    return anchor
+
+def plain_text(text):
+    # 去掉行內語法，供 <title> 與錨點使用
+    return html.unescape(TAG.sub('', render_inline(text)))
+
+def needs_markdown(data):
+    # data 為整份文件的位元組；用到 MARKDOWN_ONLY 中的語法或跨行的 HTML 註解時，呼叫端應改用 markdown 套件轉換整份文件
+    return MARKDOWN_ONLY.search(data) is not None or OPEN_COMMENT.search(data) is not None
+
+def iter_tables(lines):
+    # 單次掃過所有行，遇到「標題列 + 分隔列」就產生一個 MarkdownTable；圍欄程式碼中的內容略過。
+    # block_start 表示目前這行是否為區塊的第一行，setext_text 為可能成為 Setext 標題的上一行
+    lines = iter(lines)
+    fence = None
+    candidate = None
+    block_start = True
+    setext_text = None
+    pending = None
+    heading = None
+    used_anchors = set()
+    index = 0
+    while True:
+        if pending is not None:
+            line, pending = pending, None
+        else:
+            line = next(lines, None)
+            if line is None:
+                return
+        if fence is not None:
+            if line.strip().startswith(fence):
+                fence = None
+            continue
+        match = FENCE.match(line)
+        if match:
+            fence = match.group(1)
+            candidate = setext_text = None
+            block_start = True
+            continue
+        if candidate is not None:
+            header = split_row(candidate)
+            aligns = _parse_delimiter(line, len(header))
+            if aligns is not None:
+                index += 1
+                anchor = make_anchor(plain_text(heading), used_anchors) if heading else ''
+                if not anchor:
+                    anchor = make_anchor(f'table-{index}', used_anchors)
+                table = MarkdownTable(header, aligns, None, heading, anchor, index)
+                table.rows = _iter_rows(table, lines, len(header))
+                yield table
+                for _ in table.rows:
+                    pass
+                pending = table.end_line
+                candidate = setext_text = None
+                block_start = True
+                continue
+        if setext_text is not None and SETEXT_UNDERLINE.match(line):
+            heading = setext_text
+            candidate = setext_text = None
+            block_start = True
+            continue
+        match = HEADING.match(line)
+        if match:
+            heading = match.group(1) or None
+            candidate = setext_text = None
+            block_start = True
+            continue
+        blank = not line.strip()
+        setext_text = line.strip() if block_start and not blank and _indent_width(line) < 4 else None
+        block_start = blank
+        candidate = line if '|' in line and _indent_width(line) < 4 else None
+
+def extract_html_tables(html_text):
+    # 依序取出 markdown 套件輸出中的表格，產生 (錨點, 標題純文字, 標題 HTML, 表格 HTML)；
+    # 表格的小標取自前一個標題，沒有標題時標題純文字為空字串、標題 HTML 為 None
+    used_anchors = set()
+    heading_html = None
+    index = 0
+    for match in HTML_BLOCK.finditer(html_text):
+        if match.group(2) is None:
+            heading_html = match.group(1)
+            continue
+        index += 1
+        heading = html.unescape(TAG.sub('', heading_html)) if heading_html else ''
+        anchor = make_anchor(heading, used_anchors) if heading else ''
+        if not anchor:
+            anchor = make_anchor(f'table-{index}', used_anchors)
+        yield anchor, heading, heading_html, f'<table>{match.group(2)}</table>'
+
+def _escape_text(text):
+    return AMPERSAND.sub('&amp;', text).replace('<', '&lt;').replace('>', '&gt;')
+
+def _escape_attribute(value):
+    return _escape_text(value).replace('"', '&quot;')
+
+def render_inline(text):
+    # 行內語法支援程式碼、粗體、斜體、圖片、連結與網址自動連結；行內的原始 HTML 標籤、註解與字元實體
+    # 與 markdown 套件相同原樣保留，其餘內容一律跳脫。用到其他語法的儲存格交給 markdown 套件渲染
+    if not INLINE_SPECIAL.search(text):
+        return html.escape(text, quote=False)
+    rendered = _render_supported(text)
+    return rendered if rendered is not None else _markdown_inline(text)
+
+def _render_supported(text):
+    # 以串流渲染器支援的語法渲染；遇到不支援的語法（包括強調與連結的內文中）時回傳 None
+    pieces = []
+    position = 0
+    for match in INLINE_TOKEN.finditer(text):
+        plain = text[position:match.start()]
+        if UNSUPPORTED_INLINE.search(plain):
+            return None
+        pieces.append(_escape_text(plain))
+        position = match.end()
+        groups = match.groupdict()
+        if groups['ticks'] is not None:
+            pieces.append(f"<code>{html.escape(groups['code'].strip(), quote=False)}</code>")
+        elif groups['strong_em'] is not None:
+            inner = _render_supported(groups['strong_em'])
+            if inner is None:
+                return None
+            pieces.append(f"<strong><em>{inner}</em></strong>")
+        elif groups['strong'] is not None or groups['strong_u'] is not None:
+            inner = _render_supported(groups['strong'] if groups['strong'] is not None else groups['strong_u'])
+            if inner is None:
+                return None
+            pieces.append(f"<strong>{inner}</strong>")
+        elif groups['em'] is not None or groups['em_u'] is not None:
+            inner = _render_supported(groups['em'] if groups['em'] is not None else groups['em_u'])
+            if inner is None:
+                return None
+            pieces.append(f"<em>{inner}</em>")
+        elif groups['src'] is not None:
+            title = groups['img_title']
+            title_attr = f' title="{_escape_attribute(title)}"' if title is not None else ''
+            pieces.append(f'<img alt="{_escape_attribute(groups["alt"])}" src="{_escape_attribute(groups["src"])}"{title_attr} />')
+        elif groups['href'] is not None:
+            title = groups['title']
+            title_attr = f' title="{_escape_attribute(title)}"' if title is not None else ''
+            inner = _render_supported(groups['text'])
+            if inner is None:
+                return None
+            pieces.append(f'<a href="{_escape_attribute(groups["href"])}"{title_attr}>{inner}</a>')
+        elif groups['autolink'] is not None:
+            url = groups['autolink']
+            pieces.append(f'<a href="{_escape_attribute(url)}">{_escape_text(url)}</a>')
+        elif groups['raw'] is not None:
+            pieces.append(groups['raw'])
+        elif groups['entity'] is not None:
+            pieces.append(groups['entity'])
+        else:
+            pieces.append(html.escape(groups['escaped'], quote=False))
+    plain = text[position:]
+    if UNSUPPORTED_INLINE.search(plain):
+        return None
+    pieces.append(_escape_text(plain))
+    return ''.join(pieces)
+
+@functools.lru_cache(maxsize=1)
+def _markdown_converter():
+    # markdown 套件只在遇到串流渲染器不支援的語法時才載入
+    import markdown
+    return markdown.Markdown(extensions=['tables'])
+
+def _markdown_inline(text):
+    # 把儲存格放進只有一格的表格交給 markdown 套件轉換，再取出儲存格的內容，
+    # 行內語法的處理與整份文件以 markdown 套件轉換時相同
+    html_text = _markdown_converter().reset().convert(f'| |\n|---|\n| {text} |')
+    return html_text[html_text.index('<td>') + 4:html_text.rindex('</td>')]
+
+def _open_tags(tag, aligns):
+    return [f'<{tag} style="text-align: {align};">' if align else f'<{tag}>' for align in aligns]
+
+def _render_head(table, newline='\n'):
+    header = [f'<table>{newline}<thead>{newline}<tr>{newline}']
+    for open_tag, cell in zip(_open_tags('th', table.aligns), table.header):
+        header.append(f'{open_tag}{render_inline(cell)}</th>{newline}')
+    header.append(f'</tr>{newline}</thead>{newline}<tbody>{newline}')
+    return ''.join(header)
+
+def render_table(table, batch_size=ROW_BATCH, compact=False):
+    # 產生表格的 HTML 片段；每 batch_size 列合併成一個字串，避免大量的小片段。
+    # compact 時儲存格之間不換行（表格元素之間的空白不會顯示）
+    newline = '' if compact else '\n'
+    yield _render_head(table, newline)
+
+    open_tags = _open_tags('td', table.aligns)
+    row_open = f'<tr>{newline}'
+    cell_close = f'</td>{newline}'
+    row_close = f'</tr>{newline}'
+    batch = []
+    rows = 0
+    for cells in table.rows:
+        batch.append(row_open)
+        for open_tag, cell in zip(open_tags, cells):
+            batch.append(f'{open_tag}{render_inline(cell)}{cell_close}')
+        batch.append(row_close)
+        rows += 1
+        if rows == batch_size:
+            yield ''.join(batch)
+            batch = []
+            rows = 0
+    batch.append(f'</tbody>{newline}</table>')
+    yield ''.join(batch)
+
+def render_table_data(table, batch_size=ROW_BATCH, compact=False):
+    # 虛擬捲動模式：表頭照常輸出，表身改為 JSON 陣列（儲存格為已渲染的行內 HTML），
+    # 由 VIRTUAL_TABLE_JS 只把可見範圍的列放進 DOM
+    newline = '' if compact else '\n'
+    yield (f'<div class="virtual-table">{newline}{_render_head(table, newline)}</tbody>{newline}</table>{newline}'
+           f'<script type="application/json" class="virtual-table-data">{{"aligns":{html_output.script_json(table.aligns)},"rows":[')
+    batch = []
+    separator = ''
+    for cells in table.rows:
+        batch.append(separator)
+        batch.append(html_output.script_json([render_inline(cell) for cell in cells]))
+        separator = ','
+        if len(batch) >= 2 * batch_size:
+            yield ''.join(batch)
+            batch = []
+    batch.append(f']}}</script>{newline}</div>')
+    yield ''.join(batch)
+
+def section_pieces(anchor, heading_html, table_pieces, compact=False):
+    # 每個表格包在帶錨點的 <section> 中，前面放上來自標題的小標
+    newline = '' if compact else '\n'
+    yield f'<section class="table-section" id="{html.escape(anchor)}">{newline}'
+    if heading_html:
+        yield f'<h2 class="table-title"><a href="#{html.escape(anchor)}">{heading_html}</a></h2>{newline}'
+    yield from table_pieces
+    yield f'{newline}</section>\n'
+
+def render_sections(tables, virtual=False, compact=False):
+    render = render_table_data if virtual else render_table
+    for table in tables:
+        heading_html = render_inline(table.heading) if table.heading else None
+        yield from section_pieces(table.anchor, heading_html, render(table, compact=compact), compact)
+
+def virtual_page_assets(assets_href=None, compact=False):
+    # 虛擬捲動模式額外需要的 (樣式, 腳本) HTML；assets_href 不為 None 時腳本以外部檔案引用
+    if compact:
+        styles = f"<style>{html_output.minify_css(VIRTUAL_TABLE_CSS)}</style>\n"
+        if assets_href is None:
+            return styles, f"<script>{html_output.minify_js(VIRTUAL_TABLE_JS)}</script>\n"
+        return styles, f'<script src="{assets_href}{VIRTUAL_TABLE_JS_FILE}"></script>\n'
+    styles = f"        <style>\n{VIRTUAL_TABLE_CSS}        </style>\n"
+    if assets_href is None:
+        scripts = f"        <script>\n{VIRTUAL_TABLE_JS}        </script>\n"
+    else:
+        scripts = f'        <script src="{assets_href}{VIRTUAL_TABLE_JS_FILE}"></script>\n'
+    return styles, scripts
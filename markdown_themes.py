@@ -0,0 +1,327 @@
+"""Markdown 表格轉換器共用的表格中介表示與主題登記：解析一次文件，即可渲染成任意多種頁面外觀。
+
+各轉換腳本以 Theme 描述自己的頁面模板與 CSS/JS，載入時呼叫 register()；
+load_theme() 只在需要時才載入定義該主題的腳本。單一主題的轉換（disney、styled 命令列與轉換服務）
+以 TableStream 串流渲染，表格列不必整份留在記憶體中。
+"""
+import html
+import itertools
+import os
+
+import fast_io
+import html_output
+import markdown_tables
+import stage_timer
+
+PLAIN_CSS = """            body {
+                font-family: -apple-system, 'Segoe UI', 'Noto Sans TC', sans-serif;
+                line-height: 1.5;
+                color: #222;
+                max-width: 1000px;
+                margin: 0 auto;
+                padding: 24px 16px;
+            }
+            h1 {
+                font-size: 1.6em;
+                margin-bottom: 24px;
+            }
+            .table-title a {
+                color: inherit;
+                text-decoration: none;
+            }
+            table {
+                width: 100%;
+                border-collapse: collapse;
+                margin-bottom: 24px;
+            }
+            th, td {
+                border: 1px solid #ccc;
+                padding: 6px 10px;
+            }
+            th {
+                background-color: #f4f4f4;
+            }
+            tr:nth-child(even) td {
+                background-color: #fafafa;
+            }
+"""
+
+PLAIN_PAGE_TEMPLATE = """
+    <!DOCTYPE html>
+    <html lang="zh-TW">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>{title}</title>
+{styles}    </head>
+    <body>
+        <h1>{title}</h1>
+        {tables}
+{scripts}    </body>
+    </html>
+    """
+
+PLAIN_CSS_FILE = 'plain-table.css'
+
+# 由 ai_tools 工具腳本定義的主題，第一次用到時才載入腳本；腳本載入時會自行呼叫 register()
+THEME_TOOLS = ('disney', 'styled')
+THEMES = {}
+
+def render_template(chunks, tables_html, title, assets):
+    # 以預先切好的模板片段組出頁面；tables_html 可以是 HTML 字串，或 HTML 片段的 iterable，
+    # assets 為 (樣式, 腳本) HTML
+    styles, scripts = assets
+    values = {
+        'title': html.escape(title),
+        'styles': styles,
+        'scripts': scripts
+    }
+    for literal, field in chunks:
+        yield literal
+        if field == 'tables':
+            if isinstance(tables_html, str):
+                yield tables_html
+            else:
+                yield from tables_html
+        elif field is not None:
+            yield values[field]
+
+class TableDocument:
+    # 解析一次、可供多個主題渲染的表格中介表示。
+    # entries 為 (錨點, 分頁標題, 標題 HTML, 表格) 的清單，沒有標題時分頁標題與標題 HTML 為 None；
+    # 表格為 rows 已讀成串列的 MarkdownTable，或後備路徑由 markdown 套件產生的表格 HTML。
+    # 表格區段的 HTML 與主題無關，同一組 (virtual, compact) 只渲染一次，所有主題共用
+    def __init__(self, entries):
+        self.entries = entries
+        self._sections = {}
+
+    def row_count(self):
+        return sum(len(table.rows) for *_, table in self.entries if not isinstance(table, str))
+
+    def sections(self, virtual=False, compact=False):
+        # 每個表格一個 <section> 字串；原始 HTML 表格沒有虛擬捲動版本，一律以一般標記輸出
+        key = (virtual, compact)
+        sections = self._sections.get(key)
+        if sections is None:
+            render = markdown_tables.render_table_data if virtual else markdown_tables.render_table
+            sections = self._sections[key] = [
+                ''.join(markdown_tables.section_pieces(
+                    anchor, heading_html, [table] if isinstance(table, str) else render(table, compact=compact), compact))
+                for anchor, _, heading_html, table in self.entries]
+        return sections
+
+    def iter_sections(self, virtual=False, compact=False):
+        # 產生 (錨點, 分頁標題, 區段 HTML 片段)，與 TableStream 的介面相同
+        for (anchor, title, _, _), section in zip(self.entries, self.sections(virtual, compact)):
+            yield anchor, title, (section,)
+
+class TableStream:
+    # 只渲染一種主題時的串流版本：表格列在寫出頁面時才從行迭代器讀出，不會整份留在記憶體中。
+    # 只能渲染一次；各頁面共用同一個行迭代器，必須依序寫完
+    def __init__(self, tables):
+        self._tables = tables
+
+    def iter_sections(self, virtual=False, compact=False):
+        for table in self._tables:
+            title = markdown_tables.plain_text(table.heading) if table.heading else None
+            yield table.anchor, title, markdown_tables.render_sections([table], virtual, compact)
+
+def stream_tables(lines, timer=stage_timer.DISABLED):
+    # 回傳 lines 中 GFM 表格的 TableStream；找不到表格時回傳 None。尋找下一個表格計入 scan
+    tables = timer.iterate('scan', markdown_tables.iter_tables(lines))
+    first = next(tables, None)
+    return TableStream(itertools.chain([first], tables)) if first is not None else None
+
+def parse_tables(lines, timer=stage_timer.DISABLED):
+    # 以串流解析器讀出所有 GFM 表格的中介表示；找不到表格時回傳 None。
+    # 尋找下一個表格計入 scan，讀出表格列與標題計入 parse
+    entries = []
+    for table in timer.iterate('scan', markdown_tables.iter_tables(lines)):
+        with timer.stage('parse'):
+            # iter_tables 的各表格共用同一個行迭代器，必須在取下一個表格之前讀完表格列
+            table.rows = list(table.rows)
+            title = markdown_tables.plain_text(table.heading) if table.heading else None
+            heading_html = markdown_tables.render_inline(table.heading) if table.heading else None
+        entries.append((table.anchor, title, heading_html, table))
+    return TableDocument(entries) if entries else None
+
+def parse_html_tables(markdown_text, timer=stage_timer.DISABLED):
+    # 串流解析器找不到表格時（例如原始 HTML 表格）改用 markdown 套件；找不到表格時回傳 None
+    with timer.stage('import'):
+        import markdown
+    with timer.stage('markdown'):
+        html_text = markdown.markdown(markdown_text, extensions=['tables'])
+    with timer.stage('extract'):
+        entries = [(anchor, heading or None, heading_html, table_html)
+                   for anchor, heading, heading_html, table_html in markdown_tables.extract_html_tables(html_text)]
+    return TableDocument(entries) if entries else None
+
+def parse_text(markdown_text, timer=stage_timer.DISABLED, stream=False):
+    # 解析字串形式的整份文件；stream 時回傳 TableStream（後備路徑仍回傳 TableDocument）。找不到表格時回傳 None
+    document = None
+    if not markdown_tables.needs_markdown(markdown_text.encode('utf-8')):
+        lines = markdown_text.split('\n')
+        document = stream_tables(lines, timer) if stream else parse_tables(lines, timer)
+    if document is None:
+        document = parse_html_tables(markdown_text, timer)
+    return document
+
+def parse_file(path, timer=stage_timer.DISABLED, stream=False):
+    # 以記憶體映射逐批讀檔並解析；沒有 GFM 表格或用到串流解析器無法處理的語法時（見 markdown_tables.needs_markdown），
+    # 讀入整份文件改用 markdown 套件。標準輸入、FIFO 等只能讀一次的輸入先複製到暫存檔。
+    # stream 時回傳 TableStream，呼叫端必須在寫完頁面之前保留 path（只能讀一次的輸入自行以 fast_io.spooled 複製）
+    with fast_io.spooled(path) as path:
+        with timer.stage('scan'), fast_io.mapped(path) as data:
+            streaming = not markdown_tables.needs_markdown(data)
+        document = None
+        if streaming:
+            lines = itertools.chain.from_iterable(timer.iterate('read', fast_io.iter_line_batches(path)))
+            document = stream_tables(lines, timer) if stream else parse_tables(lines, timer)
+        if document is None:
+            with timer.stage('read'):
+                markdown_text = fast_io.read_text(path)
+            document = parse_html_tables(markdown_text, timer)
+    return document
+
+class Theme:
+    # 一種頁面外觀。suffix 為輸出檔名的後綴（<輸入檔>_<suffix>.html）；chunks 為 html_output.compile_template 切好的模板；
+    # page_assets(assets_href, virtual=..., compact=..., **options) 回傳 (樣式, 腳本) HTML，
+    # write_assets(output_dir, virtual=..., compact=..., encodings=..., **options) 寫出外部引用的共用 CSS/JS；
+    # options 為 asset_options(args) 由命令列參數取出的主題專屬選項，以及內嵌字型時替換的 css。
+    # css 為頁面樣式，font_family 為 --font-file 取代的 Google Fonts 字型，font_characters 為子集一律保留的字元
+    def __init__(self, name, suffix, chunks, page_assets, write_assets, default_title, compact_chunks=None,
+                 css=None, font_family=None, font_characters='', asset_options=None):
+        self.name = name
+        self.suffix = suffix
+        self.chunks = chunks
+        self.compact_chunks = compact_chunks if compact_chunks is not None else html_output.compact_chunks(chunks)
+        self.page_assets = page_assets
+        self.write_assets = write_assets
+        self.default_title = default_title
+        self.css = css
+        self.font_family = font_family
+        self.font_characters = font_characters
+        self.asset_options = asset_options or (lambda args: {})
+
+    def render_page_pieces(self, tables_html, title, assets, compact=False):
+        return render_template(self.compact_chunks if compact else self.chunks, tables_html, title, assets)
+
+    def iter_pages(self, document, title=None, assets=None, split=False, virtual=False, compact=False):
+        # document 為 TableDocument 或 TableStream。產生 (錨點, 頁面片段)：預設為包含所有表格的單一頁面，
+        # split 時每個表格一頁，以表格的標題為頁面標題
+        title = title or self.default_title
+        if assets is None:
+            assets = self.page_assets(None, virtual=virtual, compact=compact)
+        sections = document.iter_sections(virtual, compact)
+        if not split:
+            tables_html = itertools.chain.from_iterable(pieces for _, _, pieces in sections)
+            yield None, self.render_page_pieces(tables_html, title, assets, compact)
+            return
+        for anchor, page_title, pieces in sections:
+            yield anchor, self.render_page_pieces(pieces, page_title or title, assets, compact)
+
+    def render_text(self, markdown_text, title=None, assets=None, virtual=False):
+        # 把文件中所有的表格轉成單一頁面的 HTML；找不到表格時回傳 None
+        document = parse_text(markdown_text, stream=True)
+        if document is None:
+            return None
+        for _, pieces in self.iter_pages(document, title, assets, virtual=virtual):
+            return ''.join(pieces)
+
+    def output_file(self, base_name, anchor=None):
+        return f"{base_name}_{self.suffix}.html" if anchor is None else f"{base_name}_{self.suffix}_{anchor}.html"
+
+    def write_pages(self, pages, base_name, timer=stage_timer.DISABLED, encodings=(), stage='render'):
+        # 每產生一頁就寫出，並在同一次寫入中串流壓縮成 encodings 指定的 .gz/.br 副本；回傳產生的檔名
+        output_files = []
+        for anchor, pieces in pages:
+            output_file = self.output_file(base_name, anchor)
+            with html_output.open_output(output_file, encodings) as file:
+                timer.writelines(file, pieces, stage)
+            output_files.extend(html_output.output_paths(output_file, encodings))
+        return output_files
+
+    def font_css(self, font_file, characters=None):
+        # 以內嵌的本機字型取代樣式開頭的 Google Fonts @import；characters 為子集要保留的字元
+        import html_assets
+        return html_assets.embed_font(self.css, html_assets.font_face_css(self.font_family, font_file, characters))
+
+def register(theme):
+    THEMES[theme.name] = theme
+    return theme
+
+def theme_names():
+    return tuple(THEME_TOOLS) + tuple(name for name in THEMES if name not in THEME_TOOLS)
+
+def load_theme(name):
+    # 回傳已登記的主題；由工具腳本定義的主題在第一次使用時才載入腳本
+    theme = THEMES.get(name)
+    if theme is None and name in THEME_TOOLS:
+        import ai_tools
+        ai_tools.load_tool(name)
+        theme = THEMES.get(name)
+    if theme is None:
+        raise KeyError(f"Unknown theme: {name}")
+    return theme
+
+def convert_file(theme, path, args, timer=stage_timer.DISABLED, assets_written=False):
+    # 以單一主題轉換一個檔案，disney 與 styled 命令列（包括批次模式）共用：表格列由記憶體映射的輸入直接串流寫入輸出檔，
+    # 後備路徑的表格一律以一般標記輸出。args 為命令列參數（title 可省略、external_assets、split、virtual、compact、
+    # font_file、precompress 以及主題的 asset_options 用到的參數）；assets_written 為 True 時批次模式已寫好
+    # 輸出目錄的共用 CSS/JS。回傳寫出的檔案；沒有表格時寫出說明頁
+    base_name = os.path.splitext(path)[0]
+    output_dir = os.path.dirname(base_name) or '.'
+    title = getattr(args, 'title', None) or theme.default_title
+    options = theme.asset_options(args)
+    # 標準輸入、FIFO 只能讀一次，先複製到暫存檔，串流渲染期間都要保留
+    with fast_io.spooled(path) as source:
+        if args.font_file and not (args.external_assets and assets_written):
+            # 以本機字型取代 Google Fonts 的 @import，並只保留輸入檔與標題用到的字元
+            with timer.stage('font'):
+                import html_assets
+                characters = html_assets.used_characters(source, title + theme.font_characters)
+                options['css'] = theme.font_css(args.font_file, characters)
+        assets_href = None
+        if args.external_assets:
+            if not assets_written:
+                with timer.stage('assets'):
+                    theme.write_assets(output_dir, virtual=args.virtual, compact=args.compact,
+                                       encodings=args.precompress, **options)
+            assets_href = ''
+        assets = theme.page_assets(assets_href, virtual=args.virtual, compact=args.compact, **options)
+        document = parse_file(source, timer, stream=True)
+        if document is not None:
+            pages = theme.iter_pages(document, title, assets, args.split, args.virtual, args.compact)
+            return theme.write_pages(pages, base_name, timer, args.precompress)
+    output_file = theme.output_file(base_name)
+    with open(output_file, 'w', encoding='utf-8') as file:
+        file.write("No table found in the Markdown text.")
+    return [output_file]
+
+def plain_page_assets(assets_href=None, virtual=False, compact=False):
+    # 樸素主題只有樣式表；assets_href 為共用 CSS 檔所在目錄的相對路徑，None 表示內嵌
+    if compact:
+        styles = (f"<style>{html_output.minify_css(PLAIN_CSS)}</style>\n" if assets_href is None
+                  else f'<link rel="stylesheet" href="{assets_href}{PLAIN_CSS_FILE}">\n')
+    elif assets_href is None:
+        styles = f"        <style>\n{PLAIN_CSS}        </style>\n"
+    else:
+        styles = f'        <link rel="stylesheet" href="{assets_href}{PLAIN_CSS_FILE}">\n'
+    scripts = ''
+    if virtual:
+        virtual_styles, scripts = markdown_tables.virtual_page_assets(assets_href, compact)
+        styles += virtual_styles
+    return styles, scripts
+
+def write_plain_assets(output_dir, virtual=False, compact=False, encodings=()):
+    os.makedirs(output_dir, exist_ok=True)
+    assets = [(PLAIN_CSS_FILE, html_output.minify_css(PLAIN_CSS) if compact else PLAIN_CSS)]
+    if virtual:
+        js = markdown_tables.VIRTUAL_TABLE_JS
+        assets.append((markdown_tables.VIRTUAL_TABLE_JS_FILE, html_output.minify_js(js) if compact else js))
+    for filename, content in assets:
+        with html_output.open_output(os.path.join(output_dir, filename), encodings) as file:
+            file.write(content)
+
+PLAIN_THEME = register(Theme('plain', 'plain', html_output.compile_template(PLAIN_PAGE_TEMPLATE),
+                             plain_page_assets, write_plain_assets, 'Table', css=PLAIN_CSS))
@@ -0,0 +1,155 @@
+"""轉換流程的階段計時（--timings）與整體的 cProfile 輸出（--profile）。
+
+各函式一律接受 timer 參數；未啟用的計時器讓 stage() 與 iterate() 直接略過，不影響一般執行的速度。
+"""
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+class StageTimer:
+    # 每個階段只計入自身的時間與配置：巢狀的階段開始時外層階段暫停計算，
+    # 串流管線中交錯執行的讀檔、解析與寫出因此能分開統計。
+    # stats 為 階段名稱 → [呼叫次數, 秒數, 配置的位元組數, 執行期間的記憶體峰值]
+    def __init__(self, enabled=False, trace_memory=True):
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.stats = {}
+        self.elapsed = 0.0
+        self._stack = []
+        self._last = 0.0
+        self._current = 0
+        self._tracemalloc = None
+
+    def __enter__(self):
+        if self.trace_memory:
+            # tracemalloc 只有計時時才需要，延後到這裡才匯入
+            import tracemalloc
+            self._tracemalloc = tracemalloc
+            tracemalloc.start()
+        self._started = self._last = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.enabled:
+            self.elapsed += time.perf_counter() - self._started
+        if self._tracemalloc is not None:
+            self._tracemalloc.stop()
+            self._tracemalloc = None
+        return False
+
+    def _checkpoint(self):
+        # 把上一個檢查點之後的時間與配置計入目前執行中的階段
+        now = time.perf_counter()
+        tracer = self._tracemalloc
+        if tracer is not None:
+            current, peak = tracer.get_traced_memory()
+        if self._stack:
+            record = self.stats[self._stack[-1]]
+            record[1] += now - self._last
+            if tracer is not None:
+                record[2] += max(0, current - self._current)
+                record[3] = max(record[3], peak)
+        if tracer is not None:
+            self._current = current
+            tracer.reset_peak()
+        self._last = time.perf_counter()
+
+    def _enter(self, name):
+        self._checkpoint()
+        self._stack.append(name)
+        record = self.stats.get(name)
+        if record is None:
+            record = self.stats[name] = [0, 0.0, 0, 0]
+        record[0] += 1
+
+    def _exit(self):
+        self._checkpoint()
+        self._stack.pop()
+
+    def stage(self, name):
+        if not self.enabled:
+            return nullcontext()
+        return self._stage(name)
+
+    @contextmanager
+    def _stage(self, name):
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def iterate(self, name, iterable):
+        # 產生 iterable 的每一項，取得每一項所花的時間計入 name 階段（例如逐批讀檔、逐段產生輸出）
+        if not self.enabled:
+            return iterable
+        return self._iterate(name, iterable)
+
+    def _iterate(self, name, iterable):
+        iterator = iter(iterable)
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            yield item
+
+    def writelines(self, file, pieces, name='render'):
+        # 等同 file.writelines(pieces)；計時時把產生每一段（name 階段）與寫出（write 階段）分開統計
+        if not self.enabled:
+            file.writelines(pieces)
+            return
+        for piece in self._iterate(name, pieces):
+            with self._stage('write'):
+                file.write(piece)
+
+    def merge(self, stats, elapsed=0.0):
+        # 合併其他行程（例如批次模式的工作行程）回傳的 stats
+        for name, (calls, seconds, allocated, peak) in stats.items():
+            record = self.stats.setdefault(name, [0, 0.0, 0, 0])
+            record[0] += calls
+            record[1] += seconds
+            record[2] += allocated
+            record[3] = max(record[3], peak)
+        self.elapsed += elapsed
+
+    def report(self, file=None):
+        if not self.enabled:
+            return
+        file = file or sys.stderr
+        total = self.elapsed or sum(record[1] for record in self.stats.values()) or 1e-9
+        print(f"{'stage':16} {'calls':>8} {'ms':>10} {'%':>6} {'alloc MB':>10} {'peak MB':>9}", file=file)
+        for name, (calls, seconds, allocated, peak) in self.stats.items():
+            memory = (f"{allocated / (1024 * 1024):10.1f} {peak / (1024 * 1024):9.1f}"
+                      if self.trace_memory else f"{'-':>10} {'-':>9}")
+            print(f"{name:16} {calls:8} {seconds * 1000:10.1f} {seconds / total * 100:6.1f} {memory}", file=file)
+        print(f"{'total':16} {'':8} {total * 1000:10.1f}", file=file)
+
+DISABLED = StageTimer()
+
+def stop_tracing():
+    # 作為 ProcessPoolExecutor 的 initializer：fork 出的工作行程會繼承 tracemalloc，停止追蹤以免拖慢工作行程
+    import tracemalloc
+    tracemalloc.stop()
+
+@contextmanager
+def profiled(path=None, top=15, file=None):
+    # 以 cProfile 剖析整段執行，把 pstats 檔寫到 path，並印出累計時間最長的 top 個函式
+    if not path:
+        yield
+        return
+    import cProfile
+    import pstats
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        file = file or sys.stderr
+        pstats.Stats(profiler, stream=file).sort_stats('cumulative').print_stats(top)
+        print(f"Profile written to {path} (open it with python -m pstats {path})", file=file)
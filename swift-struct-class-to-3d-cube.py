@@ -1,80 +1,307 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+import argparse
+import html
+import json
 import os
 import sys
+import time
+
+import fast_io
+import file_watch
+import html_output
+import stage_timer
+
+# 預先編譯的正規表示式，只在模組載入時編譯一次
+ATTRIBUTE_PREFIX = r'(?:@\w+(?:\([^)]*\))?\s+)*'
+DECL_PATTERN = re.compile(
+    r'\s*' + ATTRIBUTE_PREFIX +
+    r'(?:(?:public|private|fileprivate|internal|open|final|indirect)\s+)*'
+    r'(class|struct|enum|protocol|extension|actor)\s+'
+    r'(?!(?:func|var|let|init|subscript|case)\b)([A-Za-z_][\w.]*)'
+    r'(?:\s*<[^>{]*>)?'
+    r'(?:\s*:\s*([^{]*?))?'
+    r'\s*(?:\bwhere\b[^{]*)?$'
+)
+MODIFIER_PREFIX = ATTRIBUTE_PREFIX + r'(?:[a-z]+(?:\(\w+\))?\s+)*'
+VAR_PATTERN = re.compile(r'\s*' + MODIFIER_PREFIX + r'(?:var|let)\s+\w+')
+CASE_PATTERN = re.compile(r'\s*(?:indirect\s+)?case\s+\S')
+FUNC_PATTERN = re.compile(r'\s*' + MODIFIER_PREFIX + r'func\s+([^\s(<]+)\s*(?:<[^>(]*>)?\s*\(')
+INIT_PATTERN = re.compile(r'\s*' + MODIFIER_PREFIX + r'init([?!]?)\s*(?:<[^>(]*>)?\s*\(')
+CODE_TOKEN = re.compile(r'"""|"|//|/\*')
+STRING_END = re.compile(r'\\.|"')
+MULTILINE_STRING_END = re.compile(r'\\.|"""')
+BLOCK_COMMENT_TOKEN = re.compile(r'/\*|\*/')
+BRACE = re.compile(r'[{}]')
+# 繼承清單中的類型名稱，略過 @unchecked 之類的屬性與泛型參數
+PARENT_NAME = re.compile(r'\s*(?:@\w+\s+)*([A-Za-z_][\w.]*)')
+
+def split_parent_types(text: str) -> List[str]:
+    # 以最外層的逗號切開繼承清單；泛型參數中的逗號（例如 Store<Dictionary<String, Item>>）不切開，
+    # 函式類型的 -> 不算是角括號
+    if '<' not in text and '(' not in text:
+        return [parent.strip() for parent in text.split(',') if parent.strip()]
+    parents = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(text):
+        if char in '<([':
+            depth += 1
+        elif char in ')]' or (char == '>' and text[index - 1:index] != '-'):
+            depth = max(0, depth - 1)
+        elif char == ',' and depth == 0:
+            parents.append(text[start:index].strip())
+            start = index + 1
+    parents.append(text[start:].strip())
+    return [parent for parent in parents if parent]
+
+class SwiftType:
+    # 跨檔案分析時整個專案的類型會同時留在記憶體中：以 __slots__ 省去每個節點的 __dict__，
+    # 種類、名稱、完整名稱與父類型以 sys.intern 共用字串，同名的類型在各檔案間只存一份
+    __slots__ = ('kind', 'name', 'qualified_name', 'parent_types', 'outer', 'line',
+                 'attributes', 'methods', 'init_methods', 'children')
+
+    def __init__(self, kind: str, name: str, parent_types: List[str],
+                 outer: Optional['SwiftType'] = None, line: int = 0):
+        self.kind = sys.intern(kind)
+        self.name = sys.intern(name)
+        self.qualified_name = self.name if outer is None else sys.intern(f"{outer.qualified_name}.{name}")
+        self.parent_types = [sys.intern(parent) for parent in parent_types]
+        self.outer = outer
+        self.line = line
+        self.attributes = []
+        self.methods = []
+        self.init_methods = []
+        self.children = []
+
+    def walk(self) -> Iterator['SwiftType']:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def get_info(self) -> Dict[str, Any]:
+        return {
+            'type': self.kind,
+            'name': self.qualified_name,
+            'attributes': self.attributes,
+            'methods': self.methods,
+            'parent_types': self.parent_types,
+            'init_methods': self.init_methods
+        }
+
+def _parenthesized(text: str, start: int) -> Tuple[str, int]:
+    # 從 text[start] 的左括號開始，回傳對應右括號之間的內容與右括號之後的位置；
+    # 參數跨行時回傳到行尾為止的內容
+    depth = 0
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:pos], pos + 1
+    return text[start + 1:].rstrip(), len(text)
 
 class SwiftStructClassParser:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, code: Optional[str] = None):
         self.file_path = file_path
-        self.code = self._read_swift_file()
-        self.lines = self.code.split('\n')
-        self.type = self._determine_type()
-        self.name = self._extract_name()
-        self.attributes = self._extract_attributes()
-        self.methods = self._extract_methods()
-        self.parent_types = self._extract_parent_types()
-        self.init_methods = self._extract_init_methods()
-
-    def _read_swift_file(self) -> str:
-        with open(self.file_path, 'r', encoding='utf-8') as file:
-            return file.read()
-
-    def _determine_type(self) -> str:
-        type_pattern = r'\b(class|struct)\b'
-        for line in self.lines:
-            match = re.search(type_pattern, line)
-            if match:
-                return match.group(1)
-        raise ValueError("無法確定是 class 還是 struct")
+        self.code = code
+        self.types = []
+        self._depth = 0
+        self._scopes = []
+        self._pending = None
+        self._pending_text = ''
+        self._comment_depth = 0
+        self._in_multiline_string = False
+        self._scan()
+
+        primary = self._primary_type()
+        self.type = primary.kind
+        self.name = primary.qualified_name
+        self.attributes = primary.attributes
+        self.methods = primary.methods
+        self.parent_types = primary.parent_types
+        self.init_methods = primary.init_methods
 
-    def _extract_name(self) -> str:
-        name_pattern = rf'{self.type}\s+(\w+)'
-        for line in self.lines:
-            match = re.search(name_pattern, line)
+    def _source_lines(self) -> Iterator[str]:
+        # 未提供原始碼時以記憶體映射逐區塊解碼，整個檔案不會同時以字串與行串列存在
+        if self.code is not None:
+            return iter(self.code.split('\n'))
+        return fast_io.iter_lines(self.file_path)
+
+    def _scan(self) -> None:
+        # 單次走訪所有行並追蹤大括號深度，建立檔案內所有類型（含巢狀類型、
+        # enum、protocol 與 extension）的樹狀結構；成員只歸屬於直接包含它的類型本體
+        brace_search = BRACE.search
+        scan_segment = self._scan_segment
+        for line_number, line in enumerate(self._source_lines(), 1):
+            if self._comment_depth or self._in_multiline_string or '"' in line or '/' in line:
+                code, masked = self._mask_line(line)
+            else:
+                code = masked = line
+            if '{' not in masked and '}' not in masked:
+                if code and not code.isspace():
+                    scan_segment(code, line_number)
+                continue
+            start = 0
+            match = brace_search(masked)
+            while match:
+                segment = code[start:match.start()]
+                if segment and not segment.isspace():
+                    scan_segment(segment, line_number)
+                if match.group() == '{':
+                    self._open_brace()
+                else:
+                    self._close_brace()
+                start = match.end()
+                match = brace_search(masked, start)
+            segment = code[start:]
+            if segment and not segment.isspace():
+                scan_segment(segment, line_number)
+
+        if not self.types:
+            raise ValueError("無法找到任何 class、struct、enum、protocol 或 extension 宣告")
+
+    def _mask_line(self, line: str) -> Tuple[str, str]:
+        # 回傳移除註解後的程式碼，以及額外把字串內容換成空白的版本（長度相同），
+        # 讓字串或註解中的大括號不影響深度計算
+        code = []
+        masked = []
+        pos = 0
+        length = len(line)
+        while pos < length:
+            if self._comment_depth:
+                match = BLOCK_COMMENT_TOKEN.search(line, pos)
+                end = match.end() if match else length
+                code.append(' ' * (end - pos))
+                masked.append(' ' * (end - pos))
+                if match:
+                    self._comment_depth += 1 if match.group() == '/*' else -1
+                pos = end
+            elif self._in_multiline_string:
+                end = length
+                match = MULTILINE_STRING_END.search(line, pos)
+                while match:
+                    if match.group() == '"""':
+                        self._in_multiline_string = False
+                        end = match.end()
+                        break
+                    match = MULTILINE_STRING_END.search(line, match.end())
+                code.append(line[pos:end])
+                masked.append(' ' * (end - pos))
+                pos = end
+            else:
+                match = CODE_TOKEN.search(line, pos)
+                if not match:
+                    code.append(line[pos:])
+                    masked.append(line[pos:])
+                    break
+                code.append(line[pos:match.start()])
+                masked.append(line[pos:match.start()])
+                token = match.group()
+                if token == '//':
+                    break
+                if token == '/*':
+                    self._comment_depth = 1
+                    code.append('  ')
+                    masked.append('  ')
+                    pos = match.end()
+                elif token == '"""':
+                    self._in_multiline_string = True
+                    code.append(token)
+                    masked.append('   ')
+                    pos = match.end()
+                else:
+                    end = length
+                    string_match = STRING_END.search(line, match.end())
+                    while string_match:
+                        if string_match.group() == '"':
+                            end = string_match.end()
+                            break
+                        string_match = STRING_END.search(line, string_match.end())
+                    code.append(line[match.start():end])
+                    masked.append(' ' * (end - match.start()))
+                    pos = end
+        return ''.join(code), ''.join(masked)
+
+    def _open_brace(self) -> None:
+        self._depth += 1
+        if self._pending is not None:
+            self._scopes.append((self._pending, self._depth))
+            self._pending = None
+
+    def _close_brace(self) -> None:
+        if self._scopes and self._scopes[-1][1] == self._depth:
+            self._scopes.pop()
+        self._depth = max(0, self._depth - 1)
+        self._pending = None
+
+    def _scan_segment(self, text: str, line_number: int) -> None:
+        scope = self._scopes[-1][0] if self._scopes else None
+
+        if self._pending is not None:
+            # 宣告還沒遇到 { 時，繼承清單與 where 子句可能跨越多行：接上先前的宣告文字重新比對
+            declaration = f"{self._pending_text} {text}"
+            match = DECL_PATTERN.match(declaration)
             if match:
-                return match.group(1)
-        raise ValueError(f"無法找到 {self.type} 名稱")
-
-    def _extract_attributes(self) -> List[str]:
-        attributes = []
-        var_pattern = r'\s*(var|let)\s+(\w+)(:.*)?'
-        for line in self.lines:
-            match = re.search(var_pattern, line)
+                parents = match.group(3)
+                self._pending.parent_types = [sys.intern(parent) for parent in split_parent_types(parents)] \
+                    if parents else []
+                self._pending_text = declaration
+                return
+
+        if 'class' in text or 'struct' in text or 'enum' in text or 'protocol' in text \
+                or 'extension' in text or 'actor' in text:
+            match = DECL_PATTERN.match(text)
             if match:
-                attributes.append(line.strip())
-        return attributes
-
-    def _extract_methods(self) -> List[str]:
-        methods = []
-        func_pattern = r'\s*func\s+(\w+)\s*\((.*?)\)(\s*->\s*\S+)?'
-        for line in self.lines:
-            match = re.search(func_pattern, line)
-            if match and not line.strip().startswith('init'):
-                method_name = match.group(1)
-                parameters = match.group(2)
-                return_type = match.group(3) or ''
-                method = f"func {method_name}({parameters}){return_type}"
-                methods.append(method.strip())
-        return methods
-
-    def _extract_parent_types(self) -> List[str]:
-        def_line = next(line for line in self.lines if self.type in line)
-        parent_pattern = rf'{self.type}\s+\w+\s*:\s*(.*)'
-        match = re.search(parent_pattern, def_line)
-        if match:
-            return [parent.strip() for parent in match.group(1).split(',')]
-        return []
+                parents = match.group(3)
+                node = SwiftType(
+                    match.group(1),
+                    match.group(2),
+                    split_parent_types(parents) if parents else [],
+                    scope,
+                    line_number
+                )
+                (scope.children if scope is not None else self.types).append(node)
+                self._pending = node
+                self._pending_text = text
+                return
 
-    def _extract_init_methods(self) -> List[str]:
-        init_methods = []
-        init_pattern = r'\s*init\s*\((.*?)\)'
-        for line in self.lines:
-            match = re.search(init_pattern, line)
+        # 只有直接位於類型本體中的宣告才算成員，方法本體內的區域變數不計入
+        if scope is None or self._scopes[-1][1] != self._depth:
+            return
+        if 'var' in text or 'let' in text:
+            if VAR_PATTERN.match(text):
+                scope.attributes.append(text.strip().rstrip('=').rstrip())
+                return
+        if 'case' in text and scope.kind == 'enum' and CASE_PATTERN.match(text):
+            scope.attributes.append(text.strip())
+            return
+        if 'func' in text:
+            match = FUNC_PATTERN.match(text)
+            if match:
+                parameters, end = _parenthesized(text, match.end() - 1)
+                signature = ' '.join(text[end:].split())
+                method = f"func {match.group(1)}({parameters})"
+                scope.methods.append(f"{method} {signature}" if signature else method)
+                return
+        if 'init' in text:
+            match = INIT_PATTERN.match(text)
             if match:
-                parameters = match.group(1)
-                init_method = f"init({parameters})"
-                init_methods.append(init_method.strip())
-        return init_methods
+                parameters, _ = _parenthesized(text, match.end() - 1)
+                scope.init_methods.append(f"init{match.group(1)}({parameters})")
+
+    def iter_types(self) -> Iterator[SwiftType]:
+        for node in self.types:
+            yield from node.walk()
+
+    def _primary_type(self) -> SwiftType:
+        # 與舊版相容：以第一個 class 或 struct 作為主要類型，否則取第一個類型
+        for node in self.iter_types():
+            if node.kind in ('class', 'struct'):
+                return node
+        return self.types[0]
 
     def get_info(self) -> Dict[str, Any]:
         return {
@@ -86,16 +313,10 @@ class SwiftStructClassParser:
             'init_methods': self.init_methods
         }
 
-def generate_html(info: Dict[str, Any]) -> str:
-    html_template = """
-<!DOCTYPE html>
-<html lang="zh-TW">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{type} {name} 3D 旋轉立方體圖表</title>
-    <style>
-        body {{
+    def get_infos(self) -> List[Dict[str, Any]]:
+        return [node.get_info() for node in self.iter_types()]
+
+CUBE_CSS = """        body {
             font-family: Arial, sans-serif;
             display: flex;
             justify-content: center;
@@ -104,20 +325,20 @@ def generate_html(info: Dict[str, Any]) -> str:
             margin: 0;
             background-color: #f0f8ff;
             perspective: 1000px;
-        }}
-        .scene {{
+        }
+        .scene {
             width: 300px;
             height: 300px;
             perspective: 600px;
-        }}
-        .cube {{
+        }
+        .cube {
             width: 100%;
             height: 100%;
             position: relative;
             transform-style: preserve-3d;
             transition: transform 0.5s;
-        }}
-        .cube__face {{
+        }
+        .cube__face {
             position: absolute;
             width: 300px;
             height: 300px;
@@ -132,37 +353,107 @@ def generate_html(info: Dict[str, Any]) -> str:
             text-align: center;
             opacity: 0.8;
             overflow: auto;
-        }}
-        .cube__face--front  {{ background: #FF9AA2; transform: rotateY(  0deg) translateZ(150px); }}
-        .cube__face--right  {{ background: #FFDAC1; transform: rotateY( 90deg) translateZ(150px); }}
-        .cube__face--back   {{ background: #FFB7B2; transform: rotateY(180deg) translateZ(150px); }}
-        .cube__face--left   {{ background: #E2F0CB; transform: rotateY(-90deg) translateZ(150px); }}
-        .cube__face--top    {{ background: #B5EAD7; transform: rotateX( 90deg) translateZ(150px); }}
-        .cube__face--bottom {{ background: #C7CEEA; transform: rotateX(-90deg) translateZ(150px); }}
-        .type-name {{
+        }
+        .cube__face--front  { background: #FF9AA2; transform: rotateY(  0deg) translateZ(150px); }
+        .cube__face--right  { background: #FFDAC1; transform: rotateY( 90deg) translateZ(150px); }
+        .cube__face--back   { background: #FFB7B2; transform: rotateY(180deg) translateZ(150px); }
+        .cube__face--left   { background: #E2F0CB; transform: rotateY(-90deg) translateZ(150px); }
+        .cube__face--top    { background: #B5EAD7; transform: rotateX( 90deg) translateZ(150px); }
+        .cube__face--bottom { background: #C7CEEA; transform: rotateX(-90deg) translateZ(150px); }
+        .type-name {
             font-size: 24px;
             margin-bottom: 10px;
-        }}
-        .content {{
+        }
+        .content {
             font-size: 14px;
             text-align: left;
-        }}
-        .controls {{
+        }
+        .controls {
             position: absolute;
             bottom: 20px;
             display: flex;
             gap: 10px;
-        }}
-        button {{
+        }
+        button {
             padding: 10px 20px;
             background-color: #4682b4;
             color: white;
             border: none;
             border-radius: 5px;
             cursor: pointer;
-        }}
-    </style>
-</head>
+        }
+"""
+
+CUBE_JS = """        let cube = document.querySelector('.cube');
+        let rotateX = 0, rotateY = 0;
+        let autoRotate = false;
+
+        function updateRotation() {
+            cube.style.transform = `rotateX(${rotateX}deg) rotateY(${rotateY}deg)`;
+        }
+
+        document.getElementById('rotateX').addEventListener('click', () => {
+            rotateX += 90;
+            updateRotation();
+        });
+
+        document.getElementById('rotateY').addEventListener('click', () => {
+            rotateY += 90;
+            updateRotation();
+        });
+
+        document.getElementById('auto').addEventListener('click', () => {
+            autoRotate = !autoRotate;
+            if (autoRotate) {
+                autoRotateAnimation();
+            }
+        });
+
+        function autoRotateAnimation() {
+            if (autoRotate) {
+                rotateY += 1;
+                updateRotation();
+                requestAnimationFrame(autoRotateAnimation);
+            }
+        }
+
+        // 滑鼠拖動旋轉
+        let isDragging = false;
+        let previousMousePosition = { x: 0, y: 0 };
+
+        document.addEventListener('mousedown', (e) => {
+            isDragging = true;
+        });
+
+        document.addEventListener('mousemove', (e) => {
+            if (isDragging) {
+                let deltaMove = {
+                    x: e.clientX - previousMousePosition.x,
+                    y: e.clientY - previousMousePosition.y
+                };
+                rotateY += deltaMove.x * 0.5;
+                rotateX -= deltaMove.y * 0.5;
+                updateRotation();
+            }
+            previousMousePosition = {
+                x: e.clientX,
+                y: e.clientY
+            };
+        });
+
+        document.addEventListener('mouseup', (e) => {
+            isDragging = false;
+        });
+"""
+
+CUBE_PAGE_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="zh-TW">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>{type} {name} 3D 旋轉立方體圖表</title>
+{styles}</head>
 <body>
     <div class="scene">
         <div class="cube">
@@ -188,7 +479,7 @@ def generate_html(info: Dict[str, Any]) -> str:
             </div>
             <div class="cube__face cube__face--bottom">
                 <div class="type-name">子類型</div>
-                <div class="content">無</div>
+                <div class="content">{subtypes}</div>
             </div>
         </div>
     </div>
@@ -198,106 +489,1205 @@ def generate_html(info: Dict[str, Any]) -> str:
         <button id="auto">自動旋轉</button>
     </div>
 
-    <script>
-        let cube = document.querySelector('.cube');
-        let rotateX = 0, rotateY = 0;
-        let autoRotate = false;
+{scripts}</body>
+</html>
+    """
 
-        function updateRotation() {{
-            cube.style.transform = `rotateX(${{rotateX}}deg) rotateY(${{rotateY}}deg)`;
-        }}
+CUBE_CSS_FILE = 'cube-3d.css'
+CUBE_JS_FILE = 'cube-3d.js'
+INLINE_STYLES = f"    <style>\n{CUBE_CSS}    </style>\n"
+INLINE_SCRIPTS = f"    <script>\n{CUBE_JS}    </script>\n"
+COMPACT_STYLES = f"<style>{html_output.minify_css(CUBE_CSS)}</style>\n"
+COMPACT_SCRIPTS = f"<script>{html_output.minify_js(CUBE_JS)}</script>\n"
 
-        document.getElementById('rotateX').addEventListener('click', () => {{
-            rotateX += 90;
-            updateRotation();
-        }});
+CUBE_PAGE_CHUNKS = html_output.compile_template(CUBE_PAGE_TEMPLATE)
+CUBE_COMPACT_CHUNKS = html_output.compact_chunks(CUBE_PAGE_CHUNKS)
 
-        document.getElementById('rotateY').addEventListener('click', () => {{
-            rotateY += 90;
-            updateRotation();
-        }});
+def _join_escaped(items: List[str]) -> str:
+    return '<br>'.join(html.escape(item, quote=False) for item in items)
 
-        document.getElementById('auto').addEventListener('click', () => {{
-            autoRotate = !autoRotate;
-            if (autoRotate) {{
-                autoRotateAnimation();
-            }}
-        }});
+def render_html_pieces(info: Dict[str, Any], assets_href: Optional[str] = None,
+                       relations: Optional['Relations'] = None, compact: bool = False) -> List[str]:
+    # assets_href 為共用 CSS/JS 檔所在目錄的相對路徑；None 表示把 CSS/JS 內嵌在頁面中。
+    # relations 為 SwiftTypeIndex.relations() 中這個檔案的部分；沒有時父類型直接取宣告中的文字，子類型為「無」。
+    # compact 時使用去除縮排的模板，內嵌的 CSS/JS 也經過壓縮
+    related = relations.get(f"{info['type']} {info['name']}") if relations else None
+    if compact:
+        if assets_href is None:
+            styles, scripts = COMPACT_STYLES, COMPACT_SCRIPTS
+        else:
+            styles = f'<link rel="stylesheet" href="{assets_href}{CUBE_CSS_FILE}">\n'
+            scripts = f'<script src="{assets_href}{CUBE_JS_FILE}"></script>\n'
+    elif assets_href is None:
+        styles, scripts = INLINE_STYLES, INLINE_SCRIPTS
+    else:
+        styles = f'    <link rel="stylesheet" href="{assets_href}{CUBE_CSS_FILE}">\n'
+        scripts = f'    <script src="{assets_href}{CUBE_JS_FILE}"></script>\n'
+    values = {
+        'type': info['type'].capitalize(),
+        'name': html.escape(info['name']),
+        'methods': _join_escaped(info['methods']),
+        'attributes': _join_escaped(info['attributes']),
+        'parent_types': _join_escaped(related['parents'] if related else info['parent_types']) or '無',
+        'subtypes': _join_escaped(related['children'] if related else []) or '無',
+        'init_methods': _join_escaped(info['init_methods']) or '無',
+        'styles': styles,
+        'scripts': scripts
+    }
+    pieces = []
+    for literal, field in CUBE_COMPACT_CHUNKS if compact else CUBE_PAGE_CHUNKS:
+        pieces.append(literal)
+        if field is not None:
+            pieces.append(values[field])
+    return pieces
 
-        function autoRotateAnimation() {{
-            if (autoRotate) {{
-                rotateY += 1;
-                updateRotation();
-                requestAnimationFrame(autoRotateAnimation);
-            }}
-        }}
+def generate_html(info: Dict[str, Any], assets_href: Optional[str] = None,
+                  relations: Optional['Relations'] = None, compact: bool = False) -> str:
+    return ''.join(render_html_pieces(info, assets_href, relations, compact))
 
-        // 滑鼠拖動旋轉
-        let isDragging = false;
-        let previousMousePosition = {{ x: 0, y: 0 }};
+def write_cube_assets(output_dir: str, compact: bool = False, encodings: Tuple[str, ...] = ()) -> List[str]:
+    # 批次輸出時共用的 CSS/JS 只寫一次，所有頁面以相對路徑引用；encodings 為要一併寫出的壓縮副本
+    os.makedirs(output_dir, exist_ok=True)
+    if compact:
+        assets = ((CUBE_CSS_FILE, html_output.minify_css(CUBE_CSS)), (CUBE_JS_FILE, html_output.minify_js(CUBE_JS)))
+    else:
+        assets = ((CUBE_CSS_FILE, CUBE_CSS), (CUBE_JS_FILE, CUBE_JS))
+    paths = []
+    for filename, content in assets:
+        path = os.path.join(output_dir, filename)
+        with html_output.open_output(path, encodings) as f:
+            f.write(content)
+        paths.extend(html_output.output_paths(path, encodings))
+    return paths
 
-        document.addEventListener('mousedown', (e) => {{
-            isDragging = true;
-        }});
+GALLERY_CSS = """        body {
+            font-family: Arial, sans-serif;
+            margin: 0;
+            background-color: #f0f8ff;
+            color: #333;
+        }
+        .gallery-header {
+            position: sticky;
+            top: 0;
+            z-index: 2;
+            display: flex;
+            gap: 16px;
+            align-items: center;
+            padding: 12px 20px;
+            background-color: #4682b4;
+            color: white;
+        }
+        .gallery-header h1 {
+            font-size: 20px;
+            margin: 0;
+        }
+        #search {
+            flex: 1;
+            max-width: 400px;
+            padding: 8px 12px;
+            border: none;
+            border-radius: 5px;
+            font-size: 14px;
+        }
+        .gallery {
+            display: grid;
+            grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
+            gap: 20px;
+            padding: 20px;
+        }
+        .card {
+            height: 380px;
+            background-color: white;
+            border-radius: 8px;
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.1);
+            display: flex;
+            flex-direction: column;
+            align-items: center;
+            overflow: hidden;
+            contain: content;
+        }
+        .card[hidden] {
+            display: none;
+        }
+        .card-title {
+            font-size: 16px;
+            margin: 12px 10px 0;
+            text-align: center;
+        }
+        .card-title a {
+            color: inherit;
+            text-decoration: none;
+        }
+        .card-file {
+            font-size: 12px;
+            color: #777;
+        }
+        .scene {
+            width: 220px;
+            height: 220px;
+            margin: 30px 0 20px;
+            perspective: 600px;
+            touch-action: none;
+        }
+        .cube {
+            width: 100%;
+            height: 100%;
+            position: relative;
+            transform-style: preserve-3d;
+            cursor: grab;
+        }
+        .cube__face {
+            position: absolute;
+            width: 220px;
+            height: 220px;
+            border: 2px solid #333;
+            display: flex;
+            justify-content: center;
+            align-items: center;
+            flex-direction: column;
+            padding: 8px;
+            box-sizing: border-box;
+            font-weight: bold;
+            text-align: center;
+            opacity: 0.8;
+            overflow: auto;
+        }
+        .cube__face--front  { background: #FF9AA2; transform: rotateY(  0deg) translateZ(110px); }
+        .cube__face--right  { background: #FFDAC1; transform: rotateY( 90deg) translateZ(110px); }
+        .cube__face--back   { background: #FFB7B2; transform: rotateY(180deg) translateZ(110px); }
+        .cube__face--left   { background: #E2F0CB; transform: rotateY(-90deg) translateZ(110px); }
+        .cube__face--top    { background: #B5EAD7; transform: rotateX( 90deg) translateZ(110px); }
+        .cube__face--bottom { background: #C7CEEA; transform: rotateX(-90deg) translateZ(110px); }
+        .type-name {
+            font-size: 16px;
+            margin-bottom: 6px;
+        }
+        .content {
+            font-size: 11px;
+            text-align: left;
+        }
+        .card-controls {
+            display: flex;
+            gap: 6px;
+        }
+        .card-controls button {
+            padding: 6px 12px;
+            background-color: #4682b4;
+            color: white;
+            border: none;
+            border-radius: 5px;
+            cursor: pointer;
+        }
+"""
 
-        document.addEventListener('mousemove', (e) => {{
-            if (isDragging) {{
-                let deltaMove = {{
-                    x: e.clientX - previousMousePosition.x,
-                    y: e.clientY - previousMousePosition.y
-                }};
-                rotateY += deltaMove.x * 0.5;
-                rotateX -= deltaMove.y * 0.5;
-                updateRotation();
-            }}
-            previousMousePosition = {{
-                x: e.clientX,
-                y: e.clientY
-            }};
-        }});
+GALLERY_JS = """        (function () {
+            // 每個類型為索引中的一列：[種類, 名稱, 檔案, 頁面, 方法, 屬性, 初始化方法, 父類型, 子類型]，
+            // 種類與檔案為 kinds 與 files 中的位置
+            const data = JSON.parse(document.getElementById('cube-index').textContent);
+            const grid = document.querySelector('.gallery');
+            const search = document.getElementById('search');
+            const count = document.getElementById('count');
+            const ESCAPES = { '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' };
+            const FACES = [['right', '屬性', 5], ['left', '初始化方法', 6], ['back', '方法', 4],
+                           ['top', '父類型', 7], ['bottom', '子類型', 8]];
 
-        document.addEventListener('mouseup', (e) => {{
-            isDragging = false;
-        }});
-    </script>
-</body>
+            function escapeHtml(text) {
+                return text.replace(/[&<>"]/g, c => ESCAPES[c]);
+            }
+            function list(items) {
+                return items.length ? items.map(escapeHtml).join('<br>') : '無';
+            }
+            function title(type) {
+                const kind = data.kinds[type[0]];
+                return escapeHtml(kind.charAt(0).toUpperCase() + kind.slice(1) + ' ' + type[1]);
+            }
+            function face(side, name, content) {
+                return '<div class="cube__face cube__face--' + side + '"><div class="type-name">' + name
+                    + '</div><div class="content">' + content + '</div></div>';
+            }
+
+            // 卡片只有標題與空的場景，以一次 innerHTML 建立；立方體的 DOM 在卡片接近可見範圍時才建立，離開後移除
+            grid.innerHTML = data.types.map((type, index) =>
+                '<article class="card" data-index="' + index + '"><h2 class="card-title"><a href="'
+                + escapeHtml(type[3]) + '">' + title(type) + '</a></h2><div class="card-file">'
+                + escapeHtml(data.files[type[2]]) + '</div><div class="scene"></div><div class="card-controls">'
+                + '<button data-action="x">旋轉 X</button><button data-action="y">旋轉 Y</button>'
+                + '<button data-action="auto">自動旋轉</button></div></article>').join('');
+            const cards = grid.children;
+            const states = data.types.map(() => ({ x: 0, y: 0, auto: false, cube: null }));
+
+            // 所有立方體共用一個 requestAnimationFrame 迴圈：只更新有變化或自動旋轉中的立方體，沒有需要更新的就停止
+            const spinning = new Set();
+            const dirty = new Set();
+            let frame = 0;
+            let last = 0;
+            function apply(state) {
+                state.cube.style.transform = 'rotateX(' + state.x + 'deg) rotateY(' + state.y + 'deg)';
+            }
+            function schedule() {
+                if (!frame) {
+                    frame = requestAnimationFrame(tick);
+                }
+            }
+            function tick(now) {
+                frame = 0;
+                // 自動旋轉約每秒 60 度，與畫面更新率無關
+                const step = last ? Math.min(now - last, 100) * 0.06 : 1;
+                last = spinning.size ? now : 0;
+                for (const state of spinning) {
+                    state.y += step;
+                    dirty.add(state);
+                }
+                for (const state of dirty) {
+                    if (state.cube) {
+                        apply(state);
+                    }
+                }
+                dirty.clear();
+                if (spinning.size) {
+                    schedule();
+                }
+            }
+
+            function mount(card) {
+                const index = +card.dataset.index;
+                const state = states[index];
+                if (state.cube) {
+                    return;
+                }
+                const type = data.types[index];
+                const scene = card.querySelector('.scene');
+                scene.innerHTML = '<div class="cube">' + face('front', title(type), '定義')
+                    + FACES.map(([side, name, field]) => face(side, name, list(type[field]))).join('') + '</div>';
+                state.cube = scene.firstChild;
+                apply(state);
+                if (state.auto) {
+                    spinning.add(state);
+                    schedule();
+                }
+            }
+            function unmount(card) {
+                const state = states[+card.dataset.index];
+                if (state.cube) {
+                    spinning.delete(state);
+                    state.cube.remove();
+                    state.cube = null;
+                }
+            }
+            const observer = new IntersectionObserver(entries => {
+                for (const entry of entries) {
+                    if (entry.isIntersecting) {
+                        mount(entry.target);
+                    } else {
+                        unmount(entry.target);
+                    }
+                }
+            }, { rootMargin: '300px 0px' });
+            for (const card of cards) {
+                observer.observe(card);
+            }
+
+            // 事件都委派給整個圖庫：按鈕一個 click 處理器，拖曳一組 pointer 處理器
+            grid.addEventListener('click', event => {
+                const button = event.target.closest('button[data-action]');
+                if (!button) {
+                    return;
+                }
+                const state = states[+button.closest('.card').dataset.index];
+                const action = button.dataset.action;
+                if (action === 'x') {
+                    state.x += 90;
+                } else if (action === 'y') {
+                    state.y += 90;
+                } else {
+                    state.auto = !state.auto;
+                    if (state.auto && state.cube) {
+                        spinning.add(state);
+                    } else {
+                        spinning.delete(state);
+                    }
+                }
+                dirty.add(state);
+                schedule();
+            });
+
+            let drag = null;
+            grid.addEventListener('pointerdown', event => {
+                const cube = event.target.closest('.cube');
+                if (!cube) {
+                    return;
+                }
+                drag = { state: states[+cube.closest('.card').dataset.index], x: event.clientX, y: event.clientY };
+                cube.setPointerCapture(event.pointerId);
+                event.preventDefault();
+            });
+            document.addEventListener('pointermove', event => {
+                if (!drag) {
+                    return;
+                }
+                drag.state.y += (event.clientX - drag.x) * 0.5;
+                drag.state.x -= (event.clientY - drag.y) * 0.5;
+                drag.x = event.clientX;
+                drag.y = event.clientY;
+                dirty.add(drag.state);
+                schedule();
+            });
+            function endDrag() {
+                drag = null;
+            }
+            document.addEventListener('pointerup', endDrag);
+            document.addEventListener('pointercancel', endDrag);
+
+            // 搜尋比對種類、名稱、檔名與所有成員；以空白分隔的每個詞都必須出現
+            let haystacks = null;
+            let pending = 0;
+            function filter() {
+                const terms = search.value.toLowerCase().split(/\\s+/).filter(Boolean);
+                if (!haystacks) {
+                    haystacks = data.types.map(type => [data.kinds[type[0]], type[1], data.files[type[2]]]
+                        .concat(type[4], type[5], type[6], type[7], type[8]).join('\\n').toLowerCase());
+                }
+                let shown = 0;
+                haystacks.forEach((text, index) => {
+                    const match = terms.every(term => text.includes(term));
+                    cards[index].hidden = !match;
+                    shown += match;
+                });
+                count.textContent = terms.length ? shown + ' / ' + data.types.length + ' 個類型' : data.types.length + ' 個類型';
+            }
+            search.addEventListener('input', () => {
+                clearTimeout(pending);
+                pending = setTimeout(filter, 150);
+            });
+        })();
+"""
+
+GALLERY_PAGE_TEMPLATE = """
+<!DOCTYPE html>
+<html lang="zh-TW">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>3D 類型圖庫</title>
+{styles}</head>
+<body>
+    <header class="gallery-header">
+        <h1>3D 類型圖庫</h1>
+        <input id="search" type="search" placeholder="搜尋類型、成員或檔名">
+        <span id="count">{count} 個類型</span>
+    </header>
+    <main class="gallery"></main>
+    <script type="application/json" id="cube-index">{index}</script>
+{scripts}</body>
 </html>
     """
-    return html_template.format(
-        type=info['type'].capitalize(),
-        name=info['name'],
-        methods='<br>'.join(info['methods']),
-        attributes='<br>'.join(info['attributes']),
-        parent_types='<br>'.join(info['parent_types']) or '無',
-        init_methods='<br>'.join(info['init_methods']) or '無'
-    )
-
-def swift_file_to_3d_cube(swift_file_path: str) -> None:
+
+GALLERY_FILE = 'cube-gallery.html'
+GALLERY_PAGE_CHUNKS = html_output.compile_template(GALLERY_PAGE_TEMPLATE)
+GALLERY_COMPACT_CHUNKS = html_output.compact_chunks(GALLERY_PAGE_CHUNKS)
+
+# 變更解析結果或 HTML 輸出格式時需要遞增，讓舊的快取項目與專案索引失效
+GENERATOR_VERSION = '6'
+# 每個快取項目最多保留幾種輸出選項的輸出檔名
+MAX_OUTPUT_VARIANTS = 8
+
+class CubeCache:
+    """以檔案內容雜湊為鍵的磁碟快取，保存 get_infos() 結果與各輸出選項下的輸出檔名。"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = 64 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(content) -> str:
+        # 鍵只取決於內容與產生器版本，輸出選項不同時仍可沿用同一份解析結果；
+        # hashlib 只有快取會用到，延後到這裡才匯入
+        import hashlib
+        digest = hashlib.sha256(f"{GENERATOR_VERSION}\0".encode('utf-8'))
+        digest.update(content)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        # 更新修改時間，淘汰時以最久未使用的項目優先
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        # 先寫入暫存檔再取代，多個工作行程同時寫入也不會留下不完整的項目
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+    def evict(self) -> Tuple[int, int]:
+        # 總大小超過上限時，從最久未使用的項目開始刪除；回傳刪除數量與剩餘大小
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed, total
+
+INDEX_FILE = '.swift-type-index.json'
+# 一個檔案中各類型的父類型與子類型："種類 名稱" → {'parents': [...], 'children': [...]}
+Relations = Dict[str, Dict[str, List[str]]]
+
+def _file_stat(path: str) -> List[int]:
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+class SwiftTypeIndex:
+    """整個專案的類型索引：記錄每個檔案宣告的類型與繼承清單，存成 JSON 檔後可逐檔增量更新。
+
+    relations() 依索引解析每個類型的父類型（含 extension 加上的協定）與直接子類型，
+    單一檔案的解析器看不到的跨檔案關係也能顯示在立方體上。
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        # path 為 None 時只存在記憶體中；files 為 絕對路徑 → {'stat': [mtime_ns, size], 'types': [[種類, 名稱, 父類型清單], ...]}
+        self.path = path
+        self.files = {}
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == GENERATOR_VERSION:
+                    self.files = data['files']
+                    # json 載入的每個字串都是新物件；名稱在各檔案的繼承清單中重複出現，改為共用
+                    intern = sys.intern
+                    for entry in self.files.values():
+                        entry['types'] = [[intern(kind), intern(name), [intern(parent) for parent in parents]]
+                                          for kind, name, parents in entry['types']]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def stale_files(self, files: List[str]) -> List[str]:
+        # 回傳索引中沒有、或修改時間與大小已改變的檔案（絕對路徑）
+        stale = []
+        for path in files:
+            path = os.path.abspath(path)
+            entry = self.files.get(path)
+            try:
+                if entry is not None and entry['stat'] == _file_stat(path):
+                    continue
+            except OSError:
+                continue
+            stale.append(path)
+        return stale
+
+    def update(self, path: str, stat: List[int], infos: List[Dict[str, Any]]) -> None:
+        self.files[os.path.abspath(path)] = {
+            'stat': stat,
+            'types': [[info['type'], info['name'], info['parent_types']] for info in infos],
+        }
+
+    def prune(self, files: List[str]) -> None:
+        # 移除不在 files 中（已刪除或不再屬於專案）的檔案
+        keep = {os.path.abspath(path) for path in files}
+        for path in [path for path in self.files if path not in keep]:
+            del self.files[path]
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': GENERATOR_VERSION, 'files': self.files}, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def relations(self) -> Dict[str, Relations]:
+        # 回傳 絕對路徑 → {"種類 名稱": {'parents': [...], 'children': [...]}}；
+        # 專案中找得到的類型顯示為「種類 完整名稱」，找不到的（例如系統框架的類型）保留原文
+        declared = {}
+        for entry in self.files.values():
+            for kind, name, _ in entry['types']:
+                if kind != 'extension':
+                    declared.setdefault(name, kind)
+
+        def resolve(name: str, scope: str) -> Optional[str]:
+            # 依 Swift 的查找順序：先找外層類型中的巢狀類型，再找頂層；
+            # 帶模組前綴的名稱（例如 MyApp.Base）逐步去掉前綴再找
+            while scope:
+                candidate = f"{scope}.{name}"
+                if candidate in declared:
+                    return candidate
+                scope = scope.rpartition('.')[0]
+            while name:
+                if name in declared:
+                    return name
+                name = name.partition('.')[2]
+            return None
+
+        def resolve_parents(name: str, parent_types: List[str]) -> List[Tuple[str, Optional[str]]]:
+            scope = name.rpartition('.')[0]
+            resolved = []
+            for text in parent_types:
+                match = PARENT_NAME.match(text)
+                resolved.append((text, resolve(match.group(1), scope) if match else None))
+            return resolved
+
+        def label(name: str) -> str:
+            return f"{declared[name]} {name}"
+
+        # 先收集每個類型的父類型與子類型，extension 的協定併入被擴充的類型
+        parents = {}
+        children = {}
+        for path in sorted(self.files):
+            for kind, name, parent_types in self.files[path]['types']:
+                owner = resolve(name, name.rpartition('.')[0]) if kind == 'extension' else name
+                owner_label = label(owner) if owner else f"{kind} {name}"
+                for text, target in resolve_parents(name, parent_types):
+                    shown = label(target) if target else text
+                    if owner:
+                        owner_parents = parents.setdefault(owner, [])
+                        if shown not in owner_parents:
+                            owner_parents.append(shown)
+                    if target:
+                        children.setdefault(target, set()).add(owner_label)
+
+        result = {}
+        for path, entry in self.files.items():
+            file_relations = {}
+            for kind, name, parent_types in entry['types']:
+                if kind == 'extension':
+                    # extension 的立方體只顯示它自己加上的父類型
+                    related = {
+                        'parents': [label(target) if target else text
+                                    for text, target in resolve_parents(name, parent_types)],
+                        'children': [],
+                    }
+                else:
+                    related = {'parents': parents.get(name, []), 'children': sorted(children.get(name, ()))}
+                file_relations[f"{kind} {name}"] = related
+            result[path] = file_relations
+        return result
+
+def _index_batch_item(path: str) -> Tuple[str, Optional[List[int]], List[Dict[str, Any]]]:
+    # 在工作行程中執行：解析一個檔案供索引使用；無法讀取或沒有任何類型的檔案以空清單記錄，下次不必重新解析
     try:
-        parser = SwiftStructClassParser(swift_file_path)
-        info = parser.get_info()
-        html_content = generate_html(info)
-        
-        # 將生成的 HTML 保存到文件
-        filename = f"{info['type']}_{info['name']}_3d_cube.html"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        print(f"3D 圖表已生成：{filename}")
+        stat = _file_stat(path)
+    except OSError:
+        return path, None, []
+    try:
+        infos = SwiftStructClassParser(path).get_infos()
+    except (OSError, ValueError, UnicodeDecodeError):
+        infos = []
+    return path, stat, infos
+
+def update_type_index(index: SwiftTypeIndex, files: List[str], run=None,
+                      prune: bool = False) -> Dict[str, List[Dict[str, Any]]]:
+    # 只重新解析索引中過期的檔案；prune 時 files 為專案的完整檔案清單（批次模式），移除不在其中的檔案。
+    # run(func, items) 可換成行程池的 map。回傳新解析的 絕對路徑 → infos，渲染時不必再解析一次
+    run = run or (lambda func, items: [func(item) for item in items])
+    parsed = {}
+    for path, stat, infos in run(_index_batch_item, index.stale_files(files)):
+        if stat is None:
+            continue
+        index.update(path, stat, infos)
+        if infos:
+            parsed[path] = infos
+    if prune:
+        index.prune(files)
+    index.save()
+    return parsed
+
+def _write_cubes(infos: List[Dict[str, Any]], output_dir: str, assets_href: Optional[str] = None,
+                 relations: Optional[Relations] = None,
+                 timer: stage_timer.StageTimer = stage_timer.DISABLED,
+                 compact: bool = False, encodings: Tuple[str, ...] = ()) -> List[str]:
+    os.makedirs(output_dir, exist_ok=True)
+    filenames = []
+    used_names = set()
+    for info in infos:
+        # 將生成的 HTML 保存到文件；同名的 extension 依序加上編號
+        base_name = f"{info['type']}_{info['name']}"
+        filename = f"{base_name}_3d_cube.html"
+        counter = 2
+        while filename in used_names:
+            filename = f"{base_name}_{counter}_3d_cube.html"
+            counter += 1
+        used_names.add(filename)
+        # 預先壓縮的副本在寫入時同步串流壓縮，不必再讀回輸出檔
+        with html_output.open_output(os.path.join(output_dir, filename), encodings) as f:
+            timer.writelines(f, render_html_pieces(info, assets_href, relations, compact))
+        filenames.append(filename)
+    return filenames
+
+class CubeGallery:
+    """把專案中所有類型收集到單一的圖庫頁面：類型資料以精簡的 JSON 索引內嵌，立方體捲動到可見範圍時才建立。"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        # 來源檔的絕對路徑 → 該檔案中各類型的
+        # [種類, 名稱, 頁面, 方法, 屬性, 初始化方法, 父類型, 子類型]
+        self.entries: Dict[str, List[List[Any]]] = {}
+
+    def add(self, swift_file_path: str, infos: List[Dict[str, Any]], output_dir: str, names: List[str],
+            relations: Optional['Relations'] = None) -> None:
+        # names 為 _write_cubes 依 infos 順序產生的頁面檔名，頁面路徑存為相對於圖庫的連結
+        rows = []
+        for info, name in zip(infos, names):
+            related = relations.get(f"{info['type']} {info['name']}") if relations else None
+            href = os.path.relpath(os.path.join(output_dir, name), self.output_dir).replace(os.sep, '/')
+            rows.append([info['type'], info['name'], href, info['methods'], info['attributes'], info['init_methods'],
+                         related['parents'] if related else info['parent_types'],
+                         related['children'] if related else []])
+        self.entries[os.path.abspath(swift_file_path)] = rows
+
+    def remove(self, swift_file_path: str) -> None:
+        self.entries.pop(os.path.abspath(swift_file_path), None)
+
+    def build_index(self) -> Dict[str, Any]:
+        # 每個類型為一個陣列而不是物件，種類與檔名各只保存一次並以位置引用，數千個類型的索引也不會太大；
+        # 檔名顯示為相對於所有來源檔共同目錄的路徑
+        paths = sorted(self.entries)
+        root = _source_root(paths) if paths else ''
+        kinds: List[str] = []
+        kind_positions: Dict[str, int] = {}
+        files = []
+        types = []
+        for path in paths:
+            files.append(os.path.relpath(path, root).replace(os.sep, '/'))
+            for kind, name, href, *members in self.entries[path]:
+                if kind not in kind_positions:
+                    kind_positions[kind] = len(kinds)
+                    kinds.append(kind)
+                types.append([kind_positions[kind], name, len(files) - 1, href, *members])
+        return {'kinds': kinds, 'files': files, 'types': types}
+
+    def write(self, compact: bool = False, encodings: Tuple[str, ...] = ()) -> List[str]:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, GALLERY_FILE)
+        with html_output.open_output(path, encodings) as f:
+            f.writelines(render_gallery_pieces(self.build_index(), compact))
+        return html_output.output_paths(path, encodings)
+
+def render_gallery_pieces(index: Dict[str, Any], compact: bool = False) -> List[str]:
+    # index 為 CubeGallery.build_index() 的結果；頁面本身只有空的圖庫，卡片由腳本依索引建立
+    if compact:
+        styles = f"<style>{html_output.minify_css(GALLERY_CSS)}</style>\n"
+        scripts = f"<script>{html_output.minify_js(GALLERY_JS)}</script>\n"
+    else:
+        styles = f"    <style>\n{GALLERY_CSS}    </style>\n"
+        scripts = f"    <script>\n{GALLERY_JS}    </script>\n"
+    values = {
+        'count': str(len(index['types'])),
+        'index': html_output.script_json(index),
+        'styles': styles,
+        'scripts': scripts
+    }
+    pieces = []
+    for literal, field in GALLERY_COMPACT_CHUNKS if compact else GALLERY_PAGE_CHUNKS:
+        pieces.append(literal)
+        if field is not None:
+            pieces.append(values[field])
+    return pieces
+
+def _assets_href(asset_dir: Optional[str], output_dir: str) -> Optional[str]:
+    if asset_dir is None:
+        return None
+    relative = os.path.relpath(asset_dir, output_dir).replace(os.sep, '/')
+    return '' if relative == '.' else f"{relative}/"
+
+def _output_variant(assets_href: Optional[str], relations: Optional[Relations], compact: bool = False,
+                    encodings: Tuple[str, ...] = ()) -> str:
+    # 會影響輸出內容的選項：外部 CSS/JS 的相對路徑、專案索引解析出的父類型與子類型，
+    # 以及精簡模式與要寫出的壓縮副本（預設的輸出格式沿用原本的鍵）
+    variant = assets_href or ''
+    if compact or encodings:
+        variant += f"@{'compact' if compact else 'plain'}+{'+'.join(encodings)}"
+    if not relations:
+        return variant
+    import hashlib
+    digest = hashlib.sha1(json.dumps(relations, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return f"{variant}#{digest.hexdigest()[:16]}"
+
+def _parse_infos(swift_file_path: str, timer: stage_timer.StageTimer) -> List[Dict[str, Any]]:
+    # 解析器以記憶體映射逐批讀檔，讀檔時間計入 parse
+    with timer.stage('parse'):
+        return SwiftStructClassParser(swift_file_path).get_infos()
+
+def _rendered(swift_file_path: str, infos: List[Dict[str, Any]], output_dir: str, names: List[str],
+              relations: Optional[Relations], gallery: Optional[CubeGallery]) -> List[str]:
+    if gallery is not None:
+        gallery.add(swift_file_path, infos, output_dir, names, relations)
+    return [os.path.normpath(os.path.join(output_dir, name)) for name in names]
+
+def render_swift_file(swift_file_path: str, output_dir: str = '.', cache: Optional[CubeCache] = None,
+                      asset_dir: Optional[str] = None, relations: Optional[Relations] = None,
+                      infos: Optional[List[Dict[str, Any]]] = None,
+                      timer: stage_timer.StageTimer = stage_timer.DISABLED,
+                      compact: bool = False, encodings: Tuple[str, ...] = (),
+                      gallery: Optional[CubeGallery] = None) -> List[str]:
+    # infos 為已經解析好的結果（例如更新專案索引時解析的），提供時不再重新解析；
+    # compact 與 encodings 見 render_html_pieces 與 html_output.open_output；gallery 不為 None 時把各類型加入圖庫
+    assets_href = _assets_href(asset_dir, output_dir)
+    # 標準輸入、FIFO 只能讀一次，無法先計算雜湊再解析，一律不使用快取
+    if cache is None or fast_io.is_stream(swift_file_path):
+        if infos is None:
+            infos = _parse_infos(swift_file_path, timer)
+        names = _write_cubes(infos, output_dir, assets_href, relations, timer, compact, encodings)
+        return _rendered(swift_file_path, infos, output_dir, names, relations, gallery)
+
+    # 直接對映射區計算雜湊，不必先把檔案讀成 bytes
+    with timer.stage('hash'), fast_io.mapped(swift_file_path) as content:
+        key = cache.key(content)
+    variant = _output_variant(assets_href, relations, compact, encodings)
+    with timer.stage('cache'):
+        entry = cache.get(key)
+    if entry is not None:
+        outputs = entry['outputs']
+        names = outputs.get(variant)
+        if names is None:
+            # 只有輸出選項或其他檔案中的相關類型不同：沿用快取的解析結果，不必重新解析；
+            # 只保留最近的幾種輸出選項，項目不會無限增長
+            names = _write_cubes(entry['infos'], output_dir, assets_href, relations, timer, compact, encodings)
+            outputs[variant] = names
+            for old in list(outputs)[:-MAX_OUTPUT_VARIANTS]:
+                del outputs[old]
+            with timer.stage('cache'):
+                cache.put(key, entry)
+        elif not all(os.path.exists(path) for name in names
+                     for path in html_output.output_paths(os.path.join(output_dir, name), encodings)):
+            _write_cubes(entry['infos'], output_dir, assets_href, relations, timer, compact, encodings)
+        # 內容、產生器版本與相關類型都沒變，且輸出檔仍在：完全跳過解析與輸出
+        return _rendered(swift_file_path, entry['infos'], output_dir, names, relations, gallery)
+
+    if infos is None:
+        infos = _parse_infos(swift_file_path, timer)
+    names = _write_cubes(infos, output_dir, assets_href, relations, timer, compact, encodings)
+    with timer.stage('cache'):
+        cache.put(key, {'infos': infos, 'outputs': {variant: names}})
+    return _rendered(swift_file_path, infos, output_dir, names, relations, gallery)
+
+def swift_file_to_3d_cube(swift_file_path: str, output_dir: str = '.', cache: Optional[CubeCache] = None,
+                          asset_dir: Optional[str] = None, relations: Optional[Relations] = None,
+                          infos: Optional[List[Dict[str, Any]]] = None,
+                          timer: stage_timer.StageTimer = stage_timer.DISABLED,
+                          compact: bool = False, encodings: Tuple[str, ...] = (),
+                          gallery: Optional[CubeGallery] = None) -> bool:
+    try:
+        for filename in render_swift_file(swift_file_path, output_dir, cache, asset_dir, relations, infos, timer,
+                                          compact, encodings, gallery):
+            print(f"3D 圖表已生成：{filename}")
+        return True
     except Exception as e:
         print(f"生成 3D 圖表時發生錯誤：{str(e)}")
+        return False
 
-if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("使用方法：python script_name.py <swift_file_name>")
+def collect_swift_files(patterns: List[str]) -> List[str]:
+    return fast_io.collect_files(patterns, ('.swift',))
+
+BatchResult = Tuple[str, List[str], Optional[str], bool, Optional[Dict[str, List[float]]],
+                    Optional[Dict[str, List[List[Any]]]]]
+
+def _render_batch_item(item: Tuple[str, str, Optional[str], Optional[str], Optional[Relations],
+                                   Optional[List[Dict[str, Any]]], bool, bool, Tuple[str, ...],
+                                   Optional[str]]) -> BatchResult:
+    # 在工作行程中執行；錯誤以字串回傳，單一檔案失敗不會中斷整批作業。
+    # 後三個欄位為是否命中快取、啟用計時時各階段的統計，以及要求圖庫時這個檔案的圖庫項目（都由主行程合併）
+    (swift_file_path, output_dir, cache_dir, asset_dir, relations, infos, timings, compact, encodings,
+     gallery_dir) = item
+    cache = CubeCache(cache_dir) if cache_dir else None
+    timer = stage_timer.StageTimer(timings)
+    gallery = CubeGallery(gallery_dir) if gallery_dir else None
+    error = None
+    filenames = []
+    with timer:
+        try:
+            filenames = render_swift_file(swift_file_path, output_dir, cache, asset_dir, relations, infos, timer,
+                                          compact, encodings, gallery)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+    return (swift_file_path, filenames, error, bool(cache and cache.hits), timer.stats if timings else None,
+            gallery.entries if gallery else None)
+
+def _source_root(files: List[str]) -> str:
+    return os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+
+def _mirror_output_dir(path: str, root: str, output_dir: str) -> str:
+    # 依照來源目錄結構輸出，避免不同目錄中同名類型的圖表互相覆蓋；不在 root 底下的檔案直接輸出到 output_dir
+    relative = os.path.relpath(os.path.dirname(os.path.abspath(path)), root)
+    if relative.startswith(os.pardir):
+        return output_dir
+    return os.path.join(output_dir, relative)
+
+def batch_swift_to_3d_cubes(patterns: List[str], output_dir: str = '.', workers: Optional[int] = None,
+                            cache_dir: Optional[str] = None, external_assets: bool = False,
+                            timings: bool = False, index_path: Optional[str] = None,
+                            project_files: Optional[List[str]] = None,
+                            timer: stage_timer.StageTimer = stage_timer.DISABLED,
+                            compact: bool = False, encodings: Tuple[str, ...] = (),
+                            gallery: Optional[CubeGallery] = None) -> List[BatchResult]:
+    # index_path 不為 None 時先更新專案類型索引（只重新解析變更過的檔案；project_files 為只索引、不輸出的檔案），
+    # 立方體的父類型與子類型改用跨檔案解析的結果；gallery 不為 None 時收集所有輸出檔案的類型（由呼叫端寫出）
+    files = collect_swift_files(patterns)
+    if not files:
+        return []
+
+    root = _source_root(files)
+    asset_dir = None
+    if external_assets:
+        write_cube_assets(output_dir, compact, encodings)
+        asset_dir = output_dir
+    workers = workers or os.cpu_count() or 1
+    executor = None
+    if workers > 1 and len(files) > 1:
+        # 匯入 ProcessPoolExecutor 會連帶載入 multiprocessing，只在真的需要多行程時才匯入
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=workers)
+
+    def run(func, items):
+        if executor is None:
+            return [func(item) for item in items]
+        import ai_tools
+        chunksize = max(1, len(items) // (workers * 4))
+        return list(executor.map(ai_tools.picklable(func), items, chunksize=chunksize))
+
+    try:
+        relations = {}
+        parsed = {}
+        if index_path is not None:
+            # 索引階段在主行程計時，包含等待工作行程解析變更檔案的時間
+            with timer.stage('index'):
+                index = SwiftTypeIndex(index_path)
+                parsed = update_type_index(index, files + (project_files or []), run, prune=True)
+                relations = index.relations()
+        items = []
+        for path in files:
+            absolute = os.path.abspath(path)
+            items.append((path, _mirror_output_dir(path, root, output_dir), cache_dir, asset_dir,
+                          relations.get(absolute), parsed.get(absolute), timings, compact, encodings,
+                          gallery.output_dir if gallery else None))
+        results = run(_render_batch_item, items)
+        if gallery is not None:
+            for *_, entries in results:
+                gallery.entries.update(entries)
+        return results
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+EXPORT_FORMATS = ('ndjson', 'json')
+
+def _export_records(swift_file_path: str) -> Tuple[str, List[str], Optional[str]]:
+    # 在工作行程中解析並序列化，主行程只需依序寫出；每個類型一行 JSON，巢狀類型的 outer 為外層類型的完整名稱
+    try:
+        parser = SwiftStructClassParser(swift_file_path)
+    except Exception as e:
+        return swift_file_path, [], f"{type(e).__name__}: {e}"
+    records = []
+    for node in parser.iter_types():
+        record = {'file': swift_file_path, 'line': node.line, **node.get_info(),
+                  'outer': node.outer.qualified_name if node.outer is not None else None}
+        records.append(json.dumps(record, ensure_ascii=False, separators=(',', ':')))
+    return swift_file_path, records, None
+
+def iter_type_records(files: List[str], workers: int = 1) -> Iterator[Tuple[str, List[str], Optional[str]]]:
+    # 依檔案順序產生 (檔案, 序列化的類型, 錯誤)。多行程時只預先送出 workers * 4 個檔案，
+    # 等待寫出的結果不會隨專案大小增長
+    if workers <= 1 or len(files) <= 1:
+        for path in files:
+            yield _export_records(path)
+        return
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+    import ai_tools
+    export_records = ai_tools.picklable(_export_records)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for path in files:
+            pending.append(executor.submit(export_records, path))
+            if len(pending) >= workers * 4:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def export_types(files: List[str], output, export_format: str = 'ndjson',
+                 workers: int = 1) -> Tuple[int, List[Tuple[str, str]]]:
+    # 解析一個檔案就寫出一個檔案的類型，整個專案不會同時留在記憶體中。
+    # ndjson 每個類型一行；json 為同樣內容的陣列，逐項寫出而不先建立整個陣列。回傳 (類型數, 失敗的檔案)
+    count = 0
+    failures = []
+    if export_format == 'json':
+        output.write('[')
+    for path, records, error in iter_type_records(files, workers):
+        if error:
+            failures.append((path, error))
+            continue
+        for record in records:
+            if export_format == 'json':
+                output.write(',\n' if count else '\n')
+                output.write(record)
+            else:
+                output.write(record)
+                output.write('\n')
+            count += 1
+    if export_format == 'json':
+        output.write('\n]\n' if count else ']\n')
+    return count, failures
+
+def watch_swift_files(patterns: List[str], output_dir: str = '.', cache: Optional[CubeCache] = None,
+                      asset_dir: Optional[str] = None, batch: bool = False, polling: bool = False,
+                      timings: bool = False, index: Optional[SwiftTypeIndex] = None,
+                      project_files: Optional[List[str]] = None, compact: bool = False,
+                      encodings: Tuple[str, ...] = (), gallery: Optional[CubeGallery] = None) -> None:
+    # 監看輸入檔，內容有變更時只重新產生該檔案的圖表；批次模式下，監看目錄中新增的 .swift 檔也會處理。
+    # 有專案索引時一併監看 project_files，並重新產生父類型或子類型因此改變的其他檔案；
+    # gallery 為先前已收集好的圖庫，每次有變更就更新重新產生的檔案並重寫圖庫頁面
+    files = collect_swift_files(patterns)
+    if not files:
+        return
+    root = _source_root(files)
+    outputs = {os.path.abspath(path) for path in files}
+    known = outputs | {os.path.abspath(path) for path in project_files or ()}
+    relations = index.relations() if index is not None else {}
+    watcher = file_watch.FileWatcher(sorted(known), ('.swift',) if batch else None, polling=polling)
+    print(f"監看 {len(known)} 個檔案的變更（{watcher.backend_name}），按 Ctrl+C 結束")
+    sys.stdout.flush()
+    for changed in watcher.changes():
+        timer = stage_timer.StageTimer(timings)
+        with timer:
+            affected = set()
+            for path in changed:
+                if not os.path.exists(path):
+                    print(f"檔案已刪除：{path}")
+                    known.discard(path)
+                    outputs.discard(path)
+                    if gallery is not None:
+                        gallery.remove(path)
+                    continue
+                known.add(path)
+                if batch or path in outputs:
+                    outputs.add(path)
+                    affected.add(path)
+            parsed = {}
+            if index is not None:
+                with timer.stage('index'):
+                    parsed = update_type_index(index, sorted(known), prune=batch)
+                    previous, relations = relations, index.relations()
+                affected.update(path for path in outputs if relations.get(path) != previous.get(path))
+            for path in sorted(affected):
+                swift_file_to_3d_cube(path, _mirror_output_dir(path, root, output_dir), cache, asset_dir,
+                                      relations.get(path), parsed.get(path), timer, compact, encodings, gallery)
+            if gallery is not None:
+                _write_gallery(gallery, compact, encodings)
+        if cache:
+            cache.evict()
+        sys.stdout.flush()
+        timer.report()
+
+def _write_gallery(gallery: CubeGallery, compact: bool = False, encodings: Tuple[str, ...] = ()) -> None:
+    for path in gallery.write(compact, encodings):
+        print(f"圖庫已生成：{path}（{sum(len(rows) for rows in gallery.entries.values())} 個類型）")
+
+def _print_cache_stats(cache: CubeCache) -> None:
+    removed, total = cache.evict()
+    print(f"快取：命中 {cache.hits}，未命中 {cache.misses}，淘汰 {removed} 個項目，"
+          f"目前大小 {total / 1024:.1f} KB")
+
+def _watch(args, patterns: List[str], cache: Optional[CubeCache], asset_dir: Optional[str], batch: bool,
+           project_files: List[str], gallery: Optional[CubeGallery] = None) -> None:
+    index = None if args.no_index else SwiftTypeIndex(_index_path(args, batch))
+    try:
+        watch_swift_files(patterns, args.output_dir, cache, asset_dir, batch, timings=args.timings,
+                          index=index, project_files=project_files, compact=args.compact,
+                          encodings=args.precompress, gallery=gallery)
+    except KeyboardInterrupt:
+        print("\n停止監看")
+
+def _export(args) -> None:
+    # 匯出模式只解析並寫出類型資料，不產生 HTML；輸出到標準輸出時訊息一律寫到標準錯誤輸出
+    files = collect_swift_files(args.inputs)
+    if not files:
+        print("錯誤：找不到任何 .swift 檔案", file=sys.stderr)
+        sys.exit(1)
+    start = time.perf_counter()
+    with stage_timer.profiled(args.profile):
+        if args.export == '-':
+            try:
+                count, failures = export_types(files, sys.stdout, args.export_format, args.jobs or os.cpu_count() or 1)
+                sys.stdout.flush()
+            except BrokenPipeError:
+                # 下游（例如 head）提早關閉管線：把標準輸出導向 devnull，結束時的 flush 才不會再次失敗，
+                # 直接結束而不印出追蹤訊息或摘要
+                os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+                sys.exit(1)
+        else:
+            with open(args.export, 'w', encoding='utf-8') as output:
+                count, failures = export_types(files, output, args.export_format, args.jobs or os.cpu_count() or 1)
+    for path, error in failures:
+        print(f"失敗：{path}：{error}", file=sys.stderr)
+    print(f"匯出完成：{len(files)} 個檔案，{count} 個類型，{len(failures)} 個失敗，"
+          f"耗時 {time.perf_counter() - start:.2f} 秒", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+def _index_path(args, batch: bool = True) -> Optional[str]:
+    # 單一檔案模式只有指定 --project 或 --index 時才保存索引；否則回傳 None，索引只存在記憶體中，
+    # 不會在輸出目錄留下索引檔，也不會動到批次模式保存的索引
+    if not batch and not (args.index or args.project):
+        return None
+    return args.index or os.path.join(args.output_dir, INDEX_FILE)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="將 Swift 檔案中的類型轉換為 3D 旋轉立方體 HTML 圖表")
+    parser.add_argument("inputs", nargs='+', help="Swift 檔案；搭配 --batch 時可為目錄或 glob 樣式")
+    parser.add_argument("--batch", action="store_true", help="批次處理多個檔案、目錄或 glob 樣式")
+    parser.add_argument("-o", "--output-dir", default='.', help="輸出目錄（預設為目前目錄）")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="平行處理的行程數（預設為 CPU 數量）")
+    parser.add_argument("--cache-dir", default=None, help="啟用以內容雜湊為鍵的快取，未變更的檔案會直接跳過")
+    parser.add_argument("--external-assets", action="store_true",
+                        help=f"把共用的 CSS/JS 輸出為 {CUBE_CSS_FILE} 與 {CUBE_JS_FILE}，頁面以相對路徑引用")
+    parser.add_argument("--compact", action="store_true", help="輸出去除縮排的頁面與壓縮過的 CSS/JS")
+    parser.add_argument("--precompress", action="append", choices=html_output.ENCODINGS, default=[],
+                        help="同時寫出每個輸出檔的 .gz 或 .br 預先壓縮副本（可重複指定；.br 需要 brotli 套件）")
+    parser.add_argument("--gallery", action="store_true",
+                        help=f"另外輸出包含所有類型的單一圖庫頁面 {GALLERY_FILE}：可搜尋，立方體捲動到可見範圍時才建立")
+    parser.add_argument("--export", metavar="FILE",
+                        help="不產生 HTML，改為把所有輸入檔的類型串流匯出到 FILE（- 為標準輸出），每解析完一個檔案就寫出")
+    parser.add_argument("--export-format", choices=EXPORT_FORMATS, default='ndjson',
+                        help="匯出格式：ndjson 每個類型一行（預設），json 為單一陣列")
+    parser.add_argument("--cache-max-mb", type=float, default=64, help="快取大小上限（MB，預設 64）")
+    parser.add_argument("--watch", action="store_true", help="完成後持續監看輸入檔，只重新產生內容有變更的檔案")
+    parser.add_argument("--timings", action="store_true",
+                        help="在標準錯誤輸出各階段（index、hash、cache、parse、render、write）的時間與記憶體配置；"
+                             "批次模式下為所有工作行程的總和")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="以 cProfile 剖析並把 pstats 資料寫到 FILE（批次模式只剖析主行程，請搭配 -j 1）")
+    parser.add_argument("--project", metavar="DIR", action="append", default=[],
+                        help="一併索引這個目錄（可重複指定）中所有 .swift 檔的類型，立方體會顯示在其他檔案中宣告的子類型與父類型")
+    parser.add_argument("--index", metavar="FILE",
+                        help=f"專案類型索引的保存位置（預設為輸出目錄中的 {INDEX_FILE}；單一檔案模式只有搭配 --project "
+                             "或 --index 時才保存），下次執行只重新解析變更過的檔案")
+    parser.add_argument("--no-index", action="store_true", help="不建立專案類型索引，父類型直接取宣告中的文字")
+    args = parser.parse_args()
+    args.precompress = html_output.available_encodings(args.precompress)
+    if args.export:
+        _export(args)
+        return
+    project_files = collect_swift_files(args.project) if args.project else []
+
+    if not args.batch:
+        if len(args.inputs) != 1:
+            parser.error("一次只能處理一個檔案，多個檔案請使用 --batch")
+        swift_file_name = args.inputs[0]
+        if not swift_file_name.endswith('.swift'):
+            swift_file_name += '.swift'
+
+        if not os.path.exists(swift_file_name):
+            print(f"錯誤：找不到文件 '{swift_file_name}'")
+            sys.exit(1)
+
+        cache = CubeCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024)) if args.cache_dir else None
+        asset_dir = None
+        if args.external_assets:
+            write_cube_assets(args.output_dir, args.compact, args.precompress)
+            asset_dir = args.output_dir
+        gallery = CubeGallery(args.output_dir) if args.gallery else None
+        timer = stage_timer.StageTimer(args.timings)
+        with stage_timer.profiled(args.profile), timer:
+            relations = infos = None
+            if not args.no_index:
+                # 只有這個檔案與 --project 指定的檔案會被索引；保存的索引下次只需檢查修改時間，
+                # 其中其他檔案的項目保持原樣
+                with timer.stage('index'):
+                    index = SwiftTypeIndex(_index_path(args, batch=False))
+                    parsed = update_type_index(index, [swift_file_name] + project_files)
+                    relations = index.relations().get(os.path.abspath(swift_file_name))
+                infos = parsed.get(os.path.abspath(swift_file_name))
+            succeeded = swift_file_to_3d_cube(swift_file_name, args.output_dir, cache, asset_dir,
+                                              relations, infos, timer, args.compact, args.precompress, gallery)
+            if gallery is not None:
+                with timer.stage('gallery'):
+                    _write_gallery(gallery, args.compact, args.precompress)
+        if cache:
+            _print_cache_stats(cache)
+        timer.report()
+        if args.watch:
+            _watch(args, [swift_file_name], cache, asset_dir, False, project_files, gallery)
+            return
+        if not succeeded:
+            sys.exit(1)
+        return
+
+    # 批次模式的各階段統計為主行程的索引階段加上所有工作行程的總和；記憶體只在工作行程中追蹤
+    timer = stage_timer.StageTimer(args.timings)
+    gallery = CubeGallery(args.output_dir) if args.gallery else None
+    start = time.perf_counter()
+    with stage_timer.profiled(args.profile):
+        results = batch_swift_to_3d_cubes(args.inputs, args.output_dir, args.jobs, args.cache_dir,
+                                          args.external_assets, args.timings,
+                                          None if args.no_index else _index_path(args), project_files, timer,
+                                          args.compact, args.precompress, gallery)
+        if results and gallery is not None:
+            with timer.stage('gallery'):
+                _write_gallery(gallery, args.compact, args.precompress)
+    elapsed = time.perf_counter() - start
+    if not results:
+        print("錯誤：找不到任何 .swift 檔案")
         sys.exit(1)
-    
-    swift_file_name = sys.argv[1]
-    if not swift_file_name.endswith('.swift'):
-        swift_file_name += '.swift'
-    
-    if not os.path.exists(swift_file_name):
-        print(f"錯誤：找不到文件 '{swift_file_name}'")
+
+    failures = [(path, error) for path, _, error, *_ in results if error]
+    generated = sum(len(filenames) for _, filenames, *_ in results)
+    for path, error in failures:
+        print(f"失敗：{path}：{error}", file=sys.stderr)
+    print(f"批次完成：{len(results)} 個檔案，生成 {generated} 個 3D 圖表，"
+          f"{len(failures)} 個失敗，耗時 {elapsed:.2f} 秒")
+    cache = None
+    if args.cache_dir:
+        cache = CubeCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+        cache.hits = sum(1 for _, _, _, hit, *_ in results if hit)
+        cache.misses = len(results) - cache.hits
+        _print_cache_stats(cache)
+    if args.timings:
+        for _, _, _, _, stats, _ in results:
+            timer.merge(stats)
+        timer.report()
+    if args.watch:
+        _watch(args, args.inputs, cache, args.output_dir if args.external_assets else None, True, project_files,
+               gallery)
+        return
+    if failures:
         sys.exit(1)
-    
-    swift_file_to_3d_cube(swift_file_name)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+"""以 load_tool 載入的工具函式交給 spawn/forkserver 行程池時，必須能在沒有載入過工具的行程中還原。"""
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import ai_tools
+
+class PicklableTest(unittest.TestCase):
+    def test_tool_function_loads_in_fresh_interpreter(self):
+        # 新的直譯器相當於 spawn 的工作行程：sys.modules 中沒有工具腳本
+        cube = ai_tools.load_tool('cube')
+        data = pickle.dumps(ai_tools.picklable(cube._export_records))
+        code = ("import pickle, sys; sys.path.insert(0, sys.argv[1]); "
+                "print(pickle.loads(sys.stdin.buffer.read()).__module__)")
+        result = subprocess.run([sys.executable, '-c', code, ROOT], input=data, capture_output=True, check=True)
+        self.assertEqual(result.stdout.decode().strip(), 'swift_struct_class_to_3d_cube')
+
+    def test_other_functions_are_unchanged(self):
+        self.assertIs(ai_tools.picklable(os.path.join), os.path.join)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+"""批次模式共用的輸入檔收集：目錄遞迴、副檔名過濾、略過隱藏目錄與重複的檔案。"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_io
+
+class CollectFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        for name in ('a.md', 'b.MARKDOWN', 'c.swift', 'sub/d.md', '.git/e.md'):
+            path = os.path.join(self.tmp.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def relative(self, paths):
+        return [os.path.relpath(path, self.tmp.name) for path in paths]
+
+    def test_directory_filters_suffixes_and_skips_hidden(self):
+        self.assertEqual(self.relative(fast_io.collect_files([self.tmp.name], ('.md', '.markdown'))),
+                         ['a.md', 'b.MARKDOWN', os.path.join('sub', 'd.md')])
+        self.assertEqual(self.relative(fast_io.collect_files([self.tmp.name], ('.swift',))), ['c.swift'])
+
+    def test_glob_and_duplicates(self):
+        patterns = [os.path.join(self.tmp.name, '**', '*.md'), os.path.join(self.tmp.name, 'a.md')]
+        self.assertEqual(self.relative(fast_io.collect_files(patterns, ('.md',))),
+                         ['a.md', os.path.join('sub', 'd.md')])
+
+if __name__ == "__main__":
+    unittest.main()
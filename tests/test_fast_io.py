@@ -0,0 +1,56 @@
+"""不是一般檔案的輸入（管線、FIFO）無法映射，讀取工具必須改以區塊讀取，而不是當成空檔案。"""
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fast_io
+
+TEXT = "foo({\r\nbar\n})\n最後一行"
+
+def pipe_reader(data):
+    # 由另一個執行緒寫入管線，讀取端以 /dev/fd 路徑或檔案物件使用
+    read_fd, write_fd = os.pipe()
+
+    def write():
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(data)
+
+    threading.Thread(target=write).start()
+    return os.fdopen(read_fd, 'rb')
+
+class StreamInputTest(unittest.TestCase):
+    def test_iter_line_batches_reads_pipes(self):
+        with pipe_reader(TEXT.encode()) as f:
+            lines = [line for batch in fast_io.iter_line_batches(f, block_size=4) for line in batch]
+        self.assertEqual(lines, ["foo({", "bar", "})", "最後一行"])
+
+    def test_mapped_reads_pipes(self):
+        with pipe_reader(TEXT.encode()) as f, fast_io.mapped(f) as data:
+            self.assertEqual(bytes(data), TEXT.encode())
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), "FIFOs are not supported")
+    def test_spooled_fifo_can_be_read_twice(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'in.md')
+            os.mkfifo(path)
+
+            def write():
+                with open(path, 'wb') as f:
+                    f.write(TEXT.encode())
+
+            writer = threading.Thread(target=write)
+            writer.start()
+            self.assertTrue(fast_io.is_stream(path))
+            with fast_io.spooled(path) as spooled:
+                self.assertFalse(fast_io.is_stream(spooled))
+                self.assertEqual(fast_io.read_text(spooled), fast_io.read_text(spooled))
+                self.assertEqual(fast_io.read_text(spooled), TEXT.replace('\r\n', '\n'))
+            writer.join()
+            self.assertFalse(os.path.exists(spooled))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,23 @@
+"""內嵌字型的子集必須包含頁面上實際顯示的字元，包括 CSS 轉換大小寫後的字元。"""
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_assets
+
+class UsedCharactersTest(unittest.TestCase):
+    def test_case_variants(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'document.md')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("| name | Straße |\n|---|---|\n")
+            characters = html_assets.used_characters(path, 'Title')
+        # 表頭與標題會被 text-transform: uppercase 轉成大寫
+        self.assertTrue(set('NAMESTRSSETITLE') <= characters)
+        self.assertTrue(set('title') <= characters)
+
+if __name__ == "__main__":
+    unittest.main()
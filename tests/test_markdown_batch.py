@@ -0,0 +1,55 @@
+"""批次模式只略過以相同選項產生、且比輸入檔新的輸出；改變選項或之後單獨轉換過的檔案要重新轉換。"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown_batch
+import markdown_themes
+
+def batch_args(**options):
+    args = argparse.Namespace(title=None, external_assets=False, split=False, virtual=False, compact=False,
+                              font_file=None, precompress=[], jobs=1, force=False, timings=False, profile=None)
+    vars(args).update(options)
+    return args
+
+class BatchFreshnessTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'a.md')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("| a |\n|---|\n| 1 |\n")
+
+    def converted(self, **options):
+        # 回傳這次批次轉換的輸出檔數
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            status = markdown_batch.batch_convert(markdown_themes.PLAIN_THEME, [self.tmp.name], batch_args(**options))
+        self.assertEqual(status, 0)
+        return int(output.getvalue().split(' converted')[0].rsplit(' ', 1)[1])
+
+    def test_same_options_are_skipped(self):
+        self.assertEqual(self.converted(), 1)
+        self.assertEqual(self.converted(), 0)
+
+    def test_changed_options_are_converted(self):
+        self.assertEqual(self.converted(), 1)
+        self.assertEqual(self.converted(compact=True), 1)
+        self.assertEqual(self.converted(compact=True), 0)
+
+    def test_output_rewritten_after_the_stamp(self):
+        self.assertEqual(self.converted(), 1)
+        # 之後以其他選項單獨轉換：輸出比戳記新
+        output_file = markdown_themes.PLAIN_THEME.output_file(os.path.splitext(self.path)[0])
+        stamp_time = os.stat(markdown_batch.stamp_path(markdown_themes.PLAIN_THEME, self.path)).st_mtime_ns
+        os.utime(output_file, ns=(time.time_ns(), stamp_time + 1_000_000_000))
+        self.assertEqual(self.converted(), 1)
+
+if __name__ == "__main__":
+    unittest.main()
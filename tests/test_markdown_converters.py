@@ -0,0 +1,93 @@
+"""轉換腳本的串流路徑與 markdown 套件的輸出比對：頁面中的每個表格必須與 markdown.markdown 產生的表格相同。"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_tools
+import markdown_themes
+from test_markdown_tables import CELL_ROWS
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+TABLE = re.compile(r'<table>.*?</table>', re.DOTALL)
+
+DOCUMENT = "# 報表\n\n## 第一節\n\n| a | b |\n|:--|--:|\n" + '\n'.join(CELL_ROWS) + \
+    "\n\n## 第二節\n\n| `|` | <br> |\n|---|---|\n| AT&amp;T | `x | y` |\n"
+
+def page_tables(pages):
+    return [table for _, pieces in pages for table in TABLE.findall(''.join(pieces))]
+
+@unittest.skipIf(markdown is None, "markdown is not installed")
+class ConverterMatchesMarkdownTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = TABLE.findall(markdown.markdown(DOCUMENT, extensions=['tables']))
+
+    def test_styled(self):
+        styled = ai_tools.load_tool('styled')
+        for split in (False, True):
+            with self.subTest(split=split):
+                pages = styled.THEME.iter_pages(markdown_themes.parse_text(DOCUMENT, stream=True), split=split)
+                self.assertEqual(page_tables(pages), self.expected)
+
+    def test_styled_markdown_table_to_html(self):
+        styled = ai_tools.load_tool('styled')
+        self.assertEqual(TABLE.findall(styled.markdown_table_to_html(DOCUMENT)), self.expected)
+
+    def test_disney(self):
+        disney = ai_tools.load_tool('disney')
+        for split in (False, True):
+            with self.subTest(split=split):
+                pages = disney.THEME.iter_pages(markdown_themes.parse_text(DOCUMENT, stream=True), 'Report', split=split)
+                self.assertEqual(page_tables(pages), self.expected)
+
+    def test_convert_file(self):
+        # 命令列與批次模式共用的單一主題轉換：串流寫出的頁面與 markdown 套件的表格相同
+        args = argparse.Namespace(title=None, external_assets=False, split=False, virtual=False, compact=False,
+                                  font_file=None, precompress=[], no_animation=False)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'document.md')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(DOCUMENT)
+            for name in ('disney', 'styled'):
+                with self.subTest(theme=name):
+                    output_file, = markdown_themes.convert_file(markdown_themes.load_theme(name), path, args)
+                    with open(output_file, encoding='utf-8') as f:
+                        self.assertEqual(TABLE.findall(f.read()), self.expected)
+
+    def assertFileMatchesMarkdown(self, text):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'document.md')
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            document = markdown_themes.parse_file(path)
+        html_text = markdown.markdown(text, extensions=['tables'])
+        self.assertEqual(TABLE.findall(''.join(document.sections()) if document else ''), TABLE.findall(html_text))
+        return document
+
+    def test_reference_definitions_use_markdown(self):
+        # [x][1] 要讀到文件後面的定義才知道是連結，整份文件改用 markdown 套件轉換
+        self.assertFileMatchesMarkdown("| a | b |\n|---|---|\n| [x][1] | [y] |\n\n[1]: http://e\n[y]: http://f \"t\"\n")
+
+    def test_containers_use_markdown(self):
+        # 其他表格照常以 GFM 撰寫時，引言與清單中的表格仍要找到，HTML 區塊與註解中的表格列不可輸出成表格
+        table = "| a | b |\n|---|---|\n| 1 | 2 |\n\n"
+        for text in ("> | q |\n> |---|\n> | x |\n\n", "- | l |\n  |---|\n  | y |\n\n",
+                     "<div>\n| d |\n|---|\n</div>\n\n", "<!--\n| c |\n|---|\n-->\n\n"):
+            with self.subTest(text=text):
+                self.assertFileMatchesMarkdown(table + text + table)
+
+    def test_setext_heading_titles(self):
+        document = self.assertFileMatchesMarkdown("標題\n===\n\n| a |\n|---|\n| 1 |\n\n小節\n---\n| b |\n|---|\n| 2 |\n")
+        self.assertEqual([title for _, title, _, _ in document.entries], ['標題', '小節'])
+
+if __name__ == "__main__":
+    unittest.main()
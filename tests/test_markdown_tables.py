@@ -0,0 +1,119 @@
+"""串流表格解析器與 markdown 套件的輸出比對：同一個表格兩條路徑必須產生相同的標記。"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown_tables
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+# 會讓串流解析器與 markdown 套件產生差異的儲存格：行內程式碼中的 |、原始 HTML、字元實體、跳脫字元、
+# 圖片、巢狀與不成對的強調，以及交給 markdown 套件渲染的參考式連結與其他連結寫法
+CELL_ROWS = [
+    "| `x | y` | z |",
+    "| ``a | `b`` | z |",
+    "| `a | b | c |",
+    "| \\`a | b` | c |",
+    "| `a \\| b` | c |",
+    "| a \\| b | c |",
+    "| line1<br>line2 | AT&amp;T &nbsp; |",
+    "| <https://x.y/?a=1&b=2> | &copy; &#169; &#xA9; & &x |",
+    '| <span class="x">s</span> | **<b>b</b>** |',
+    "| a < b > c | 1 & 2 |",
+    "| `<br>` | `&amp;` |",
+    "| [a<br>b](http://e?a=1&b=2) | &foo; |",
+    "| **x** *y* _z_ | [l](http://e \"t\") |",
+    "| ![logo](logo.png) | ![a & b](x.png \"t\") |",
+    "| ***bold italic*** | **a _b_ c** |",
+    "| 2 * 3 * 4 | a_b_c _d_ |",
+    "| [x][1] | [x] |",
+    "| *a *b* | **x* |",
+    "| [a](x 't') | [b](y \"t\" 'u') |",
+    "| x <br/> <!-- c --> &#x; | y |",
+    "| 1 | 2 | 3 |",
+    "| only |",
+]
+
+def stream_tables(text):
+    return '\n'.join(''.join(markdown_tables.render_table(table)) for table in markdown_tables.iter_tables(text.split('\n')))
+
+@unittest.skipIf(markdown is None, "markdown is not installed")
+class MatchesMarkdownTest(unittest.TestCase):
+    def assertMatchesMarkdown(self, text):
+        self.assertEqual(stream_tables(text), markdown.markdown(text, extensions=['tables']))
+
+    def test_cells(self):
+        for row in CELL_ROWS:
+            with self.subTest(row=row):
+                self.assertMatchesMarkdown("| a | b |\n|---|---|\n" + row)
+
+    def test_header_cells(self):
+        # 標題列的欄數必須與分隔列相同，只取兩欄的列
+        for row in CELL_ROWS[:2] + CELL_ROWS[4:-2]:
+            with self.subTest(row=row):
+                self.assertMatchesMarkdown(row + "\n|---|---|\n| 1 | 2 |")
+
+    def test_alignment(self):
+        self.assertMatchesMarkdown("| a | b | c |\n|:--|:-:|--:|\n| `|` | <br> | &amp; |")
+
+    def test_reference_links_use_markdown(self):
+        text = "| a |\n|---|\n| [x][1] |\n\n[1]: http://e\n"
+        self.assertTrue(markdown_tables.needs_markdown(text.encode()))
+        self.assertFalse(markdown_tables.needs_markdown(b"| a |\n|---|\n| [x][1] |\n"))
+
+    def test_containers_use_markdown(self):
+        # 引言、清單項目中的表格與 HTML 區塊、跨行註解中的表格列，串流解析器無法判斷，整份文件改用 markdown 套件
+        for text in ("> | a |\n> |---|\n", "- | a |\n  |---|\n", "1. x\n\n    | a |\n    |---|\n",
+                     "<div>\n| a |\n|---|\n</div>\n", "<!-- x\n| a |\n|---|\n-->\n"):
+            with self.subTest(text=text):
+                self.assertTrue(markdown_tables.needs_markdown(text.encode()))
+        self.assertFalse(markdown_tables.needs_markdown(b"| a <br> |\n|---|\n| <!-- c --> |\n"))
+
+class IterTablesTest(unittest.TestCase):
+    def headings(self, text):
+        return [table.heading for table in markdown_tables.iter_tables(text.split('\n'))]
+
+    def test_setext_heading(self):
+        self.assertEqual(self.headings("Title\n=====\n\n| a |\n|---|\n\nSub *x*\n---\n| b |\n|---|"),
+                         ['Title', 'Sub *x*'])
+
+    def test_setext_underline_needs_block_start(self):
+        # 與 markdown 套件相同：標題文字必須是區塊的第一行，底線不可縮排
+        self.assertEqual(self.headings("# H\n\npara\nTitle\n===\n\n| a |\n|---|\n\nT\n  ===\n\n| b |\n|---|"),
+                         ['H', 'H'])
+
+class SplitRowTest(unittest.TestCase):
+    def test_pipe_in_code_span(self):
+        self.assertEqual(markdown_tables.split_row("| `x | y` | z |"), ["`x | y`", "z"])
+
+    def test_unmatched_backtick(self):
+        self.assertEqual(markdown_tables.split_row("| `a | b |"), ["`a", "b"])
+
+    def test_escaped_pipe_is_kept_for_render_inline(self):
+        self.assertEqual(markdown_tables.split_row("| a \\| b | c |"), ["a \\| b", "c"])
+        self.assertEqual(markdown_tables.render_inline("a \\| b"), "a | b")
+
+class RenderInlineTest(unittest.TestCase):
+    def test_raw_html_and_entities_pass_through(self):
+        self.assertEqual(markdown_tables.render_inline("line1<br>line2"), "line1<br>line2")
+        self.assertEqual(markdown_tables.render_inline("AT&amp;T &nbsp;"), "AT&amp;T &nbsp;")
+
+    def test_text_is_escaped(self):
+        self.assertEqual(markdown_tables.render_inline("a < b & c"), "a &lt; b &amp; c")
+
+    @unittest.skipIf(markdown is None, "markdown is not installed")
+    def test_unsupported_syntax_uses_markdown(self):
+        self.assertEqual(markdown_tables.render_inline("***x** y*"), "<em><strong>x</strong> y</em>")
+        self.assertEqual(markdown_tables.render_inline("[a](<x y>)"), '<a href="x y">a</a>')
+        self.assertTrue(markdown_tables.render_inline("<a@b.co>").startswith('<a href="&#109;&#97;'))
+
+    def test_code_is_escaped(self):
+        self.assertEqual(markdown_tables.render_inline("`<br> &amp;`"), "<code>&lt;br&gt; &amp;amp;</code>")
+
+if __name__ == "__main__":
+    unittest.main()
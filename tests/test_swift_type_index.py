@@ -0,0 +1,76 @@
+"""專案類型索引的父類型與子類型解析。"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ai_tools
+
+cube = ai_tools.load_tool('cube')
+
+GENERIC_SOURCE = """class Store<T> {}
+struct Item {}
+class Cart: Store<Dictionary<String, Item>>, Codable {}
+class Handler: Store<(Int, String) -> Item>, Hashable {}
+"""
+
+MULTILINE_SOURCE = """class Base {}
+class Multi:
+    Base,
+    Codable {
+    var value: Int
+}
+struct Pair<T>
+    : Hashable
+    where T: Equatable
+{
+    let first: T
+}
+"""
+
+def file_relations(source, path='/project/g.swift'):
+    index = cube.SwiftTypeIndex()
+    index.update(path, [0, len(source)], cube.SwiftStructClassParser(path, source).get_infos())
+    return index.relations()[path]
+
+class SplitParentTypesTest(unittest.TestCase):
+    def test_plain_list(self):
+        self.assertEqual(cube.split_parent_types(" Base, Codable , "), ["Base", "Codable"])
+
+    def test_generic_arguments_are_not_split(self):
+        self.assertEqual(cube.split_parent_types("Store<Dictionary<String, Item>>, Codable"),
+                         ["Store<Dictionary<String, Item>>", "Codable"])
+
+    def test_function_type_arrow(self):
+        self.assertEqual(cube.split_parent_types("Store<(Int, String) -> Item>, Hashable"),
+                         ["Store<(Int, String) -> Item>", "Hashable"])
+
+class GenericSupertypeRelationsTest(unittest.TestCase):
+    def setUp(self):
+        self.relations = file_relations(GENERIC_SOURCE)
+
+    def test_generic_argument_is_not_a_parent(self):
+        self.assertEqual(self.relations['class Cart']['parents'], ["class Store", "Codable"])
+        self.assertEqual(self.relations['class Handler']['parents'], ["class Store", "Hashable"])
+
+    def test_generic_argument_has_no_subtypes(self):
+        self.assertEqual(self.relations['struct Item']['children'], [])
+        self.assertEqual(self.relations['class Store']['children'], ["class Cart", "class Handler"])
+
+class MultilineDeclarationTest(unittest.TestCase):
+    def test_inheritance_clause_across_lines(self):
+        # 繼承清單與 where 子句跨越多行時，直到 { 之前的文字都屬於同一個宣告
+        types = {node.name: node for node in cube.SwiftStructClassParser('/project/m.swift', MULTILINE_SOURCE).types}
+        self.assertEqual(types['Multi'].parent_types, ["Base", "Codable"])
+        self.assertEqual(types['Multi'].attributes, ["var value: Int"])
+        self.assertEqual(types['Pair'].parent_types, ["Hashable"])
+        self.assertEqual(types['Pair'].attributes, ["let first: T"])
+
+    def test_relations(self):
+        relations = file_relations(MULTILINE_SOURCE, '/project/m.swift')
+        self.assertEqual(relations['class Multi']['parents'], ["class Base", "Codable"])
+        self.assertEqual(relations['class Base']['children'], ["class Multi"])
+
+if __name__ == "__main__":
+    unittest.main()